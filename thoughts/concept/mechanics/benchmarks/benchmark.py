@@ -0,0 +1,728 @@
+#!/usr/bin/env python3
+"""
+Mechanics Benchmarks
+
+Times every 05-mirror simulation on fixed, seeded workloads at several
+scales, appends the results to a JSON history, and flags regressions
+against a stored baseline.
+
+Each sample rebuilds its workload from the same seed, then times whole
+passes over every entity. The pass count is sized like timeit's autorange
+so a sample lasts at least MIN_SAMPLE_SECONDS, and reused from the
+baseline so both runs time the same work. Samples are interleaved across
+benchmarks, so a slow spell on the machine is spread thin. Peak memory is
+measured over a single pass of a fresh workload under tracemalloc, so
+tracing never inflates the timings and state a workload accumulates
+(brightness histories, evidence lists) does not scale with the pass count.
+
+Samples within one run agree far better than runs do (clock scaling,
+other load). A shift shared by most benchmarks in a run is the machine,
+not the code, and is divided out first. The noise a change must then beat
+is the run-to-run spread of each benchmark's median, read from recent
+history on the same machine. A benchmark counts as slower only if BOTH
+tests pass:
+  - the log change in the median is REGRESSION_SIGMAS run-to-run
+    deviations out (DEFAULT_RUN_NOISE until history has enough runs)
+  - the median slowed by more than REGRESSION_MIN_RATIO
+Peak memory is deterministic for a seed, so it uses only a ratio.
+
+Usage:
+    python benchmark.py                         # Full suite, compare to baseline
+    python benchmark.py --scales 1,1000         # Skip the 100k workloads
+    python benchmark.py --only update_star      # One benchmark (repeatable)
+    python benchmark.py --save-baseline         # Store this run as the baseline
+"""
+
+import argparse
+import gc
+import hashlib
+import importlib.util
+import json
+import math
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+MECHANICS = Path(__file__).resolve().parent.parent
+RESULTS = Path(__file__).resolve().parent / "results"
+HISTORY_FILE = RESULTS / "history.json"
+BASELINE_FILE = RESULTS / "baseline.json"
+
+SIMULATIONS = {
+    "brightness-decay": "systems/brightness-decay/05-mirror/simulation.py",
+    "constellation-states": "systems/constellation-states/05-mirror/simulation.py",
+    "constellation-states-v2": "systems/constellation-states/05-mirror/simulation_v2.py",
+    "constellation-states-v3": "systems/constellation-states/05-mirror/simulation_v3.py",
+    "connection-formation": "systems/connection-formation/05-mirror/simulation.py",
+    "phase-transitions": "systems/phase-transitions/05-mirror/simulation.py",
+    "the-walk": "systems/the-walk/05-mirror/simulation.py",
+    "the-horizon": "systems/the-horizon/05-mirror/simulation.py",
+    "experiment-selection": "systems/experiment-selection/05-mirror/simulation.py",
+    "compatibility": "compatibility/05-mirror/simulation.py",
+    "daily-tick": "systems/daily-tick/05-mirror/simulation.py",
+}
+
+SCALES = (1, 1_000, 100_000)
+SEED = 42
+
+REPEATS = 10               # timed samples per benchmark and scale
+LARGE_REPEATS = 5          # samples at LARGE_SCALE and above
+LARGE_SCALE = 100_000
+MIN_SAMPLE_SECONDS = 0.2   # passes per sample are raised until one sample lasts this long
+
+NOISE_WINDOW = 20          # most recent history runs used to estimate run-to-run noise
+NOISE_MIN_RUNS = 3         # runs of one benchmark needed before its own spread counts
+DEFAULT_RUN_NOISE = 0.10   # relative run-to-run stdev assumed until history has enough runs
+MIN_RUN_NOISE = 0.03       # floor for the estimate from history
+DRIFT_MIN_RESULTS = 5      # benchmarks compared before a run-wide speed shift is taken out
+REGRESSION_SIGMAS = 3.0    # run-to-run deviations needed to call a timing change real
+REGRESSION_MIN_RATIO = 0.10
+MEMORY_MIN_RATIO = 0.10
+MEMORY_MIN_BYTES = 64 * 1024
+
+
+# =============================================================================
+# LOADING
+# =============================================================================
+
+_modules: Dict[str, object] = {}
+
+
+def load(simulation: str):
+    """Import a simulation script by path (the folders are not packages)."""
+    if simulation not in _modules:
+        name = "bench_" + simulation.replace("-", "_")
+        spec = importlib.util.spec_from_file_location(name, MECHANICS / SIMULATIONS[simulation])
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+        _modules[simulation] = module
+    return _modules[simulation]
+
+
+def source_digest(simulation: str) -> str:
+    """Short digest of a simulation script, so history only pools runs of the same code."""
+    return hashlib.sha1((MECHANICS / SIMULATIONS[simulation]).read_bytes()).hexdigest()[:12]
+
+
+# =============================================================================
+# WORKLOADS
+# =============================================================================
+# Each workload builds `n` entities plus one day of inputs from `rng` and
+# returns a closure that advances every entity once. Building happens
+# outside the timer.
+
+Workload = Callable[[], None]
+
+
+def brightness_workload(n: int, rng: random.Random) -> Workload:
+    bd = load("brightness-decay")
+    domains = list(bd.HALF_LIVES)
+    difficulties = list(bd.DIFFICULTY_MULTIPLIERS)
+    stars, days = [], []
+    for _ in range(n):
+        stars.append(bd.Star(brightness=rng.uniform(0.1, 0.9), domain=rng.choice(domains),
+                             streak_days=rng.randint(0, 20), days_since_engaged=rng.randint(0, 30),
+                             returning=rng.random() < 0.1))
+        engaged = rng.random() < 0.6
+        days.append(bd.DayEvents(
+            experiments=[bd.Experiment(difficulty=rng.choice(difficulties), alignment=rng.uniform(0.5, 1.0),
+                                       is_novel=rng.random() < 0.1)] if engaged else [],
+            insights=[bd.Insight(depth=rng.choice(list(bd.DEPTH_MULTIPLIERS)))] if rng.random() < 0.3 else [],
+            skips=0 if engaged else rng.randint(0, 1),
+            contradictions=1 if rng.random() < 0.02 else 0,
+            engaged=engaged,
+        ))
+    update_star = bd.update_star
+
+    def run():
+        for star, events in zip(stars, days):
+            update_star(star, events)
+    return run
+
+
+def constellation_workload(simulation: str) -> Callable[[int, random.Random], Workload]:
+    """simulate_day workload for any constellation-states version."""
+    def build(n: int, rng: random.Random) -> Workload:
+        cs = load(simulation)
+        domains = list(cs.HALF_LIVES)
+        difficulties = list(cs.DIFFICULTY_MULTIPLIERS)
+        stars, actions, skips = [], [], []
+        for i in range(n):
+            stars.append(cs.Star(name=f"s{i}", domain=rng.choice(domains), brightness=rng.uniform(0.1, 0.9),
+                                 streak_days=rng.randint(0, 20), is_dark_candidate=rng.random() < 0.1))
+            completed = rng.choice((0, 0, 1, 1, 2))
+            actions.append(cs.DayAction(experiments_completed=completed,
+                                        experiments_skipped=0 if completed else rng.randint(0, 1),
+                                        difficulty=rng.choice(difficulties),
+                                        insight_gained=rng.random() < 0.3,
+                                        contradiction_detected=rng.random() < 0.02))
+            skips.append(0 if completed else rng.randint(1, 4))
+        simulate_day = cs.simulate_day
+
+        def run():
+            for star, action, skipped in zip(stars, actions, skips):
+                simulate_day(star, action, skipped)
+        return run
+    return build
+
+
+def connection_workload(n: int, rng: random.Random) -> Workload:
+    cf = load("connection-formation")
+    kinds = list(cf.ConnectionType)
+    evidence = list(cf.EVIDENCE_IMPACTS)
+    connections, actions = [], []
+    for i in range(n):
+        connections.append(cf.Connection(star_a=f"a{i}", star_b=f"b{i}", strength=rng.uniform(0.0, 0.8),
+                                         type=rng.choice(kinds), evidence_count=rng.randint(0, 10)))
+        found = rng.sample(evidence, rng.choice((0, 0, 1, 1, 2, 3)))
+        actions.append(cf.DayAction(evidence_types=found, user_engaged=bool(found) or rng.random() < 0.3))
+    simulate_day = cf.simulate_day
+
+    def run():
+        for connection, action in zip(connections, actions):
+            simulate_day(connection, action)
+    return run
+
+
+def phase_workload(n: int, rng: random.Random) -> Workload:
+    pt = load("phase-transitions")
+    states = list(pt.StarState)
+    phases = list(pt.Phase)
+    constellations = []
+    for _ in range(n):
+        count = rng.randint(3, 10)
+        stars = [pt.Star(brightness=rng.uniform(0.1, 0.95), state=rng.choice(states), is_dark=rng.random() < 0.1)
+                 for _ in range(count)]
+        pairs = [(a, b, 0.7) for a in range(count) for b in range(a + 1, count)]
+        constellations.append(pt.Constellation(
+            stars=stars, connections=rng.sample(pairs, rng.randint(0, min(12, len(pairs)))),
+            phase=rng.choice(phases), days_in_phase=rng.randint(0, 30),
+            days_below_threshold=rng.randint(0, 15),
+        ))
+    update_phase = pt.update_phase
+
+    def run():
+        for constellation in constellations:
+            update_phase(constellation)
+    return run
+
+
+def journey_workload(n: int, rng: random.Random) -> Workload:
+    wk = load("the-walk")
+    difficulties = list(wk.EXPERIMENT_THRUST)
+    timeframes = list(wk.DIFFICULTY_MULTIPLIERS)
+    journeys, days = [], []
+    for i in range(n):
+        journeys.append(wk.Journey(velocity=rng.uniform(0.0, 0.6), momentum=rng.uniform(0.0, 0.3),
+                                   days_inactive=rng.randint(0, 20), milestones_reached=rng.randint(0, 4)))
+        engaged = rng.random() < 0.6
+        reached = engaged and rng.random() < 0.05
+        days.append(wk.DayEvents(
+            experiments=[wk.Experiment(difficulty=rng.choice(difficulties), relevance=rng.uniform(0.5, 1.0))]
+            if engaged else [],
+            reached_milestone=reached,
+            milestone=wk.Milestone(id=f"m{i}", timeframe=rng.choice(timeframes)) if reached else None,
+            engaged=engaged,
+        ))
+    update_journey = wk.update_journey
+
+    def run():
+        for journey, events in zip(journeys, days):
+            update_journey(journey, events)
+    return run
+
+
+def horizon_workload(n: int, rng: random.Random) -> Workload:
+    hz = load("the-horizon")
+    horizons, activities = [], []
+    for _ in range(n):
+        walks = [hz.Walk(velocity=rng.uniform(0.0, 0.5)) for _ in range(rng.randint(1, 3))]
+        horizons.append(hz.Horizon(walks=walks, slingshot_velocity=rng.uniform(0.0, 0.5),
+                                   days_drifting=rng.randint(0, 40)))
+        activities.append([rng.random() < 0.6 for _ in walks])
+    update_horizon_daily = hz.update_horizon_daily
+
+    def run():
+        for horizon, engaged in zip(horizons, activities):
+            update_horizon_daily(horizon, engaged)
+    return run
+
+
+def selection_workload(n: int, rng: random.Random) -> Workload:
+    es = load("experiment-selection")
+    kinds = list(es.ConnectionType)
+    stresses = list(es.STRESS_TO_ENERGY)
+    contexts = []
+    for _ in range(n):
+        context = es.new_journey_context()
+        for star in context.stars:
+            for _ in range(3):
+                star.record_brightness(round(rng.uniform(0.1, 0.9), 3))
+            star.days_since_experiment = rng.randint(0, 10)
+            star.is_dark = star.brightness < 0.25 and rng.random() < 0.5
+            star.refresh_state()
+        for _ in range(rng.randint(0, 4)):
+            source, target = rng.sample(context.stars, 2)
+            context.connections.append(es.Connection(type=rng.choice(kinds), source=source, target=target,
+                                                     strength=rng.uniform(0.3, 1.0)))
+        context.reindex()
+        context.user.stress_state = rng.choice(stresses)
+        context.user.refresh_capacity()
+        contexts.append(context)
+    select_experiments = es.select_experiments
+    current_time = es.JOURNEY_EPOCH
+
+    def run():
+        for context in contexts:
+            select_experiments(context, current_time)
+    return run
+
+
+def compatibility_workload(n: int, rng: random.Random) -> Workload:
+    cm = load("compatibility")
+    users = cm.generate_cohort(max(2, min(n, 2000)), seed=rng.randrange(1 << 30))
+    pairs = [tuple(rng.sample(users, 2)) for _ in range(n)]
+    compute_compatibility_profile = cm.compute_compatibility_profile
+
+    def run():
+        for user_a, user_b in pairs:
+            compute_compatibility_profile(user_a, user_b)
+    return run
+
+
+def daily_tick_workload(n: int, rng: random.Random) -> Workload:
+    dt = load("daily-tick")
+    seed = rng.randrange(1 << 30)
+    population = dt.generate_population(n, seed)
+    inputs = dt.generate_day_inputs(population, dt.engagement_rates(population, seed), rng)
+    tick_day = dt.tick_day
+
+    def run():
+        tick_day(population, inputs)
+    return run
+
+
+@dataclass
+class Benchmark:
+    name: str
+    simulation: str
+    build: Callable[[int, random.Random], Workload]
+
+
+BENCHMARKS = [
+    Benchmark("update_star", "brightness-decay", brightness_workload),
+    Benchmark("constellation.simulate_day", "constellation-states", constellation_workload("constellation-states")),
+    Benchmark("constellation_v2.simulate_day", "constellation-states-v2",
+              constellation_workload("constellation-states-v2")),
+    Benchmark("constellation_v3.simulate_day", "constellation-states-v3",
+              constellation_workload("constellation-states-v3")),
+    Benchmark("connection.simulate_day", "connection-formation", connection_workload),
+    Benchmark("update_phase", "phase-transitions", phase_workload),
+    Benchmark("update_journey", "the-walk", journey_workload),
+    Benchmark("update_horizon_daily", "the-horizon", horizon_workload),
+    Benchmark("select_experiments", "experiment-selection", selection_workload),
+    Benchmark("compute_compatibility_profile", "compatibility", compatibility_workload),
+    Benchmark("tick_day", "daily-tick", daily_tick_workload),
+]
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    simulation: str
+    scale: int
+    rounds: int
+    samples: List[float] = field(default_factory=list)  # seconds per sample
+    peak_bytes: int = 0
+    source: str = ""  # digest of the simulation script that was timed
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.scale}"
+
+    @property
+    def ops(self) -> int:
+        return self.scale * self.rounds
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+    @property
+    def mean(self) -> float:
+        return statistics.fmean(self.samples)
+
+    @property
+    def stdev(self) -> float:
+        return statistics.stdev(self.samples) if len(self.samples) > 1 else 0.0
+
+    @property
+    def per_round(self) -> float:
+        """Seconds per pass over every entity, at the median sample."""
+        return self.median / self.rounds
+
+    @property
+    def throughput(self) -> float:
+        """Entity updates per second, at the median sample."""
+        return self.ops / self.median if self.median > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data.update(median=self.median, mean=self.mean, stdev=self.stdev, per_round=self.per_round,
+                    throughput=self.throughput)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BenchmarkResult":
+        return cls(name=data["name"], simulation=data["simulation"], scale=data["scale"],
+                   rounds=data["rounds"], samples=list(data["samples"]), peak_bytes=data["peak_bytes"],
+                   source=data.get("source", ""))
+
+
+def time_sample(benchmark: Benchmark, scale: int, rounds: int, seed: int = SEED) -> float:
+    """Seconds for `rounds` passes over a freshly built workload, with gc off."""
+    run = benchmark.build(scale, random.Random(seed))
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            run()
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def calibrate(benchmark: Benchmark, scale: int, seed: int = SEED) -> int:
+    """Passes per sample, stepping 1, 2, 5, 10, ... like timeit's autorange."""
+    step = 1
+    while True:
+        for rounds in (step, 2 * step, 5 * step):
+            if time_sample(benchmark, scale, rounds, seed) >= MIN_SAMPLE_SECONDS:
+                return rounds
+        step *= 10
+
+
+@dataclass
+class Job:
+    benchmark: Benchmark
+    scale: int
+    repeats: int
+    rounds: Optional[int] = None  # calibrated when None
+
+
+def peak_memory(benchmark: Benchmark, scale: int, seed: int = SEED) -> int:
+    """Peak traced bytes over one pass of a freshly built workload.
+
+    Workloads mutate their entities, so each extra pass would grow the
+    histories they carry and tie the peak to the calibrated pass count.
+    """
+    run = benchmark.build(scale, random.Random(seed))
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(jobs: List[Job], seed: int = SEED) -> List[BenchmarkResult]:
+    """Time every job with samples interleaved round-robin, then trace peak memory.
+
+    A slow spell on the machine then costs each benchmark a sample instead of
+    costing one benchmark all of its samples, and the median absorbs it.
+    Calibrating a job's pass count also warms it up.
+    """
+    results = []
+    for job in jobs:
+        rounds = job.rounds if job.rounds is not None else calibrate(job.benchmark, job.scale, seed)
+        results.append(BenchmarkResult(job.benchmark.name, job.benchmark.simulation, job.scale, rounds=rounds,
+                                       source=source_digest(job.benchmark.simulation)))
+
+    for sample in range(max((job.repeats for job in jobs), default=0)):
+        for job, result in zip(jobs, results):
+            if sample < job.repeats:
+                result.samples.append(time_sample(job.benchmark, job.scale, result.rounds, seed))
+
+    for job, result in zip(jobs, results):
+        result.peak_bytes = peak_memory(job.benchmark, job.scale, seed)
+    return results
+
+
+# =============================================================================
+# REGRESSION CHECK
+# =============================================================================
+
+@dataclass
+class Finding:
+    key: str
+    metric: str      # "time" or "memory"
+    change: float    # relative change against the baseline
+    score: float     # run-to-run deviations for time, 0 for memory
+    regression: bool
+
+
+@dataclass
+class RunNoise:
+    """Relative run-to-run stdev of benchmark medians (stdev of their logs)."""
+    pooled: Optional[float] = None
+    by_key: Dict[str, float] = field(default_factory=dict)
+
+    def for_key(self, key: str) -> float:
+        """A benchmark's own spread, never below the pooled one or MIN_RUN_NOISE."""
+        if self.pooled is None:
+            return DEFAULT_RUN_NOISE
+        return max(MIN_RUN_NOISE, self.pooled, self.by_key.get(key, 0.0))
+
+
+def machine_drift(log_ratios: List[float]) -> float:
+    """Log speed change shared by a whole run: the median over its benchmarks.
+
+    The simulations share no code, so a change that moves most of them at
+    once is the machine (clock scaling, a noisy neighbour), not the tree.
+    Too few benchmarks to tell the two apart means no correction.
+    """
+    return statistics.median(log_ratios) if len(log_ratios) >= DRIFT_MIN_RESULTS else 0.0
+
+
+def run_noise(runs: List[dict], window: int = NOISE_WINDOW) -> RunNoise:
+    """Run-to-run noise from recent history recorded on this machine.
+
+    Each benchmark's per-pass medians are compared only with runs of the
+    same code and pass count, so real changes never count as noise. Each
+    run's machine drift is taken out before the log variances are pooled
+    across benchmarks.
+    """
+    groups: Dict[tuple, Dict[int, float]] = {}
+    for r, run in enumerate(runs[-window:]):
+        if run.get("platform") != platform.platform() or run.get("python") != platform.python_version():
+            continue
+        for data in run["results"]:
+            median = statistics.median(data["samples"])
+            if median > 0:
+                group = (f"{data['name']}@{data['scale']}", data["rounds"], data.get("source", ""))
+                groups.setdefault(group, {})[r] = math.log(median / data["rounds"])
+
+    # Deviation of each run from its group's mean, then less that run's drift
+    deviations: Dict[int, Dict[tuple, float]] = {}
+    for group, logs in groups.items():
+        if len(logs) < 2:
+            continue
+        mean = statistics.fmean(logs.values())
+        for r, value in logs.items():
+            deviations.setdefault(r, {})[group] = value - mean
+    for by_group in deviations.values():
+        drift = machine_drift(list(by_group.values()))
+        for group in by_group:
+            by_group[group] -= drift
+
+    noise, squares, dof = RunNoise(), 0.0, 0
+    for group, logs in groups.items():
+        if len(logs) < 2:
+            continue
+        residuals = [deviations[r][group] for r in logs]
+        squares += sum(x * x for x in residuals)
+        dof += len(residuals) - 1
+        if len(residuals) >= NOISE_MIN_RUNS:
+            spread = math.sqrt(sum(x * x for x in residuals) / (len(residuals) - 1))
+            noise.by_key[group[0]] = max(noise.by_key.get(group[0], 0.0), spread)
+    if dof >= NOISE_MIN_RUNS:
+        noise.pooled = math.sqrt(squares / dof)
+    return noise
+
+
+def log_ratios(results: List[BenchmarkResult], baseline: Dict[str, BenchmarkResult]) -> Dict[str, float]:
+    """Log of current over baseline time per pass, for benchmarks in both."""
+    ratios = {}
+    for result in results:
+        base = baseline.get(result.key)
+        if base is not None and base.per_round > 0 and result.per_round > 0:
+            ratios[result.key] = math.log(result.per_round / base.per_round)
+    return ratios
+
+
+def compare(results: List[BenchmarkResult], baseline: Dict[str, BenchmarkResult],
+            noise: Optional[RunNoise] = None, drift: float = 0.0) -> List[Finding]:
+    """Timing changes beyond run-to-run noise, and memory growth, against the baseline.
+
+    Timings are judged after taking out `drift` (see machine_drift).
+    """
+    noise = noise or RunNoise()
+    ratios = log_ratios(results, baseline)
+    findings = []
+    for result in results:
+        base = baseline.get(result.key)
+        if base is None:
+            continue
+
+        if result.key in ratios:
+            shift = ratios[result.key] - drift
+            # Baseline and current run each carry the noise, hence sqrt(2)
+            score = shift / (math.sqrt(2) * noise.for_key(result.key))
+            change = math.exp(shift) - 1
+            if abs(change) > REGRESSION_MIN_RATIO and abs(score) > REGRESSION_SIGMAS:
+                findings.append(Finding(result.key, "time", change, score, regression=change > 0))
+
+        growth = result.peak_bytes - base.peak_bytes
+        if growth > MEMORY_MIN_BYTES and growth > base.peak_bytes * MEMORY_MIN_RATIO:
+            findings.append(Finding(result.key, "memory", growth / max(1, base.peak_bytes), 0.0, regression=True))
+    return findings
+
+
+# =============================================================================
+# HISTORY
+# =============================================================================
+
+def current_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=MECHANICS,
+                             capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def make_run(results: List[BenchmarkResult]) -> dict:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [result.to_dict() for result in results],
+    }
+
+
+def load_history(path: Path = HISTORY_FILE) -> dict:
+    return json.loads(path.read_text()) if path.exists() else {"runs": []}
+
+
+def append_history(run: dict, path: Path = HISTORY_FILE):
+    history = load_history(path)
+    history["runs"].append(run)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(history, indent=2) + "\n")
+
+
+def load_baseline(path: Path = BASELINE_FILE) -> Dict[str, BenchmarkResult]:
+    if not path.exists():
+        return {}
+    results = [BenchmarkResult.from_dict(data) for data in json.loads(path.read_text())["results"]]
+    return {result.key: result for result in results}
+
+
+def save_baseline(run: dict, path: Path = BASELINE_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(run, indent=2) + "\n")
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def print_result(result: BenchmarkResult):
+    print(f"  {result.name:<31} {result.scale:>7,} | {result.median * 1000:>10.2f} ms "
+          f"±{result.stdev / result.mean if result.mean else 0:>5.1%} | "
+          f"{result.throughput:>12,.0f} ops/s | {result.peak_bytes / 1024:>10,.0f} KiB", flush=True)
+
+
+def print_findings(findings: List[Finding], baseline_size: int, noise: RunNoise, drift: float = 0.0):
+    print("\n" + "=" * 60)
+    print("REGRESSION CHECK")
+    print("=" * 60)
+    if not baseline_size:
+        print("  No baseline stored; run with --save-baseline to create one.")
+        return
+    if noise.pooled is None:
+        print(f"  Run-to-run noise: {DEFAULT_RUN_NOISE:.1%} assumed (too little history on this machine)")
+    else:
+        print(f"  Run-to-run noise: {noise.pooled:.1%} pooled over recent history")
+    if drift:
+        print(f"  Machine drift: {math.exp(drift) - 1:+.1%} across all benchmarks, taken out")
+    if not findings:
+        print(f"  No significant changes against {baseline_size} baseline results.")
+        return
+    for finding in findings:
+        status = "✗ SLOWER" if finding.regression else "✓ FASTER"
+        if finding.metric == "memory":
+            status = "✗ MEMORY"
+        detail = f"{finding.score:+.1f} sigma" if finding.metric == "time" else "peak"
+        print(f"  {status}: {finding.key} {finding.change:+.1%} ({detail})")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Mechanics Benchmarks")
+    parser.add_argument("--scales", type=str, default=",".join(str(s) for s in SCALES),
+                        help="Comma-separated entity counts")
+    parser.add_argument("--only", action="append", help="Benchmark name to run (repeatable)")
+    parser.add_argument("--repeats", type=int, help="Timed samples per benchmark (default: scale-dependent)")
+    parser.add_argument("--history", type=Path, default=HISTORY_FILE, help="JSON history file to append to")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(",") if s]
+    names = {b.name for b in BENCHMARKS}
+    for name in args.only or []:
+        if name not in names:
+            print(f"Unknown benchmark: {name}")
+            print(f"Available: {', '.join(b.name for b in BENCHMARKS)}")
+            return 2
+    selected = [b for b in BENCHMARKS if not args.only or b.name in args.only]
+
+    print("=" * 60)
+    print("MECHANICS BENCHMARKS")
+    print(f"Python {platform.python_version()}, seed {SEED}, scales {scales}")
+    print("=" * 60)
+
+    # Read both before this run is recorded, so it cannot vouch for itself
+    baseline = load_baseline(args.baseline)
+    noise = run_noise(load_history(args.history)["runs"])
+
+    jobs = []
+    for benchmark in selected:
+        for scale in scales:
+            repeats = args.repeats or (LARGE_REPEATS if scale >= LARGE_SCALE else REPEATS)
+            base = baseline.get(f"{benchmark.name}@{scale}")
+            # Reuse the baseline's pass count unless its samples were too short to trust
+            rounds = base.rounds if base and base.median >= MIN_SAMPLE_SECONDS / 2 else None
+            jobs.append(Job(benchmark, scale, repeats, rounds))
+
+    results = run_benchmarks(jobs)
+    for result in results:
+        print_result(result)
+
+    run = make_run(results)
+    append_history(run, args.history)
+    print(f"\nAppended {len(results)} results to {args.history}")
+
+    drift = machine_drift(list(log_ratios(results, baseline).values()))
+    findings = compare(results, baseline, noise, drift)
+    print_findings(findings, len(baseline), noise, drift)
+
+    if args.save_baseline:
+        save_baseline(run, args.baseline)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    return 1 if any(f.regression for f in findings) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,9 +7,19 @@ Simulates the compatibility overlay algorithm from 02-blood.md to verify
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Dict, Optional, Tuple
-from collections import defaultdict
-from math import sqrt
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Sequence, Set, Tuple, Union
+from array import array
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from math import isnan, sqrt
+import bisect
+import heapq
+import mmap
+import pickle
+import random
+import struct
+import sys
 from datetime import datetime as _datetime  # Reserved for future use
 
 
@@ -22,6 +32,10 @@ PROXIMITY_SAME_DOMAIN = 1.0
 PROXIMITY_ADJACENT = 0.0  # Reserved for future cross-domain
 PROXIMITY_DIFFERENT = 0.0
 
+# Adjacent-domain table (empty until cross-domain proximity is designed).
+# Pairs are unordered; adjacency scores PROXIMITY_ADJACENT.
+ADJACENT_DOMAINS: Dict[str, Set[str]] = {}
+
 # Interaction detection constants
 MIN_INTERACTION_PROXIMITY = 0.5
 MIN_INTERACTION_STRENGTH = 0.2
@@ -122,6 +136,21 @@ class Star:
     domain: str
     brightness: float = 0.5
     state: StarState = StarState.STEADY
+    # Set when a User adopts the star; edits to PROJECTED_STAR_FIELDS bump its version
+    _owner: Optional["User"] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value):
+        object.__setattr__(self, name, value)
+        if name in PROJECTED_STAR_FIELDS:
+            owner = self.__dict__.get('_owner')
+            if owner is not None:
+                owner.touch()
+
+    def __getstate__(self):
+        # The owner re-adopts its stars on unpickle; a lone star travels without it
+        state = dict(self.__dict__)
+        state.pop('_owner', None)
+        return state
 
     @classmethod
     def from_brightness(cls, id: str, name: str, domain: str, brightness: float) -> "Star":
@@ -146,16 +175,115 @@ class Star:
 
 @dataclass
 class PrivacySettings:
-    hidden_stars: set = field(default_factory=set)
+    # Frozen so a change has to be an assignment the owner sees (hidden_stars = hidden_stars | {id})
+    hidden_stars: frozenset = field(default_factory=frozenset)
     blur_brightness: bool = False
+    _owner: Optional["User"] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value):
+        if name == 'hidden_stars':
+            value = frozenset(value)
+        object.__setattr__(self, name, value)
+        if name != '_owner':
+            owner = self.__dict__.get('_owner')
+            if owner is not None:
+                owner.touch()
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop('_owner', None)
+        return state
+
+
+# Star fields VisibleProjection reads; assigning one moves the owner's version
+PROJECTED_STAR_FIELDS = frozenset({'brightness', 'state'})
 
 
 @dataclass
 class User:
+    """A constellation plus its privacy settings.
+
+    `version` moves whenever anything the projection reads is assigned:
+    the stars list, the privacy settings, a star's brightness or state,
+    or a privacy field. touch() is still needed after editing the stars
+    list in place (append, remove). A star reports to the last user that
+    adopted it, so users should not share Star objects.
+    """
     id: str
     name: str
     stars: List[Star] = field(default_factory=list)
     privacy: PrivacySettings = field(default_factory=PrivacySettings)
+    version: int = 0
+    _projection: Optional["VisibleProjection"] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __setattr__(self, name: str, value):
+        object.__setattr__(self, name, value)
+        if name in ('stars', 'privacy'):
+            self._adopt()
+            if 'version' in self.__dict__:
+                self.touch()
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._adopt()
+
+    def _adopt(self):
+        for star in self.__dict__.get('stars', ()):
+            object.__setattr__(star, '_owner', self)
+        privacy = self.__dict__.get('privacy')
+        if privacy is not None:
+            object.__setattr__(privacy, '_owner', self)
+
+    def touch(self):
+        """Mark the constellation as changed."""
+        self.version += 1
+
+
+@dataclass
+class VisibleProjection:
+    """What another user can see of one constellation, flattened once.
+
+    Positions index `stars`; `brightness` holds effective (possibly blurred)
+    values and `buckets` maps each domain to its star positions. Domain means
+    sit in `means`, aligned with `domains` (first-seen order).
+    """
+    version: int
+    stars: List[Star]
+    brightness: array
+    buckets: Dict[str, List[int]]
+    domains: Tuple[str, ...]
+    means: array
+    certainty: float
+
+    @classmethod
+    def build(cls, user: "User") -> "VisibleProjection":
+        stars = get_visible_stars(user)
+        brightness = array('d')
+        by_domain = defaultdict(list)
+        buckets = defaultdict(list)
+        for position, star in enumerate(stars):
+            value = get_effective_brightness(star, user.privacy)
+            brightness.append(value)
+            by_domain[star.domain].append(value)
+            buckets[star.domain].append(position)
+
+        domains = tuple(by_domain)
+        means = array('d', (sum(values) / len(values) for values in by_domain.values()))
+        certainty = 1.0 if not user.privacy.blur_brightness else BLUR_CERTAINTY
+        return cls(
+            version=user.version,
+            stars=stars,
+            brightness=brightness,
+            buckets=dict(buckets),
+            domains=domains,
+            means=means,
+            certainty=certainty,
+        )
+
+    def domain_strengths(self) -> Dict[str, float]:
+        return dict(zip(self.domains, self.means))
 
 
 @dataclass
@@ -168,6 +296,69 @@ class Interaction:
     final_strength: float = 0.0
 
 
+@dataclass
+class InteractionColumns:
+    """Struct-of-arrays interaction storage for one profile.
+
+    Row k pairs stars_a[star_a[k]] with stars_b[star_b[k]] (the two users'
+    visible star lists); type_code indexes INTERACTION_TYPES. Certainty is
+    the same for every interaction of a profile, so it is stored once.
+    """
+    stars_a: List[Star]
+    stars_b: List[Star]
+    certainty: float
+    star_a: array = field(default_factory=lambda: array('I'))
+    star_b: array = field(default_factory=lambda: array('I'))
+    type_code: array = field(default_factory=lambda: array('b'))
+    strength: array = field(default_factory=lambda: array('d'))
+    final_strength: array = field(default_factory=lambda: array('d'))
+
+    def __len__(self) -> int:
+        return len(self.type_code)
+
+    def append(self, a: int, b: int, code: int, strength: float, final_strength: float):
+        self.star_a.append(a)
+        self.star_b.append(b)
+        self.type_code.append(code)
+        self.strength.append(strength)
+        self.final_strength.append(final_strength)
+
+    def interaction(self, k: int) -> "Interaction":
+        return Interaction(
+            type=INTERACTION_TYPES[self.type_code[k]],
+            star_a=self.stars_a[self.star_a[k]],
+            star_b=self.stars_b[self.star_b[k]],
+            strength=self.strength[k],
+            certainty=self.certainty,
+            final_strength=self.final_strength[k]
+        )
+
+    def view(self) -> "InteractionView":
+        return InteractionView(self)
+
+
+class InteractionView(Sequence):
+    """Read-only list of Interactions, built from columns only when indexed."""
+
+    def __init__(self, columns: InteractionColumns):
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.columns.interaction(k) for k in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("interaction index out of range")
+        return self.columns.interaction(index)
+
+    def __repr__(self) -> str:
+        return f"InteractionView({len(self)} interactions)"
+
+
 @dataclass
 class ProfileScores:
     resonances: float = 0.0
@@ -180,7 +371,7 @@ class ProfileScores:
 
 @dataclass
 class CompatibilityProfile:
-    interactions: List[Interaction] = field(default_factory=list)
+    interactions: Union[List[Interaction], InteractionView] = field(default_factory=list)
     scores: ProfileScores = field(default_factory=ProfileScores)
     complement_score: float = 0.0
     dynamic_type: DynamicType = DynamicType.COMPLEX
@@ -242,6 +433,15 @@ def get_blurred_brightness(star: Star) -> float:
     return BLURRED_VALUES.get(star.state.value, 0.5)
 
 
+def project(user: User) -> VisibleProjection:
+    """Cached visible projection; rebuilt when the user's version moves."""
+    projection = user._projection
+    if projection is None or projection.version != user.version:
+        projection = VisibleProjection.build(user)
+        user._projection = projection
+    return projection
+
+
 # ============================================================================
 # PROXIMITY
 # ============================================================================
@@ -250,10 +450,32 @@ def calculate_proximity(star_a: Star, star_b: Star) -> float:
     """Calculate proximity based on domain relationship."""
     if star_a.domain == star_b.domain:
         return PROXIMITY_SAME_DOMAIN
-    # Future: check adjacent domains
+    if star_b.domain in ADJACENT_DOMAINS.get(star_a.domain, ()):
+        return PROXIMITY_ADJACENT
     return PROXIMITY_DIFFERENT
 
 
+def proximate_domains(domain: str) -> List[str]:
+    """Domains whose stars can reach MIN_INTERACTION_PROXIMITY with this one."""
+    domains = [domain]
+    if PROXIMITY_ADJACENT >= MIN_INTERACTION_PROXIMITY:
+        domains.extend(sorted(ADJACENT_DOMAINS.get(domain, ())))
+    return domains
+
+
+def candidate_partners(domain: str, buckets: Dict[str, List[int]]) -> List[int]:
+    """Positions on the other side close enough to interact, in list order."""
+    domains = proximate_domains(domain)
+    if len(domains) == 1:
+        return buckets.get(domain, [])
+
+    merged = []
+    for near in domains:
+        merged.extend(buckets.get(near, ()))
+    merged.sort()
+    return merged
+
+
 # ============================================================================
 # INTERACTION TYPE DETECTION
 # ============================================================================
@@ -412,47 +634,57 @@ def calculate_final_strength(
 # INTERACTION DETECTION PIPELINE
 # ============================================================================
 
-def detect_interactions(user_a: User, user_b: User) -> List[Interaction]:
+def detect_interactions(user_a: User, user_b: User, kernel: Optional["InteractionKernel"] = None) -> List[Interaction]:
     """Detect all interactions between two users' constellations."""
-    interactions = []
-
-    stars_a = get_visible_stars(user_a)
-    stars_b = get_visible_stars(user_b)
-
-    for star_a in stars_a:
-        for star_b in stars_b:
+    return detect_projected_interactions(project(user_a), project(user_b), kernel)
+
+
+def detect_projected_interactions(
+    view_a: VisibleProjection,
+    view_b: VisibleProjection,
+    kernel: Optional["InteractionKernel"] = None
+) -> List[Interaction]:
+    """Interaction pipeline over two precomputed projections."""
+    return list(detect_interaction_columns(view_a, view_b, kernel).view())
+
+
+def detect_interaction_columns(
+    view_a: VisibleProjection,
+    view_b: VisibleProjection,
+    kernel: Optional["InteractionKernel"] = None
+) -> InteractionColumns:
+    """Interaction pipeline over two projections, into columnar storage."""
+    kernel = kernel or exact_kernel
+
+    stars_a, stars_b = view_a.stars, view_b.stars
+    brightness_a_all, brightness_b_all = view_a.brightness, view_b.brightness
+    certainty = max(view_a.certainty * view_b.certainty, MIN_CERTAINTY)
+    columns = InteractionColumns(stars_a=stars_a, stars_b=stars_b, certainty=certainty)
+
+    # Only same-domain (and, later, adjacent-domain) buckets can clear
+    # MIN_INTERACTION_PROXIMITY, so pair within matching buckets only.
+    for position_a, star_a in enumerate(stars_a):
+        brightness_a = brightness_a_all[position_a]
+        for position_b in candidate_partners(star_a.domain, view_b.buckets):
+            star_b = stars_b[position_b]
             proximity = calculate_proximity(star_a, star_b)
 
             if proximity < MIN_INTERACTION_PROXIMITY:
                 continue
 
-            brightness_a = get_effective_brightness(star_a, user_a.privacy)
-            brightness_b = get_effective_brightness(star_b, user_b.privacy)
-
-            if brightness_a is None or brightness_b is None:
-                continue
+            brightness_b = brightness_b_all[position_b]
 
-            result = detect_interaction_type(brightness_a, brightness_b)
+            result = kernel(brightness_a, brightness_b)
             if result is None:
                 continue
 
-            interaction_type, base_strength = result
-            final_strength, certainty = calculate_final_strength(
-                star_a, star_b, base_strength,
-                user_a.privacy, user_b.privacy
-            )
+            code, base_strength, brightness_factor = result
+            final_strength = clamp(base_strength * brightness_factor * certainty, 0.0, 1.0)
 
             if final_strength >= MIN_INTERACTION_STRENGTH:
-                interactions.append(Interaction(
-                    type=interaction_type,
-                    star_a=star_a,
-                    star_b=star_b,
-                    strength=base_strength,
-                    certainty=certainty,
-                    final_strength=final_strength
-                ))
+                columns.append(position_a, position_b, code, base_strength, final_strength)
 
-    return interactions
+    return columns
 
 
 # ============================================================================
@@ -488,27 +720,47 @@ def compute_profile_scores(interactions: List[Interaction]) -> ProfileScores:
     )
 
 
-def get_domain_strengths(user: User) -> Dict[str, float]:
-    """Get average brightness per domain for visible stars."""
-    visible = get_visible_stars(user)
+def compute_column_scores(columns: InteractionColumns) -> ProfileScores:
+    """compute_profile_scores over columns, summing in the same order."""
+    by_type: Dict[int, float] = {}
+    for code, final_strength in zip(columns.type_code, columns.final_strength):
+        by_type[code] = by_type.get(code, 0) + final_strength
 
-    by_domain = defaultdict(list)
-    for star in visible:
-        brightness = get_effective_brightness(star, user.privacy)
-        if brightness is not None:
-            by_domain[star.domain].append(brightness)
+    weighted_counts = {}
+    total_weight = 0.0
+    for code, weight in by_type.items():
+        weighted_counts[INTERACTION_TYPES[code]] = weight
+        total_weight += weight
+
+    if total_weight > 0:
+        percentages = {k: v / total_weight for k, v in weighted_counts.items()}
+    else:
+        percentages = {}
+
+    return ProfileScores(
+        resonances=percentages.get(InteractionType.RESONANCE, 0),
+        tensions=percentages.get(InteractionType.TENSION, 0),
+        growth_edges=percentages.get(InteractionType.GROWTH_EDGE, 0),
+        shadow_mirrors=percentages.get(InteractionType.SHADOW_MIRROR, 0),
+        raw_counts=weighted_counts,
+        total_weight=total_weight
+    )
 
-    result = {}
-    for domain, brightnesses in by_domain.items():
-        result[domain] = sum(brightnesses) / len(brightnesses)
 
-    return result
+def get_domain_strengths(user: User) -> Dict[str, float]:
+    """Get average brightness per domain for visible stars."""
+    return project(user).domain_strengths()
 
 
 def calculate_complement_score(user_a: User, user_b: User) -> float:
     """Calculate how users balance each other across domains."""
-    domains_a = get_domain_strengths(user_a)
-    domains_b = get_domain_strengths(user_b)
+    return complement_from_projections(project(user_a), project(user_b))
+
+
+def complement_from_projections(view_a: VisibleProjection, view_b: VisibleProjection) -> float:
+    """Complement score over two precomputed projections."""
+    domains_a = view_a.domain_strengths()
+    domains_b = view_b.domain_strengths()
 
     all_domains = set(domains_a.keys()) | set(domains_b.keys())
 
@@ -544,11 +796,15 @@ def calculate_complement_score(user_a: User, user_b: User) -> float:
 
 def determine_dynamic_type(scores: ProfileScores, complement_score: float) -> DynamicType:
     """Determine overall relationship dynamic."""
-    shadow = scores.shadow_mirrors
-    tension = scores.tensions
-    growth = scores.growth_edges
-    resonance = scores.resonances
+    return dynamic_type_for(
+        scores.shadow_mirrors, scores.tensions, scores.growth_edges,
+        scores.resonances, complement_score
+    )
+
 
+def dynamic_type_for(shadow: float, tension: float, growth: float,
+                     resonance: float, complement_score: float) -> DynamicType:
+    """Dynamic type from the four interaction shares and complement score."""
     # Priority 1: MIRRORING (shared wounds dominate)
     if shadow >= DYNAMIC_THRESHOLD_MIRRORING:
         return DynamicType.MIRRORING
@@ -575,11 +831,20 @@ def determine_dynamic_type(scores: ProfileScores, complement_score: float) -> Dy
 
 def calculate_confidence(scores: ProfileScores, dynamic_type: DynamicType, complement_score: float) -> float:
     """Calculate how clearly one type dominates."""
+    return confidence_for(
+        dynamic_type, scores.shadow_mirrors, scores.tensions,
+        scores.growth_edges, scores.resonances, complement_score
+    )
+
+
+def confidence_for(dynamic_type: DynamicType, shadow: float, tension: float,
+                   growth: float, resonance: float, complement_score: float) -> float:
+    """Confidence from the four interaction shares and complement score."""
     type_scores = {
-        DynamicType.MIRRORING: scores.shadow_mirrors,
-        DynamicType.CHALLENGING: scores.tensions,
-        DynamicType.GROWTH: scores.growth_edges,
-        DynamicType.AMPLIFYING: scores.resonances,
+        DynamicType.MIRRORING: shadow,
+        DynamicType.CHALLENGING: tension,
+        DynamicType.GROWTH: growth,
+        DynamicType.AMPLIFYING: resonance,
         DynamicType.BALANCING: complement_score,
         DynamicType.COMPLEX: 0
     }
@@ -598,37 +863,1818 @@ def calculate_confidence(scores: ProfileScores, dynamic_type: DynamicType, compl
 # MAIN PROFILE COMPUTATION
 # ============================================================================
 
-def compute_compatibility_profile(user_a: User, user_b: User) -> CompatibilityProfile:
+def compute_compatibility_profile(
+    user_a: User,
+    user_b: User,
+    kernel: Optional["InteractionKernel"] = None
+) -> CompatibilityProfile:
     """Compute full compatibility profile between two users."""
-    interactions = detect_interactions(user_a, user_b)
-    scores = compute_profile_scores(interactions)
-    complement = calculate_complement_score(user_a, user_b)
+    view_a, view_b = project(user_a), project(user_b)
+    columns = detect_interaction_columns(view_a, view_b, kernel)
+    interactions = columns.view()
+    scores = compute_column_scores(columns)
+    complement = complement_from_projections(view_a, view_b)
     dynamic_type = determine_dynamic_type(scores, complement)
     confidence = calculate_confidence(scores, dynamic_type, complement)
 
-    # Add metadata
-    metadata = {
+    return CompatibilityProfile(
+        interactions=interactions,
+        scores=scores,
+        complement_score=complement,
+        dynamic_type=dynamic_type,
+        confidence=confidence,
+        metadata=profile_metadata(user_a, user_b, view_a, view_b, len(interactions))
+    )
+
+
+def profile_metadata(user_a: User, user_b: User, view_a: VisibleProjection,
+                     view_b: VisibleProjection, interaction_count: int) -> Dict:
+    """Privacy and coverage metadata attached to a profile."""
+    return {
         "user_a_hiding": len(user_a.privacy.hidden_stars) > 0,
         "user_b_hiding": len(user_b.privacy.hidden_stars) > 0,
         "user_a_blurred": user_a.privacy.blur_brightness,
         "user_b_blurred": user_b.privacy.blur_brightness,
         "partial_view": (len(user_a.privacy.hidden_stars) > 0 or
                         len(user_b.privacy.hidden_stars) > 0),
-        "interaction_count": len(interactions),
-        "domains_shared": len(set(s.domain for s in get_visible_stars(user_a)) &
-                            set(s.domain for s in get_visible_stars(user_b)))
+        "interaction_count": interaction_count,
+        "domains_shared": len(view_a.buckets.keys() & view_b.buckets.keys())
     }
 
+
+def mirror_profile(profile: CompatibilityProfile, user_a: User, user_b: User) -> CompatibilityProfile:
+    """Profile for (user_a, user_b) from one computed for (user_b, user_a).
+
+    Every interaction term is symmetric, so only the star order changes.
+    Rows are put back in the order the direct computation emits them (A's
+    stars outer) and the scores re-summed in that order, which makes the
+    result identical to computing (user_a, user_b) directly. The source
+    profile must come from compute_compatibility_profile (columnar).
+    """
+    view_a, view_b = project(user_a), project(user_b)
+    source = profile.interactions.columns
+    columns = InteractionColumns(stars_a=source.stars_b, stars_b=source.stars_a,
+                                 certainty=source.certainty)
+    for k in sorted(range(len(source)), key=lambda k: (source.star_b[k], source.star_a[k])):
+        columns.append(source.star_b[k], source.star_a[k], source.type_code[k],
+                       source.strength[k], source.final_strength[k])
+    interactions = columns.view()
+
+    scores = compute_column_scores(columns)
+    complement = profile.complement_score
+    dynamic_type = determine_dynamic_type(scores, complement)
     return CompatibilityProfile(
         interactions=interactions,
         scores=scores,
         complement_score=complement,
         dynamic_type=dynamic_type,
-        confidence=confidence,
-        metadata=metadata
+        confidence=calculate_confidence(scores, dynamic_type, complement),
+        metadata=profile_metadata(user_a, user_b, view_a, view_b, len(interactions))
     )
 
 
+# ============================================================================
+# PROFILE CACHE
+# ============================================================================
+
+ProfileKey = Tuple[str, int, str, int]  # (user_a, version_a, user_b, version_b)
+
+
+@dataclass
+class CacheMetrics:
+    requests: int = 0
+    hits: int = 0
+    mirrored: int = 0       # served from the cached (b, a) profile
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return safe_divide(self.hits + self.mirrored, self.requests)
+
+
+class ProfileCache:
+    """Bounded LRU of compatibility profiles keyed by both users' versions.
+
+    A key only matches while neither user has been touched, so stale
+    profiles are never served. invalidate() additionally frees a user's
+    entries right away through the user -> keys reverse index. A request
+    for (b, a) is answered from a cached (a, b) with mirror_profile().
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self.metrics = CacheMetrics()
+        self._profiles: 'OrderedDict[ProfileKey, CompatibilityProfile]' = OrderedDict()
+        self._keys_by_user: Dict[str, Set[ProfileKey]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def profile(self, user_a: User, user_b: User) -> CompatibilityProfile:
+        self.metrics.requests += 1
+        key = (user_a.id, user_a.version, user_b.id, user_b.version)
+        cached = self._profiles.get(key)
+        if cached is not None:
+            self.metrics.hits += 1
+            self._profiles.move_to_end(key)
+            return cached
+
+        mirror_key = (user_b.id, user_b.version, user_a.id, user_a.version)
+        cached = self._profiles.get(mirror_key)
+        if cached is not None:
+            self.metrics.mirrored += 1
+            self._profiles.move_to_end(mirror_key)
+            return mirror_profile(cached, user_a, user_b)
+
+        self.metrics.misses += 1
+        profile = compute_compatibility_profile(user_a, user_b)
+        self._profiles[key] = profile
+        self._keys_by_user[user_a.id].add(key)
+        self._keys_by_user[user_b.id].add(key)
+        if len(self._profiles) > self.capacity:
+            evicted, _ = self._profiles.popitem(last=False)
+            self._forget(evicted)
+            self.metrics.evictions += 1
+        return profile
+
+    def invalidate(self, user_id: str):
+        """Drop every cached profile involving the user."""
+        for key in self._keys_by_user.pop(user_id, set()):
+            if self._profiles.pop(key, None) is not None:
+                self.metrics.invalidations += 1
+            partner = key[2] if key[0] == user_id else key[0]
+            partner_keys = self._keys_by_user.get(partner)
+            if partner_keys is not None:
+                partner_keys.discard(key)
+                if not partner_keys:
+                    del self._keys_by_user[partner]
+
+    def on_user_changed(self, user: User):
+        """Free the user's cached profiles now rather than waiting for LRU eviction."""
+        user.touch()
+        self.invalidate(user.id)
+
+    def _forget(self, key: ProfileKey):
+        for user_id in (key[0], key[2]):
+            keys = self._keys_by_user.get(user_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_user[user_id]
+
+
+# ============================================================================
+# LIVE PROFILES
+# ============================================================================
+
+class LiveProfile:
+    """Compatibility between two users, updated one star at a time.
+
+    Interactions are held per star pair (indices into each user's `stars`),
+    with a per-star reverse index, running weighted counts per type and
+    per-domain means. star_changed() re-scores only the changed star against
+    its proximate-domain partners and re-averages only its domain, so a
+    delta costs O(partners) rather than a full profile.
+
+    Interactions and the complement score always match a full
+    recomputation exactly. The running weights can drift from a fresh sum
+    by float rounding; resync() re-sums them in canonical order. Privacy
+    setting changes touch every star, so rebuild the LiveProfile instead.
+    """
+
+    def __init__(self, user_a: User, user_b: User):
+        self.users = (user_a, user_b)
+        self._index = [{star.id: i for i, star in enumerate(user.stars)} for user in self.users]
+        self._values: List[Dict[int, float]] = [{}, {}]
+        self._domains: List[Dict[str, List[int]]] = [defaultdict(list), defaultdict(list)]
+        self._means: List[Dict[str, float]] = [{}, {}]
+        self._pairs: Dict[Tuple[int, int], Interaction] = {}
+        self._by_star: List[Dict[int, Set[Tuple[int, int]]]] = [defaultdict(set), defaultdict(set)]
+        self._weights: Dict[InteractionType, float] = {}
+        self._counts: Dict[InteractionType, int] = defaultdict(int)
+
+        for side, user in enumerate(self.users):
+            for i, star in enumerate(user.stars):
+                value = self._effective(side, star)
+                if value is not None:
+                    self._values[side][i] = value
+                    self._domains[side][star.domain].append(i)
+            for domain in self._domains[side]:
+                self._refresh_mean(side, domain)
+        for i in sorted(self._values[0]):
+            self._add_interactions(0, i)
+        self._rederive()
+
+    def _effective(self, side: int, star: Star) -> Optional[float]:
+        """Effective brightness when the star is visible, else None."""
+        user = self.users[side]
+        if star.id in user.privacy.hidden_stars or star.state in (StarState.DORMANT, StarState.NASCENT):
+            return None
+        return get_effective_brightness(star, user.privacy)
+
+    def _refresh_mean(self, side: int, domain: str):
+        members = self._domains[side].get(domain)
+        if members:
+            values = self._values[side]
+            self._means[side][domain] = sum(values[i] for i in members) / len(members)
+        else:
+            self._domains[side].pop(domain, None)
+            self._means[side].pop(domain, None)
+
+    def _certainty(self) -> float:
+        return calculate_certainty(self.users[0].privacy, self.users[1].privacy)
+
+    def _add_interactions(self, side: int, i: int):
+        """Score star i on `side` against its partners on the other side."""
+        other = 1 - side
+        star = self.users[side].stars[i]
+        partners = []
+        for domain in proximate_domains(star.domain):
+            partners.extend(self._domains[other].get(domain, ()))
+        certainty = self._certainty()
+        for j in partners:
+            a, b = (i, j) if side == 0 else (j, i)
+            brightness_a, brightness_b = self._values[0][a], self._values[1][b]
+            result = exact_kernel(brightness_a, brightness_b)
+            if result is None:
+                continue
+            code, base_strength, factor = result
+            final_strength = clamp(base_strength * factor * certainty, 0.0, 1.0)
+            if final_strength < MIN_INTERACTION_STRENGTH:
+                continue
+            interaction = Interaction(
+                type=INTERACTION_TYPES[code],
+                star_a=self.users[0].stars[a],
+                star_b=self.users[1].stars[b],
+                strength=base_strength,
+                certainty=certainty,
+                final_strength=final_strength
+            )
+            self._pairs[(a, b)] = interaction
+            self._by_star[0][a].add((a, b))
+            self._by_star[1][b].add((a, b))
+            self._weights[interaction.type] = self._weights.get(interaction.type, 0.0) + final_strength
+            self._counts[interaction.type] += 1
+
+    def _remove_interactions(self, side: int, i: int):
+        for key in self._by_star[side].pop(i, set()):
+            interaction = self._pairs.pop(key)
+            self._by_star[1 - side][key[1 - side]].discard(key)
+            itype = interaction.type
+            self._counts[itype] -= 1
+            if self._counts[itype] == 0:
+                del self._counts[itype]
+                del self._weights[itype]
+            else:
+                self._weights[itype] -= interaction.final_strength
+
+    def star_changed(self, user: User, star_id: str):
+        """Apply a change to one star's brightness, state or visibility."""
+        side = 0 if user is self.users[0] else 1
+        i = self._index[side][star_id]
+        star = user.stars[i]
+
+        self._remove_interactions(side, i)
+        old_domain = None
+        if i in self._values[side]:
+            del self._values[side][i]
+            for domain, members in self._domains[side].items():
+                if i in members:
+                    members.remove(i)
+                    old_domain = domain
+                    break
+
+        value = self._effective(side, star)
+        if value is not None:
+            self._values[side][i] = value
+            bisect.insort(self._domains[side][star.domain], i)
+            self._add_interactions(side, i)
+        for domain in {old_domain, star.domain} - {None}:
+            self._refresh_mean(side, domain)
+        self._rederive()
+
+    def set_brightness(self, user: User, star_id: str, brightness: float):
+        """Move a star's brightness (and derived state), then apply the delta."""
+        star = user.stars[self._index[0 if user is self.users[0] else 1][star_id]]
+        star.brightness = brightness
+        star.state = Star._derive_state(brightness)
+        self.star_changed(user, star_id)
+
+    def resync(self):
+        """Re-sum the weighted counts in canonical interaction order."""
+        self._weights = {}
+        for interaction in self.interactions():
+            self._weights[interaction.type] = self._weights.get(interaction.type, 0.0) + interaction.final_strength
+        self._rederive()
+
+    def _rederive(self):
+        total_weight = 0.0
+        for weight in self._weights.values():
+            total_weight += weight
+        if total_weight > 0:
+            percentages = {k: v / total_weight for k, v in self._weights.items()}
+        else:
+            percentages = {}
+        self.scores = ProfileScores(
+            resonances=percentages.get(InteractionType.RESONANCE, 0),
+            tensions=percentages.get(InteractionType.TENSION, 0),
+            growth_edges=percentages.get(InteractionType.GROWTH_EDGE, 0),
+            shadow_mirrors=percentages.get(InteractionType.SHADOW_MIRROR, 0),
+            raw_counts=dict(self._weights),
+            total_weight=total_weight
+        )
+        self.complement_score = self._complement()
+        self.dynamic_type = determine_dynamic_type(self.scores, self.complement_score)
+        self.confidence = calculate_confidence(self.scores, self.dynamic_type, self.complement_score)
+
+    def _complement(self) -> float:
+        domains_a, domains_b = self._means
+        all_domains = domains_a.keys() | domains_b.keys()
+        if not all_domains:
+            return 0.0
+        complement_pairs = coverage_pairs = 0
+        for domain in all_domains:
+            strength_a = domains_a.get(domain, 0)
+            strength_b = domains_b.get(domain, 0)
+            if strength_a >= COMPLEMENT_STRONG_THRESHOLD:
+                coverage_pairs += 1
+                complement_pairs += strength_b < COMPLEMENT_WEAK_THRESHOLD
+            elif strength_b >= COMPLEMENT_STRONG_THRESHOLD:
+                coverage_pairs += 1
+                complement_pairs += strength_a < COMPLEMENT_WEAK_THRESHOLD
+        if coverage_pairs == 0:
+            return 0.0
+        coverage_bonus = 1 + COMPLEMENT_COVERAGE_BONUS * (coverage_pairs / len(all_domains))
+        return clamp(complement_pairs / len(all_domains) * coverage_bonus, 0.0, 1.0)
+
+    def interactions(self) -> List[Interaction]:
+        """Interactions in the order compute_compatibility_profile emits them."""
+        return [self._pairs[key] for key in sorted(self._pairs)]
+
+    def profile(self) -> CompatibilityProfile:
+        """Materialize a CompatibilityProfile snapshot."""
+        user_a, user_b = self.users
+        interactions = self.interactions()
+        return CompatibilityProfile(
+            interactions=interactions,
+            scores=self.scores,
+            complement_score=self.complement_score,
+            dynamic_type=self.dynamic_type,
+            confidence=self.confidence,
+            metadata=profile_metadata(user_a, user_b, project(user_a), project(user_b), len(interactions))
+        )
+
+
+# ============================================================================
+# COHORT ENGINE
+# ============================================================================
+
+# Integer codes used by the cohort arrays
+INTERACTION_TYPES = tuple(InteractionType)
+DYNAMIC_TYPES = tuple(DynamicType)
+_TYPE_CODE = {t: code for code, t in enumerate(INTERACTION_TYPES)}
+_DYNAMIC_CODE = {t: code for code, t in enumerate(DYNAMIC_TYPES)}
+_SHADOW = _TYPE_CODE[InteractionType.SHADOW_MIRROR]
+_TENSION = _TYPE_CODE[InteractionType.TENSION]
+_GROWTH = _TYPE_CODE[InteractionType.GROWTH_EDGE]
+_RESONANCE = _TYPE_CODE[InteractionType.RESONANCE]
+
+NO_PAIR = -1        # dynamic code for cells that hold no pair (diagonal)
+COHORT_TILE = 256   # users per tile side
+
+# (type code, base strength, brightness factor) for one star pair, or None
+InteractionKernel = Callable[[float, float], Optional[Tuple[int, float, float]]]
+
+
+def exact_kernel(brightness_a: float, brightness_b: float) -> Optional[Tuple[int, float, float]]:
+    """Interaction kernel straight from the detection and strength functions."""
+    result = detect_interaction_type(brightness_a, brightness_b)
+    if result is None:
+        return None
+    interaction_type, base_strength = result
+    return (_TYPE_CODE[interaction_type], base_strength,
+            calculate_brightness_factor(brightness_a, brightness_b))
+
+
+@dataclass
+class CohortTensor:
+    """Effective brightness for a cohort as a ragged (users x domains x stars) tensor.
+
+    User u's visible stars are star_offsets[u]:star_offsets[u + 1] in visible
+    order, with domain codes in `domain`. Cell (u, d) is
+    bucket[cell_offsets[u * D + d]:cell_offsets[u * D + d + 1]], the global
+    indices of u's stars in domain d. Domain means sit at means[u * D + d],
+    NaN where u shows nothing in d.
+    """
+    domains: List[str]
+    user_ids: List[str]
+    star_offsets: array
+    brightness: array
+    domain: array
+    cell_offsets: array
+    bucket: array
+    means: array
+    certainty: array
+
+    @property
+    def num_users(self) -> int:
+        return len(self.star_offsets) - 1
+
+    @property
+    def num_domains(self) -> int:
+        return len(self.domains)
+
+    def near_domains(self) -> List[List[int]]:
+        """Per domain code, the codes of domains within interaction proximity."""
+        code = {name: c for c, name in enumerate(self.domains)}
+        return [[code[name] for name in proximate_domains(domain) if name in code]
+                for domain in self.domains]
+
+
+def pack_cohort(users: List[User]) -> CohortTensor:
+    """Pack users' visible projections into a CohortTensor."""
+    views = [project(user) for user in users]
+    domain_code: Dict[str, int] = {}
+    for view in views:
+        for domain in view.domains:
+            domain_code.setdefault(domain, len(domain_code))
+    num_domains = len(domain_code)
+
+    tensor = CohortTensor(
+        domains=list(domain_code), user_ids=[user.id for user in users],
+        star_offsets=array('l', [0]), brightness=array('d'), domain=array('l'),
+        cell_offsets=array('l', [0]), bucket=array('l'), means=array('d'),
+        certainty=array('d'),
+    )
+    for view in views:
+        base = len(tensor.brightness)
+        tensor.brightness.extend(view.brightness)
+        tensor.domain.extend(domain_code[star.domain] for star in view.stars)
+        tensor.star_offsets.append(len(tensor.brightness))
+
+        cells: List[List[int]] = [[] for _ in range(num_domains)]
+        means = [float('nan')] * num_domains
+        for domain, positions in view.buckets.items():
+            cells[domain_code[domain]] = [base + position for position in positions]
+        for domain, mean in zip(view.domains, view.means):
+            means[domain_code[domain]] = mean
+        for cell in cells:
+            tensor.bucket.extend(cell)
+            tensor.cell_offsets.append(len(tensor.bucket))
+        tensor.means.extend(means)
+        tensor.certainty.append(view.certainty)
+
+    return tensor
+
+
+def pair_shares(
+    tensor: CohortTensor,
+    a: int,
+    b: int,
+    near: List[List[int]],
+    kernel: InteractionKernel = exact_kernel,
+    values: Optional[array] = None,
+) -> Tuple[List[float], float]:
+    """(shares by interaction type code, complement score) for users a and b.
+
+    Shares equal the profile pipeline's ProfileScores percentages. `kernel`
+    is called on per-star `values` (effective brightness by default;
+    InteractionTable passes its grid indices instead).
+    """
+    num_domains = tensor.num_domains
+    brightness = tensor.brightness if values is None else values
+    domain = tensor.domain
+    cells, bucket = tensor.cell_offsets, tensor.bucket
+    certainty = max(tensor.certainty[a] * tensor.certainty[b], MIN_CERTAINTY)
+    cell_base = b * num_domains
+
+    # Weighted counts per type, summed in interaction order like
+    # compute_profile_scores; `seen` keeps first-appearance order.
+    weights = [0.0, 0.0, 0.0, 0.0]
+    seen: List[int] = []
+    for i in range(tensor.star_offsets[a], tensor.star_offsets[a + 1]):
+        brightness_a = brightness[i]
+        targets = near[domain[i]]
+        if len(targets) == 1:
+            cell = cell_base + targets[0]
+            partners = bucket[cells[cell]:cells[cell + 1]]
+        else:
+            partners = sorted(j for d in targets
+                              for j in bucket[cells[cell_base + d]:cells[cell_base + d + 1]])
+        for j in partners:
+            result = kernel(brightness_a, brightness[j])
+            if result is None:
+                continue
+            code, base_strength, factor = result
+            final_strength = clamp(base_strength * factor * certainty, 0.0, 1.0)
+            if final_strength >= MIN_INTERACTION_STRENGTH:
+                if code not in seen:
+                    seen.append(code)
+                weights[code] += final_strength
+
+    total_weight = 0.0
+    for code in seen:
+        total_weight += weights[code]
+    shares = [0, 0, 0, 0]
+    if total_weight > 0:
+        for code in seen:
+            shares[code] = weights[code] / total_weight
+
+    complement = _tensor_complement(tensor.means, a * num_domains, cell_base, num_domains)
+    return shares, complement
+
+
+def pair_dynamic(
+    tensor: CohortTensor,
+    a: int,
+    b: int,
+    near: List[List[int]],
+    kernel: InteractionKernel = exact_kernel,
+    values: Optional[array] = None,
+) -> Tuple[int, float]:
+    """(dynamic code, confidence) for users a and b, matching the profile pipeline."""
+    shares, complement = pair_shares(tensor, a, b, near, kernel, values)
+    dynamic = dynamic_type_for(shares[_SHADOW], shares[_TENSION], shares[_GROWTH],
+                               shares[_RESONANCE], complement)
+    confidence = confidence_for(dynamic, shares[_SHADOW], shares[_TENSION], shares[_GROWTH],
+                                shares[_RESONANCE], complement)
+    return _DYNAMIC_CODE[dynamic], confidence
+
+
+def _tensor_complement(means: array, row_a: int, row_b: int, num_domains: int) -> float:
+    """calculate_complement_score over two rows of CohortTensor.means."""
+    domains = complement_pairs = coverage_pairs = 0
+    for d in range(num_domains):
+        strength_a, strength_b = means[row_a + d], means[row_b + d]
+        missing_a, missing_b = isnan(strength_a), isnan(strength_b)
+        if missing_a and missing_b:
+            continue
+        domains += 1
+        if missing_a:
+            strength_a = 0
+        if missing_b:
+            strength_b = 0
+        if strength_a >= COMPLEMENT_STRONG_THRESHOLD:
+            coverage_pairs += 1
+            if strength_b < COMPLEMENT_WEAK_THRESHOLD:
+                complement_pairs += 1
+        elif strength_b >= COMPLEMENT_STRONG_THRESHOLD:
+            coverage_pairs += 1
+            if strength_a < COMPLEMENT_WEAK_THRESHOLD:
+                complement_pairs += 1
+
+    if domains == 0 or coverage_pairs == 0:
+        return 0.0
+    coverage_bonus = 1 + COMPLEMENT_COVERAGE_BONUS * (coverage_pairs / domains)
+    return clamp(complement_pairs / domains * coverage_bonus, 0.0, 1.0)
+
+
+@dataclass
+class CompatibilityTile:
+    """Dynamic codes and confidences for one rows x cols block, row-major.
+
+    Only pairs with row < col are computed; other cells hold NO_PAIR.
+    """
+    rows: range
+    cols: range
+    dynamic: array      # index into DYNAMIC_TYPES
+    confidence: array   # float32
+
+    def cell(self, a: int, b: int) -> int:
+        return (a - self.rows.start) * len(self.cols) + (b - self.cols.start)
+
+
+def iter_compatibility_tiles(
+    tensor: CohortTensor,
+    tile: int = COHORT_TILE,
+    table: Optional["InteractionTable"] = None,
+) -> Iterator[CompatibilityTile]:
+    """Yield upper-triangle tiles; memory is bounded by one tile at a time.
+
+    With a table, star pairs are scored from its grid instead of exact_kernel.
+    """
+    n = tensor.num_users
+    near = tensor.near_domains()
+    kernel, values = exact_kernel, None
+    if table is not None:
+        kernel, values = table.lookup, table.quantize(tensor.brightness)
+    for row_start in range(0, n, tile):
+        rows = range(row_start, min(row_start + tile, n))
+        for col_start in range(row_start, n, tile):
+            cols = range(col_start, min(col_start + tile, n))
+            dynamic = array('b', [NO_PAIR]) * (len(rows) * len(cols))
+            confidence = array('f', [0.0]) * (len(rows) * len(cols))
+            cell = 0
+            for a in rows:
+                for b in cols:
+                    if a < b:
+                        dynamic[cell], confidence[cell] = pair_dynamic(tensor, a, b, near, kernel, values)
+                    cell += 1
+            yield CompatibilityTile(rows=rows, cols=cols, dynamic=dynamic, confidence=confidence)
+
+
+@dataclass
+class CompatibilityMatrix:
+    """Dense n x n dynamic codes and float32 confidences for a small cohort.
+
+    Each unordered pair is stored twice, at (a, b) and (b, a); the diagonal
+    holds NO_PAIR. Built on request by CondensedMatrix.to_dense().
+    """
+    size: int
+    dynamic: array
+    confidence: array
+
+    def dynamic_type(self, a: int, b: int) -> Optional[DynamicType]:
+        code = self.dynamic[a * self.size + b]
+        return None if code == NO_PAIR else DYNAMIC_TYPES[code]
+
+
+def pair_count(n: int) -> int:
+    return n * (n - 1) // 2
+
+
+def pair_at(n: int, index: int) -> Tuple[int, int]:
+    """(a, b) with a < b for a condensed upper-triangle index."""
+    a = int((2 * n - 1 - sqrt((2 * n - 1) ** 2 - 8 * index)) // 2)
+    while a > 0 and a * n - a * (a + 1) // 2 > index:
+        a -= 1
+    while (a + 1) * n - (a + 1) * (a + 2) // 2 <= index:
+        a += 1
+    return a, index - (a * n - a * (a + 1) // 2) + a + 1
+
+
+@dataclass
+class CondensedMatrix:
+    """Upper-triangle dynamic codes and float32 confidences, pair (a < b) order.
+
+    Holds each unordered pair once, n * (n - 1) / 2 cells, about half the
+    dense matrix with no diagonal.
+    """
+    size: int
+    dynamic: array
+    confidence: array
+
+    def index(self, a: int, b: int) -> int:
+        if a > b:
+            a, b = b, a
+        return a * self.size - a * (a + 1) // 2 + (b - a - 1)
+
+    def dynamic_type(self, a: int, b: int) -> DynamicType:
+        return DYNAMIC_TYPES[self.dynamic[self.index(a, b)]]
+
+    def distribution(self) -> Dict[DynamicType, int]:
+        """Unordered pair counts per dynamic type."""
+        counts = defaultdict(int)
+        for code in self.dynamic:
+            counts[DYNAMIC_TYPES[code]] += 1
+        return counts
+
+    def to_dense(self) -> CompatibilityMatrix:
+        """Mirror into an n x n matrix; only sensible for small cohorts."""
+        n = self.size
+        dynamic = array('b', [NO_PAIR]) * (n * n)
+        confidence = array('f', [0.0]) * (n * n)
+        for a in range(n):
+            start = self.index(a, a + 1) if a + 1 < n else 0
+            for offset, b in enumerate(range(a + 1, n)):
+                code, value = self.dynamic[start + offset], self.confidence[start + offset]
+                dynamic[a * n + b] = dynamic[b * n + a] = code
+                confidence[a * n + b] = confidence[b * n + a] = value
+        return CompatibilityMatrix(size=n, dynamic=dynamic, confidence=confidence)
+
+
+def compatibility_matrix(
+    tensor: CohortTensor,
+    tile: int = COHORT_TILE,
+    table: Optional["InteractionTable"] = None,
+) -> CondensedMatrix:
+    """Assemble every tile into the condensed upper triangle.
+
+    Each tile row contributes one contiguous run of pairs, copied as a slice.
+    """
+    n = tensor.num_users
+    matrix = CondensedMatrix(size=n, dynamic=array('b', [NO_PAIR]) * pair_count(n),
+                             confidence=array('f', [0.0]) * pair_count(n))
+    for block in iter_compatibility_tiles(tensor, tile, table):
+        width = len(block.cols)
+        for r, a in enumerate(block.rows):
+            first = max(a + 1, block.cols.start)
+            if first >= block.cols.stop:
+                continue
+            cell = r * width + (first - block.cols.start)
+            start, length = matrix.index(a, first), block.cols.stop - first
+            matrix.dynamic[start:start + length] = block.dynamic[cell:cell + length]
+            matrix.confidence[start:start + length] = block.confidence[cell:cell + length]
+    return matrix
+
+
+# ============================================================================
+# INTERACTION LOOKUP TABLE
+# ============================================================================
+
+INTERACTION_GRID = 1000  # grid points per unit brightness; keeps BLURRED_VALUES on-grid
+NO_INTERACTION = -1      # type code for dead-zone cells
+
+
+@dataclass
+class InteractionTable:
+    """exact_kernel sampled on a (resolution + 1)^2 brightness grid.
+
+    Cell i * (resolution + 1) + j holds the result for brightness i/resolution
+    against j/resolution, so grid-aligned inputs are exact and others snap to
+    the nearest point (error <= 0.5/resolution per side). Blurred pairs
+    bypass the grid through an exact lookup.
+    """
+    resolution: int
+    type_code: array
+    base_strength: array
+    brightness_factor: array
+    blurred: Dict[Tuple[float, float], Optional[Tuple[int, float, float]]]
+
+    @classmethod
+    def build(cls, resolution: int = INTERACTION_GRID) -> "InteractionTable":
+        side = resolution + 1
+        type_code = array('b', [NO_INTERACTION]) * (side * side)
+        base_strength = array('d', [0.0]) * (side * side)
+        brightness_factor = array('d', [0.0]) * (side * side)
+        # Every kernel term is symmetric in its arguments, so fill both halves.
+        for i in range(side):
+            for j in range(i, side):
+                result = exact_kernel(i / resolution, j / resolution)
+                if result is None:
+                    continue
+                for cell in (i * side + j, j * side + i):
+                    type_code[cell], base_strength[cell], brightness_factor[cell] = result
+
+        values = set(BLURRED_VALUES.values())
+        blurred = {(a, b): exact_kernel(a, b) for a in values for b in values}
+        return cls(resolution, type_code, base_strength, brightness_factor, blurred)
+
+    def index(self, brightness: float) -> int:
+        return round(clamp(brightness, 0.0, 1.0) * self.resolution)
+
+    def quantize(self, brightness: array) -> array:
+        """Grid indices for a column of brightness values."""
+        scale = self.resolution
+        return array('l', (round(clamp(value, 0.0, 1.0) * scale) for value in brightness))
+
+    def lookup(self, index_a: int, index_b: int) -> Optional[Tuple[int, float, float]]:
+        cell = index_a * (self.resolution + 1) + index_b
+        code = self.type_code[cell]
+        if code == NO_INTERACTION:
+            return None
+        return (code, self.base_strength[cell], self.brightness_factor[cell])
+
+    def kernel(self, brightness_a: float, brightness_b: float) -> Optional[Tuple[int, float, float]]:
+        """InteractionKernel backed by the table."""
+        pair = (brightness_a, brightness_b)
+        if pair in self.blurred:
+            return self.blurred[pair]
+        return self.lookup(self.index(brightness_a), self.index(brightness_b))
+
+
+_INTERACTION_TABLE: Optional[InteractionTable] = None
+
+
+def interaction_table() -> InteractionTable:
+    """Shared default-resolution table, built on first use."""
+    global _INTERACTION_TABLE
+    if _INTERACTION_TABLE is None:
+        _INTERACTION_TABLE = InteractionTable.build()
+    return _INTERACTION_TABLE
+
+
+# ============================================================================
+# SHARED-MEMORY BATCHES
+# ============================================================================
+
+TENSOR_COLUMNS = ("star_offsets", "brightness", "domain", "cell_offsets", "bucket", "means", "certainty")
+PAIR_CHUNK_SIZE = 20_000  # pairs per task
+
+
+def _share_columns(columns: Dict[str, array]) -> Tuple[shared_memory.SharedMemory, List[Tuple[str, str, int, int]]]:
+    """Copy typed arrays into one shared block; returns it and the layout."""
+    layout, offset = [], 0
+    for name, column in columns.items():
+        layout.append((name, column.typecode, offset, len(column)))
+        offset += (len(column) * column.itemsize + 7) & ~7
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (name, _, start, _), column in zip(layout, columns.values()):
+        data = column.tobytes()
+        block.buf[start:start + len(data)] = data
+    return block, layout
+
+
+def _attach_columns(block: shared_memory.SharedMemory, layout) -> Dict[str, memoryview]:
+    views = {}
+    for name, typecode, start, length in layout:
+        size = array(typecode).itemsize * length
+        views[name] = block.buf[start:start + size].cast(typecode)
+    return views
+
+
+_worker: Dict = {}
+
+
+def _init_pair_worker(input_name: str, input_layout, output_name: str, output_layout,
+                      domains: List[str], resolution: Optional[int]):
+    """Attach the shared input/output blocks once per worker process."""
+    source = shared_memory.SharedMemory(name=input_name)
+    target = shared_memory.SharedMemory(name=output_name)
+    columns = _attach_columns(source, input_layout)
+    tensor = CohortTensor(domains=domains, user_ids=[], **{name: columns[name] for name in TENSOR_COLUMNS})
+    kernel, values = exact_kernel, None
+    if resolution is not None:
+        table = InteractionTable(resolution, columns["type_code"], columns["base_strength"],
+                                 columns["brightness_factor"], {})
+        kernel, values = table.lookup, columns["grid"]
+    _worker.update(blocks=(source, target), columns=columns, tensor=tensor,
+                   near=tensor.near_domains(), kernel=kernel, values=values,
+                   output=_attach_columns(target, output_layout))
+
+
+def _score_pair_range(start: int, end: int) -> int:
+    """Score condensed pairs [start, end) into the shared output."""
+    tensor, near = _worker["tensor"], _worker["near"]
+    kernel, values = _worker["kernel"], _worker["values"]
+    dynamic, confidence = _worker["output"]["dynamic"], _worker["output"]["confidence"]
+    n = tensor.num_users
+    a, b = pair_at(n, start)
+    for index in range(start, end):
+        dynamic[index], confidence[index] = pair_dynamic(tensor, a, b, near, kernel, values)
+        b += 1
+        if b == n:
+            a += 1
+            b = a + 1
+    return end - start
+
+
+def _release_worker():
+    """Drop views and detach (used when scoring in-process)."""
+    views = list(_worker.get("columns", {}).values()) + list(_worker.get("output", {}).values())
+    blocks = _worker.get("blocks", ())
+    _worker.clear()
+    for view in views:
+        view.release()
+    for block in blocks:
+        block.close()
+
+
+def shared_compatibility_matrix(
+    tensor: CohortTensor,
+    workers: int = 4,
+    chunk_size: int = PAIR_CHUNK_SIZE,
+    table: Optional[InteractionTable] = None,
+) -> CondensedMatrix:
+    """All-pairs dynamic types across a process pool over shared memory.
+
+    The tensor's columns (and the lookup table, if any) are copied into one
+    shared block once; each task carries only a [start, end) range of
+    condensed pair indices and writes its results straight into a shared
+    output block. Results match compatibility_matrix for any worker count.
+    """
+    n = tensor.num_users
+    total = pair_count(n)
+    columns = {name: getattr(tensor, name) for name in TENSOR_COLUMNS}
+    if table is not None:
+        columns.update(type_code=table.type_code, base_strength=table.base_strength,
+                       brightness_factor=table.brightness_factor,
+                       grid=table.quantize(tensor.brightness))
+    output_columns = {"dynamic": array('b', [NO_PAIR]) * total,
+                      "confidence": array('f', [0.0]) * total}
+
+    source, input_layout = _share_columns(columns)
+    target, output_layout = _share_columns(output_columns)
+    try:
+        init_args = (source.name, input_layout, target.name, output_layout, tensor.domains,
+                     table.resolution if table is not None else None)
+        ranges = [(lo, min(lo + chunk_size, total)) for lo in range(0, total, chunk_size)]
+        if workers <= 1:
+            _init_pair_worker(*init_args)
+            try:
+                for lo, hi in ranges:
+                    _score_pair_range(lo, hi)
+            finally:
+                _release_worker()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_pair_worker,
+                                     initargs=init_args) as pool:
+                for future in [pool.submit(_score_pair_range, lo, hi) for lo, hi in ranges]:
+                    future.result()
+
+        results = _attach_columns(target, output_layout)
+        matrix = CondensedMatrix(size=n, dynamic=array('b', results["dynamic"]),
+                                 confidence=array('f', results["confidence"]))
+        for view in results.values():
+            view.release()
+        return matrix
+    finally:
+        for block in (source, target):
+            block.close()
+            block.unlink()
+
+
+COHORT_DOMAINS = ["Health", "Wealth", "Purpose", "Relationships", "Soul"]
+
+
+def generate_cohort(size: int, seed: int = 0) -> List[User]:
+    """Synthetic community with varied constellations and privacy settings."""
+    rng = random.Random(seed)
+    users = []
+    for u in range(size):
+        stars = []
+        for i in range(rng.randint(3, 12)):
+            domain = rng.choice(COHORT_DOMAINS)
+            brightness = round(min(1.0, max(MIN_BRIGHTNESS_VALUE, rng.gauss(0.5, 0.25))), 3)
+            stars.append(Star.from_brightness(f"u{u}_s{i}", f"{domain} {i + 1}", domain, brightness))
+        hidden = {star.id for star in stars if rng.random() < 0.1}
+        privacy = PrivacySettings(hidden_stars=hidden, blur_brightness=rng.random() < 0.2)
+        users.append(User(id=f"u{u}", name=f"User {u}", stars=stars, privacy=privacy))
+    return users
+
+
+# ============================================================================
+# MATCH RETRIEVAL
+# ============================================================================
+
+# Per-domain strength bands, cut at the interaction thresholds
+BAND_BRIGHT = 0   # >= RESONANCE_THRESHOLD / GROWTH_MENTOR_THRESHOLD
+BAND_MENTEE = 1   # GROWTH_MENTEE_MIN .. GROWTH_MENTEE_MAX
+BAND_DARK = 2     # <= SHADOW_THRESHOLD
+BAND_ABSENT = 3   # query side only: domain not shown at all
+
+# (query band, candidate band) pairings that feed each dynamic
+MATCH_RULES: Dict[DynamicType, List[Tuple[int, int]]] = {
+    DynamicType.AMPLIFYING: [(BAND_BRIGHT, BAND_BRIGHT)],
+    DynamicType.GROWTH: [(BAND_BRIGHT, BAND_MENTEE), (BAND_MENTEE, BAND_BRIGHT)],
+    DynamicType.MIRRORING: [(BAND_DARK, BAND_DARK)],
+    DynamicType.CHALLENGING: [(BAND_BRIGHT, BAND_DARK), (BAND_DARK, BAND_BRIGHT)],
+    DynamicType.BALANCING: [(BAND_BRIGHT, BAND_DARK), (BAND_DARK, BAND_BRIGHT),
+                            (BAND_ABSENT, BAND_BRIGHT)],
+}
+
+# Sketch bins cut at the same thresholds
+SKETCH_EDGES = (GROWTH_MENTEE_MIN, SHADOW_THRESHOLD, GROWTH_MENTEE_MAX, RESONANCE_THRESHOLD)
+
+MATCH_PROBE = 500         # entries read from the head of each posting list
+MATCH_SHORTLIST = 5       # shortlist size as a multiple of k
+
+
+def strength_bands(strength: float) -> List[int]:
+    """Bands a brightness falls in (MENTEE and DARK overlap at 0.3-0.4)."""
+    bands = []
+    if strength >= RESONANCE_THRESHOLD:
+        bands.append(BAND_BRIGHT)
+    if GROWTH_MENTEE_MIN <= strength <= GROWTH_MENTEE_MAX:
+        bands.append(BAND_MENTEE)
+    if strength <= SHADOW_THRESHOLD:
+        bands.append(BAND_DARK)
+    return bands
+
+
+def match_share(profile: CompatibilityProfile, dynamic: DynamicType) -> float:
+    """The profile score that makes a pair 'more' of the given dynamic."""
+    return {
+        DynamicType.AMPLIFYING: profile.scores.resonances,
+        DynamicType.GROWTH: profile.scores.growth_edges,
+        DynamicType.MIRRORING: profile.scores.shadow_mirrors,
+        DynamicType.CHALLENGING: profile.scores.tensions,
+        DynamicType.BALANCING: profile.complement_score,
+    }[dynamic]
+
+
+@dataclass
+class Match:
+    user: User
+    profile: CompatibilityProfile
+    share: float
+
+
+def rank_matches(query: User, candidates: Iterable[User], dynamic: DynamicType, k: int) -> List[Match]:
+    """Exact top-k: profile every candidate, keep those of the dynamic."""
+    matches = []
+    for order, candidate in enumerate(candidates):
+        if candidate.id == query.id:
+            continue
+        profile = compute_compatibility_profile(query, candidate)
+        if profile.dynamic_type != dynamic:
+            continue
+        share = match_share(profile, dynamic)
+        matches.append((-share, -profile.confidence, order, Match(candidate, profile, share)))
+    return [match for *_, match in heapq.nsmallest(k, matches)]
+
+
+@dataclass
+class MatchIndex:
+    """Candidate retrieval over domain-strength vectors and band signatures.
+
+    Postings map (domain code, band) to user indices, most characteristic
+    first: users with more of their stars in the band, and a domain mean
+    deeper inside it, lead the list.
+    `signatures[band][u]` is a bitmask over domain codes; `strengths` holds
+    get_domain_strengths as a users x domains row, NaN where absent.
+    User u's sketch is sketch_offsets[u]:sketch_offsets[u + 1]: per domain,
+    the visible stars binned at SKETCH_EDGES as (domain, bin mean, count).
+    """
+    users: List[User]
+    domains: List[str]
+    strengths: array
+    certainty: array
+    sketch_offsets: array
+    sketch_domain: array
+    sketch_mean: array
+    sketch_count: array
+    signatures: List[array]
+    postings: Dict[Tuple[int, int], array]
+
+    @classmethod
+    def build(cls, users: List[User]) -> "MatchIndex":
+        views = [project(user) for user in users]
+        domain_code: Dict[str, int] = {}
+        for view in views:
+            for domain in view.domains:
+                domain_code.setdefault(domain, len(domain_code))
+        num_domains = len(domain_code)
+
+        strengths = array('d', [float('nan')]) * (len(users) * num_domains)
+        certainty = array('d', (view.certainty for view in views))
+        sketch_offsets, sketch_domain = array('l', [0]), array('l')
+        sketch_mean, sketch_count = array('d'), array('l')
+        signatures = [array('q', [0]) * len(users) for _ in (BAND_BRIGHT, BAND_MENTEE, BAND_DARK)]
+        entries = defaultdict(list)
+        for u, view in enumerate(views):
+            purity = band_purity(view)
+            for domain, mean in zip(view.domains, view.means):
+                d = domain_code[domain]
+                strengths[u * num_domains + d] = mean
+                for band in strength_bands(mean):
+                    signatures[band][u] |= 1 << d
+                    entries[(d, band)].append((-purity[band] - _band_depth(band, mean), u))
+            for domain, bins in sketch(view).items():
+                for mean, count in bins:
+                    sketch_domain.append(domain_code[domain])
+                    sketch_mean.append(mean)
+                    sketch_count.append(count)
+            sketch_offsets.append(len(sketch_domain))
+
+        postings = {key: array('l', (u for *_, u in sorted(items))) for key, items in entries.items()}
+        return cls(users, list(domain_code), strengths, certainty, sketch_offsets,
+                   sketch_domain, sketch_mean, sketch_count, signatures, postings)
+
+    def signature(self, user: User) -> List[int]:
+        """Query-side masks per band, plus BAND_ABSENT for unshown domains."""
+        masks = [0, 0, 0, 0]
+        view = project(user)
+        code = {name: d for d, name in enumerate(self.domains)}
+        for domain, mean in zip(view.domains, view.means):
+            if domain in code:
+                for band in strength_bands(mean):
+                    masks[band] |= 1 << code[domain]
+        shown = sum(1 << code[domain] for domain in view.domains if domain in code)
+        masks[BAND_ABSENT] = ((1 << len(self.domains)) - 1) & ~shown
+        return masks
+
+    def shortlist(self, query: User, dynamic: DynamicType, size: int,
+                  probe: int = MATCH_PROBE) -> List[int]:
+        """Candidate user indices, most promising first.
+
+        Candidates are the heads of the postings the query's bands point at;
+        they are ordered by a profile estimated from the sketches.
+        """
+        if dynamic not in MATCH_RULES:
+            raise ValueError(f"No retrieval rules for {dynamic.value}")
+        masks = self.signature(query)
+
+        candidates: Set[int] = set()
+        for query_band, candidate_band in MATCH_RULES[dynamic]:
+            mask = masks[query_band]
+            for d in range(len(self.domains)):
+                if mask >> d & 1:
+                    candidates.update(self.postings.get((d, candidate_band), array('l'))[:probe])
+
+        view = project(query)
+        code = {name: d for d, name in enumerate(self.domains)}
+        strengths = [float('nan')] * len(self.domains)
+        for domain, mean in zip(view.domains, view.means):
+            if domain in code:
+                strengths[code[domain]] = mean
+        bins = {code[domain]: entries for domain, entries in sketch(view).items() if domain in code}
+        target = _DYNAMIC_CODE[dynamic]
+
+        def promise(u: int) -> Tuple[bool, float]:
+            kind, share = self.estimate(strengths, bins, view.certainty, u, dynamic)
+            return (kind == target, share)
+
+        return heapq.nlargest(size, sorted(candidates), key=promise)
+
+    def estimate(self, strengths: List[float], bins: Dict[int, List[Tuple[float, int]]],
+                 certainty: float, u: int, dynamic: DynamicType) -> Tuple[int, float]:
+        """(dynamic code, share) for the query against user u, from sketches.
+
+        Each pair of sketch bins acts like count_a * count_b star pairs at the
+        two bin means. The complement score only needs domain means, so it
+        is exact.
+        """
+        pair_certainty = max(certainty * self.certainty[u], MIN_CERTAINTY)
+        weights = [0.0, 0.0, 0.0, 0.0]
+        for e in range(self.sketch_offsets[u], self.sketch_offsets[u + 1]):
+            strength_b, count_b = self.sketch_mean[e], self.sketch_count[e]
+            for strength_a, count_a in bins.get(self.sketch_domain[e], ()):
+                result = exact_kernel(strength_a, strength_b)
+                if result is None:
+                    continue
+                code, base_strength, factor = result
+                final_strength = clamp(base_strength * factor * pair_certainty, 0.0, 1.0)
+                if final_strength >= MIN_INTERACTION_STRENGTH:
+                    weights[code] += final_strength * count_a * count_b
+
+        num_domains = len(self.domains)
+        base = u * num_domains
+        domains = complement_pairs = coverage_pairs = 0
+        for d in range(num_domains):
+            strength_a, strength_b = strengths[d], self.strengths[base + d]
+            if isnan(strength_a) and isnan(strength_b):
+                continue
+            domains += 1
+            strength_a = 0 if isnan(strength_a) else strength_a
+            strength_b = 0 if isnan(strength_b) else strength_b
+            if strength_a >= COMPLEMENT_STRONG_THRESHOLD:
+                coverage_pairs += 1
+                complement_pairs += strength_b < COMPLEMENT_WEAK_THRESHOLD
+            elif strength_b >= COMPLEMENT_STRONG_THRESHOLD:
+                coverage_pairs += 1
+                complement_pairs += strength_a < COMPLEMENT_WEAK_THRESHOLD
+
+        complement = 0.0
+        if coverage_pairs:
+            bonus = 1 + COMPLEMENT_COVERAGE_BONUS * (coverage_pairs / domains)
+            complement = clamp(complement_pairs / domains * bonus, 0.0, 1.0)
+        total = sum(weights)
+        shares = [w / total for w in weights] if total > 0 else weights
+        kind = dynamic_type_for(shares[_SHADOW], shares[_TENSION], shares[_GROWTH],
+                                shares[_RESONANCE], complement)
+        share = {
+            DynamicType.AMPLIFYING: shares[_RESONANCE],
+            DynamicType.GROWTH: shares[_GROWTH],
+            DynamicType.MIRRORING: shares[_SHADOW],
+            DynamicType.CHALLENGING: shares[_TENSION],
+            DynamicType.BALANCING: complement,
+        }[dynamic]
+        return _DYNAMIC_CODE[kind], share
+
+    def top_matches(self, query: User, dynamic: DynamicType, k: int = 20,
+                    shortlist: Optional[int] = None, probe: int = MATCH_PROBE) -> List[Match]:
+        """Approximate top-k: prune with the index, rerank exactly."""
+        size = shortlist if shortlist is not None else MATCH_SHORTLIST * k
+        candidates = self.shortlist(query, dynamic, size, probe)
+        return rank_matches(query, (self.users[u] for u in candidates), dynamic, k)
+
+
+def sketch(view: VisibleProjection) -> Dict[str, List[Tuple[float, int]]]:
+    """Per domain, visible brightness binned at SKETCH_EDGES as (mean, count)."""
+    sums: Dict[str, Dict[int, List[float]]] = defaultdict(lambda: defaultdict(lambda: [0.0, 0]))
+    for star, brightness in zip(view.stars, view.brightness):
+        entry = sums[star.domain][bisect.bisect_left(SKETCH_EDGES, brightness)]
+        entry[0] += brightness
+        entry[1] += 1
+    return {domain: [(total / count, count) for _, (total, count) in sorted(bins.items())]
+            for domain, bins in sums.items()}
+
+
+def band_purity(view: VisibleProjection) -> List[float]:
+    """Fraction of a user's visible stars in each band."""
+    counts = [0, 0, 0]
+    for brightness in view.brightness:
+        for band in strength_bands(brightness):
+            counts[band] += 1
+    return [safe_divide(count, len(view.brightness)) for count in counts]
+
+
+def _band_depth(band: int, strength: float) -> float:
+    """How deep inside its band a domain mean sits, 0 at the edge to 1."""
+    if band == BAND_BRIGHT:
+        return (strength - RESONANCE_THRESHOLD) / (1.0 - RESONANCE_THRESHOLD)
+    if band == BAND_DARK:
+        return (SHADOW_THRESHOLD - strength) / SHADOW_THRESHOLD
+    half_range = (GROWTH_MENTEE_MAX - GROWTH_MENTEE_MIN) / 2
+    return 1 - abs(strength - (GROWTH_MENTEE_MIN + GROWTH_MENTEE_MAX) / 2) / half_range
+
+
+def match_recall(index: MatchIndex, queries: List[User], dynamic: DynamicType, k: int = 20) -> Tuple[float, int]:
+    """(recall against brute force, queries with any exact match)."""
+    found = expected = answered = 0
+    for query in queries:
+        exact = {match.user.id for match in rank_matches(query, index.users, dynamic, k)}
+        if not exact:
+            continue
+        approx = {match.user.id for match in index.top_matches(query, dynamic, k)}
+        found += len(exact & approx)
+        expected += len(exact)
+        answered += 1
+    return safe_divide(found, expected, 1.0), answered
+
+
+# ============================================================================
+# BINARY FORMATS
+# ============================================================================
+
+# Constellation file: header, then 8-byte aligned little-endian sections.
+# Numeric columns are memoryviews straight over the buffer (zero-copy);
+# string tables are decoded only when a User is materialized.
+CONSTELLATION_MAGIC = b"MCST"
+CONSTELLATION_VERSION = 1
+CONSTELLATION_SECTIONS = (
+    "domain_offsets", "domain_names",      # u32[domains + 1], utf-8
+    "star_offsets", "user_flags",          # u64[users + 1], u8[users] (bit 0: blur)
+    "user_id_offsets", "user_ids",         # u64[users + 1], utf-8
+    "user_name_offsets", "user_names",     # u64[users + 1], utf-8
+    "star_domain", "star_brightness",      # u16[stars], f32[stars]
+    "star_state", "star_hidden",           # u8[stars], bitmap[(stars + 7) // 8]
+    "star_id_offsets", "star_ids",         # u64[stars + 1], utf-8
+    "star_name_offsets", "star_names",     # u64[stars + 1], utf-8
+)
+
+# Profile file: one record per (user_a, user_b) profile plus the
+# concatenated interaction columns. Star indices point into each user's
+# visible star list, so decoding a profile needs both Users.
+PROFILE_MAGIC = b"MPRF"
+PROFILE_VERSION = 1
+PROFILE_SECTIONS = (
+    "pair_id_offsets", "pair_ids",         # u64[2 * profiles + 1], utf-8 (a, b, a, b, ...)
+    "dynamic", "flags",                    # u8[profiles], u8[profiles] (PROFILE_FLAGS bits)
+    "domains_shared", "scalars",           # u32[profiles], f64[profiles * len(PROFILE_SCALARS)]
+    "interaction_offsets",                 # u64[profiles + 1]
+    "star_a", "star_b", "type_code",       # u32, u32, i8 per interaction
+    "strength", "final_strength",          # f32, f32 per interaction
+)
+PROFILE_SCALARS = ("complement_score", "confidence", "certainty", "total_weight",
+                   "resonances", "tensions", "growth_edges", "shadow_mirrors",
+                   "raw_resonance", "raw_tension", "raw_growth_edge", "raw_shadow_mirror")
+PROFILE_FLAGS = ("user_a_hiding", "user_b_hiding", "user_a_blurred", "user_b_blurred", "partial_view")
+
+STAR_STATES = tuple(StarState)
+_STATE_CODE = {state: code for code, state in enumerate(STAR_STATES)}
+_RAW_TYPES = (InteractionType.RESONANCE, InteractionType.TENSION,
+              InteractionType.GROWTH_EDGE, InteractionType.SHADOW_MIRROR)
+
+_HEADER = struct.Struct("<4sHHQQQ")  # magic, version, sections, count, rows, domains
+_SECTION = struct.Struct("<QQ")      # offset, length
+
+
+def _little_endian(column: array) -> bytes:
+    if sys.byteorder != "little":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _float32_decimal(value: float) -> float:
+    """A float32 read back as the short decimal it was written from.
+
+    Brightness like 0.4 is stored as 0.4000000059604645; thresholds such as
+    SHADOW_THRESHOLD compare against the decimal, so restore it whenever a
+    7-significant-digit decimal maps to the same float32.
+    """
+    short = float(f"{value:.7g}")
+    return short if struct.unpack("<f", struct.pack("<f", short))[0] == value else value
+
+
+def _string_table(strings: Iterable[str]) -> Tuple[bytes, bytes]:
+    offsets, blob = array('Q', [0]), bytearray()
+    for text in strings:
+        blob += text.encode("utf-8")
+        offsets.append(len(blob))
+    return _little_endian(offsets), bytes(blob)
+
+
+def _pack_sections(magic: bytes, version: int, count: int, rows: int, domains: int,
+                   names: Tuple[str, ...], sections: Dict[str, bytes]) -> bytes:
+    header_size = _HEADER.size + _SECTION.size * len(names)
+    offset = (header_size + 7) & ~7
+    table, body = [], bytearray()
+    for name in names:
+        data = sections[name]
+        table.append(_SECTION.pack(offset + len(body), len(data)))
+        body += data
+        body += bytes(-len(body) % 8)
+    header = _HEADER.pack(magic, version, len(names), count, rows, domains) + b"".join(table)
+    return header + bytes(offset - len(header)) + bytes(body)
+
+
+class _SectionReader:
+    """Header parsing and typed zero-copy views shared by both file kinds."""
+
+    def __init__(self, buffer, magic: bytes, version: int, names: Tuple[str, ...]):
+        self._buffer = memoryview(buffer)
+        found, found_version, sections, count, rows, domains = _HEADER.unpack_from(self._buffer, 0)
+        if found != magic:
+            raise ValueError(f"Not a {magic.decode()} file")
+        if found_version != version:
+            raise ValueError(f"Unsupported {magic.decode()} version {found_version}")
+        if sections != len(names):
+            raise ValueError(f"Expected {len(names)} sections, found {sections}")
+        self.count, self.rows, self.num_domains = count, rows, domains
+        self._sections = {}
+        for i, name in enumerate(names):
+            offset, length = _SECTION.unpack_from(self._buffer, _HEADER.size + i * _SECTION.size)
+            self._sections[name] = self._buffer[offset:offset + length]
+        self._mmap = None
+        self._file = None
+
+    def column(self, name: str, typecode: str):
+        """Zero-copy typed view of a section (a copy on big-endian hosts)."""
+        raw = self._sections[name]
+        if sys.byteorder != "little":
+            column = array(typecode, raw.tobytes())
+            column.byteswap()
+            return column
+        return raw.cast(typecode)
+
+    def string(self, offsets, blob: str, index: int) -> str:
+        return self._sections[blob][offsets[index]:offsets[index + 1]].tobytes().decode("utf-8")
+
+    @classmethod
+    def open(cls, path: str):
+        """Memory-map a file read-only."""
+        handle = open(path, "rb")
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        reader = cls(mapped)
+        reader._mmap, reader._file = mapped, handle
+        return reader
+
+    def close(self):
+        """Release views and unmap (all column views must be dropped first)."""
+        self._sections.clear()
+        self._release()
+        self._buffer.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+            self._mmap = self._file = None
+
+    def _release(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def encode_constellations(users: List[User]) -> bytes:
+    """Serialize users, their stars and privacy settings to MCST bytes."""
+    domain_code: Dict[str, int] = {}
+    star_offsets, user_flags = array('Q', [0]), array('B')
+    star_domain, star_brightness, star_state = array('H'), array('f'), array('B')
+    hidden = bytearray()
+    star_count = 0
+    for user in users:
+        user_flags.append(1 if user.privacy.blur_brightness else 0)
+        for star in user.stars:
+            star_domain.append(domain_code.setdefault(star.domain, len(domain_code)))
+            star_brightness.append(star.brightness)
+            star_state.append(_STATE_CODE[star.state])
+            if star_count % 8 == 0:
+                hidden.append(0)
+            if star.id in user.privacy.hidden_stars:
+                hidden[-1] |= 1 << (star_count % 8)
+            star_count += 1
+        star_offsets.append(star_count)
+
+    all_stars = [star for user in users for star in user.stars]
+    domain_offsets, domain_names = _string_table(domain_code)
+    domain_offsets = _little_endian(array('I', array('Q', domain_offsets)))
+    user_id_offsets, user_ids = _string_table(user.id for user in users)
+    user_name_offsets, user_names = _string_table(user.name for user in users)
+    star_id_offsets, star_ids = _string_table(star.id for star in all_stars)
+    star_name_offsets, star_names = _string_table(star.name for star in all_stars)
+    sections = {
+        "domain_offsets": domain_offsets, "domain_names": domain_names,
+        "star_offsets": _little_endian(star_offsets), "user_flags": user_flags.tobytes(),
+        "user_id_offsets": user_id_offsets, "user_ids": user_ids,
+        "user_name_offsets": user_name_offsets, "user_names": user_names,
+        "star_domain": _little_endian(star_domain), "star_brightness": _little_endian(star_brightness),
+        "star_state": star_state.tobytes(), "star_hidden": bytes(hidden),
+        "star_id_offsets": star_id_offsets, "star_ids": star_ids,
+        "star_name_offsets": star_name_offsets, "star_names": star_names,
+    }
+    return _pack_sections(CONSTELLATION_MAGIC, CONSTELLATION_VERSION, len(users), star_count,
+                          len(domain_code), CONSTELLATION_SECTIONS, sections)
+
+
+def write_constellations(path: str, users: List[User]):
+    with open(path, "wb") as handle:
+        handle.write(encode_constellations(users))
+
+
+class ConstellationFile(_SectionReader):
+    """Read-only MCST view: numeric columns without building Users.
+
+    Brightness is float32; decoded values are exact for brightness with up
+    to 7 significant digits and carry float32 rounding otherwise. Star
+    states are stored, not re-derived, so they survive exactly.
+    """
+
+    def __init__(self, buffer):
+        super().__init__(buffer, CONSTELLATION_MAGIC, CONSTELLATION_VERSION, CONSTELLATION_SECTIONS)
+        self.star_offsets = self.column("star_offsets", 'Q')
+        self.user_flags = self.column("user_flags", 'B')
+        self.star_domain = self.column("star_domain", 'H')
+        self.brightness = self.column("star_brightness", 'f')
+        self.state = self.column("star_state", 'B')
+        self._hidden = self.column("star_hidden", 'B')
+        self._user_id_offsets = self.column("user_id_offsets", 'Q')
+        self._user_name_offsets = self.column("user_name_offsets", 'Q')
+        self._star_id_offsets = self.column("star_id_offsets", 'Q')
+        self._star_name_offsets = self.column("star_name_offsets", 'Q')
+        domain_offsets = self.column("domain_offsets", 'I')
+        self.domains = [self.string(domain_offsets, "domain_names", d) for d in range(self.num_domains)]
+        if isinstance(domain_offsets, memoryview):
+            domain_offsets.release()
+
+    def _release(self):
+        for column in (self.star_offsets, self.user_flags, self.star_domain, self.brightness,
+                       self.state, self._hidden, self._user_id_offsets, self._user_name_offsets,
+                       self._star_id_offsets, self._star_name_offsets):
+            if isinstance(column, memoryview):
+                column.release()
+
+    @property
+    def num_users(self) -> int:
+        return self.count
+
+    @property
+    def num_stars(self) -> int:
+        return self.rows
+
+    def blurred(self, u: int) -> bool:
+        return bool(self.user_flags[u] & 1)
+
+    def hidden(self, k: int) -> bool:
+        return bool(self._hidden[k >> 3] >> (k & 7) & 1)
+
+    def user_id(self, u: int) -> str:
+        return self.string(self._user_id_offsets, "user_ids", u)
+
+    def user(self, u: int) -> User:
+        """Materialize one User (strings are decoded here only)."""
+        stars, hidden = [], set()
+        for k in range(self.star_offsets[u], self.star_offsets[u + 1]):
+            star = Star(
+                id=self.string(self._star_id_offsets, "star_ids", k),
+                name=self.string(self._star_name_offsets, "star_names", k),
+                domain=self.domains[self.star_domain[k]],
+                brightness=_float32_decimal(self.brightness[k]),
+                state=STAR_STATES[self.state[k]],
+            )
+            stars.append(star)
+            if self.hidden(k):
+                hidden.add(star.id)
+        return User(
+            id=self.user_id(u),
+            name=self.string(self._user_name_offsets, "user_names", u),
+            stars=stars,
+            privacy=PrivacySettings(hidden_stars=hidden, blur_brightness=self.blurred(u)),
+        )
+
+    def users(self) -> Iterator[User]:
+        return (self.user(u) for u in range(self.num_users))
+
+
+def pack_cohort_file(source: ConstellationFile, users: Optional[range] = None) -> CohortTensor:
+    """CohortTensor straight from MCST columns, applying visibility and blur."""
+    users = range(source.num_users) if users is None else users
+    num_domains = source.num_domains
+    invisible = {_STATE_CODE[StarState.DORMANT], _STATE_CODE[StarState.NASCENT]}
+    blurred_value = [BLURRED_VALUES.get(state.value, 0.5) for state in STAR_STATES]
+    tensor = CohortTensor(
+        domains=list(source.domains), user_ids=[source.user_id(u) for u in users],
+        star_offsets=array('l', [0]), brightness=array('d'), domain=array('l'),
+        cell_offsets=array('l', [0]), bucket=array('l'), means=array('d'),
+        certainty=array('d'),
+    )
+    for u in users:
+        blur = source.blurred(u)
+        cells: List[List[int]] = [[] for _ in range(num_domains)]
+        sums = [0.0] * num_domains
+        for k in range(source.star_offsets[u], source.star_offsets[u + 1]):
+            state = source.state[k]
+            if state in invisible or source.hidden(k):
+                continue
+            value = blurred_value[state] if blur else _float32_decimal(source.brightness[k])
+            d = source.star_domain[k]
+            cells[d].append(len(tensor.brightness))
+            sums[d] += value
+            tensor.brightness.append(value)
+            tensor.domain.append(d)
+        tensor.star_offsets.append(len(tensor.brightness))
+        for d, cell in enumerate(cells):
+            tensor.bucket.extend(cell)
+            tensor.cell_offsets.append(len(tensor.bucket))
+            tensor.means.append(sums[d] / len(cell) if cell else float('nan'))
+        tensor.certainty.append(BLUR_CERTAINTY if blur else 1.0)
+    return tensor
+
+
+def encode_profiles(profiles: List[Tuple[str, str, CompatibilityProfile]]) -> bytes:
+    """Serialize (user_a id, user_b id, profile) records to MPRF bytes."""
+    pair_ids = []
+    dynamic, flags = array('B'), array('B')
+    domains_shared, scalars = array('I'), array('d')
+    interaction_offsets = array('Q', [0])
+    star_a, star_b, type_code = array('I'), array('I'), array('b')
+    strength, final_strength = array('f'), array('f')
+    for user_a, user_b, profile in profiles:
+        pair_ids += [user_a, user_b]
+        dynamic.append(_DYNAMIC_CODE[profile.dynamic_type])
+        bits = 0
+        for bit, key in enumerate(PROFILE_FLAGS):
+            bits |= bool(profile.metadata.get(key)) << bit
+        flags.append(bits)
+        domains_shared.append(profile.metadata.get("domains_shared", 0))
+
+        columns = profile.interactions.columns
+        scores = profile.scores
+        scalars.extend((profile.complement_score, profile.confidence, columns.certainty,
+                        scores.total_weight, scores.resonances, scores.tensions,
+                        scores.growth_edges, scores.shadow_mirrors))
+        scalars.extend(scores.raw_counts.get(itype, float('nan')) for itype in _RAW_TYPES)
+        star_a.extend(columns.star_a)
+        star_b.extend(columns.star_b)
+        type_code.extend(columns.type_code)
+        strength.fromlist(columns.strength.tolist())
+        final_strength.fromlist(columns.final_strength.tolist())
+        interaction_offsets.append(len(type_code))
+
+    pair_id_offsets, pair_id_blob = _string_table(pair_ids)
+    sections = {
+        "pair_id_offsets": pair_id_offsets, "pair_ids": pair_id_blob,
+        "dynamic": dynamic.tobytes(), "flags": flags.tobytes(),
+        "domains_shared": _little_endian(domains_shared), "scalars": _little_endian(scalars),
+        "interaction_offsets": _little_endian(interaction_offsets),
+        "star_a": _little_endian(star_a), "star_b": _little_endian(star_b),
+        "type_code": type_code.tobytes(),
+        "strength": _little_endian(strength), "final_strength": _little_endian(final_strength),
+    }
+    return _pack_sections(PROFILE_MAGIC, PROFILE_VERSION, len(profiles), len(type_code), 0,
+                          PROFILE_SECTIONS, sections)
+
+
+class ProfileFile(_SectionReader):
+    """Read-only MPRF view; per-profile scalars need no Users to read."""
+
+    def __init__(self, buffer):
+        super().__init__(buffer, PROFILE_MAGIC, PROFILE_VERSION, PROFILE_SECTIONS)
+        self._columns = {
+            name: self.column(name, typecode) for name, typecode in (
+                ("pair_id_offsets", 'Q'), ("dynamic", 'B'), ("flags", 'B'),
+                ("domains_shared", 'I'), ("scalars", 'd'), ("interaction_offsets", 'Q'),
+                ("star_a", 'I'), ("star_b", 'I'), ("type_code", 'b'),
+                ("strength", 'f'), ("final_strength", 'f'),
+            )
+        }
+
+    def _release(self):
+        for column in self._columns.values():
+            if isinstance(column, memoryview):
+                column.release()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def pair(self, k: int) -> Tuple[str, str]:
+        offsets = self._columns["pair_id_offsets"]
+        return (self.string(offsets, "pair_ids", 2 * k), self.string(offsets, "pair_ids", 2 * k + 1))
+
+    def dynamic_type(self, k: int) -> DynamicType:
+        return DYNAMIC_TYPES[self._columns["dynamic"][k]]
+
+    def scalar(self, k: int, name: str) -> float:
+        return self._columns["scalars"][k * len(PROFILE_SCALARS) + PROFILE_SCALARS.index(name)]
+
+    def profile(self, k: int, user_a: User, user_b: User) -> CompatibilityProfile:
+        """Rebuild profile k against the two Users it was computed for."""
+        c = self._columns
+        view_a, view_b = project(user_a), project(user_b)
+        values = dict(zip(PROFILE_SCALARS, c["scalars"][k * len(PROFILE_SCALARS):(k + 1) * len(PROFILE_SCALARS)]))
+        start, end = c["interaction_offsets"][k], c["interaction_offsets"][k + 1]
+        columns = InteractionColumns(
+            stars_a=view_a.stars, stars_b=view_b.stars, certainty=values["certainty"],
+            star_a=array('I', c["star_a"][start:end]), star_b=array('I', c["star_b"][start:end]),
+            type_code=array('b', c["type_code"][start:end]),
+            strength=array('d', c["strength"][start:end]),
+            final_strength=array('d', c["final_strength"][start:end]),
+        )
+        raw = {itype: values[key] for itype, key in zip(_RAW_TYPES, PROFILE_SCALARS[8:])
+               if not isnan(values[key])}
+        metadata = {key: bool(c["flags"][k] >> bit & 1) for bit, key in enumerate(PROFILE_FLAGS)}
+        metadata["interaction_count"] = end - start
+        metadata["domains_shared"] = c["domains_shared"][k]
+        metadata = {key: metadata[key] for key in (
+            "user_a_hiding", "user_b_hiding", "user_a_blurred", "user_b_blurred",
+            "partial_view", "interaction_count", "domains_shared")}
+        return CompatibilityProfile(
+            interactions=columns.view(),
+            scores=ProfileScores(
+                resonances=values["resonances"], tensions=values["tensions"],
+                growth_edges=values["growth_edges"], shadow_mirrors=values["shadow_mirrors"],
+                raw_counts=raw, total_weight=values["total_weight"],
+            ),
+            complement_score=values["complement_score"],
+            dynamic_type=self.dynamic_type(k),
+            confidence=values["confidence"],
+            metadata=metadata,
+        )
+
+
+# ============================================================================
+# STREAMING MATCHMAKING
+# ============================================================================
+
+MATCH_BATCH_SIZE = 256    # candidates per scoring task
+MATCH_MAX_PENDING = 8     # scoring tasks in flight before the stream pauses
+
+# Profile score per dynamic, as an interaction type code (None: complement score)
+_MATCH_SHARE_CODE = {
+    DynamicType.AMPLIFYING: _RESONANCE,
+    DynamicType.GROWTH: _GROWTH,
+    DynamicType.MIRRORING: _SHADOW,
+    DynamicType.CHALLENGING: _TENSION,
+    DynamicType.BALANCING: None,
+}
+
+
+@dataclass
+class CandidateBatch:
+    query: int             # row of the query in the shared cohort tensor
+    candidates: array      # candidate rows
+    first: int             # stream position of candidates[0] for this query
+    last: bool             # no more batches follow for this query
+
+
+@dataclass
+class ScoredBatch:
+    query: int
+    scores: List[Tuple[float, float, int, int]]  # (share, confidence, position, candidate row)
+    last: bool
+
+
+@dataclass
+class MatchResult:
+    user_id: str
+    matches: List[Tuple[str, float, float]]      # (candidate id, share, confidence), best first
+
+
+def read_changed_users(source: "ConstellationFile", changed: Iterable[int]) -> Iterator[Tuple[int, User]]:
+    """Stage 1: (row, User) for the changed users only; the User feeds the shortlist."""
+    for u in changed:
+        yield u, source.user(u)
+
+
+def generate_candidates(
+    queries: Iterable[Tuple[int, User]],
+    dynamic: DynamicType,
+    index: MatchIndex,
+    shortlist: Optional[int] = None,
+    batch_size: int = MATCH_BATCH_SIZE,
+) -> Iterator[CandidateBatch]:
+    """Stage 2: batches of candidate rows per query, from the index or every user.
+
+    With `shortlist`, candidates are the MatchIndex shortlist; without it,
+    every indexed user is a candidate (exact, but the full pair set). Rows
+    are index positions, so the index must list users in tensor order.
+    """
+    for row, query in queries:
+        if shortlist is not None:
+            pool = index.shortlist(query, dynamic, shortlist)
+        else:
+            pool = range(len(index.users))
+        batch, first = array('l'), 0
+        for u in pool:
+            if u == row:
+                continue
+            if len(batch) == batch_size:
+                yield CandidateBatch(row, batch, first, False)
+                batch, first = array('l'), first + batch_size
+            batch.append(u)
+        yield CandidateBatch(row, batch, first, True)
+
+
+def score_candidate_batch(tensor: CohortTensor, near: List[List[int]], batch: CandidateBatch,
+                          dynamic: DynamicType) -> ScoredBatch:
+    """Score every candidate row against the query row, keeping those of the dynamic."""
+    target, share_code = _DYNAMIC_CODE[dynamic], _MATCH_SHARE_CODE[dynamic]
+    scores = []
+    for offset, candidate in enumerate(batch.candidates):
+        shares, complement = pair_shares(tensor, batch.query, candidate, near)
+        kind = dynamic_type_for(shares[_SHADOW], shares[_TENSION], shares[_GROWTH],
+                                shares[_RESONANCE], complement)
+        if _DYNAMIC_CODE[kind] != target:
+            continue
+        confidence = confidence_for(kind, shares[_SHADOW], shares[_TENSION], shares[_GROWTH],
+                                    shares[_RESONANCE], complement)
+        share = complement if share_code is None else shares[share_code]
+        scores.append((share, confidence, batch.first + offset, candidate))
+    return ScoredBatch(batch.query, scores, batch.last)
+
+
+def _init_match_worker(input_name: str, input_layout, domains: List[str]):
+    """Attach the shared cohort tensor once per worker process."""
+    source = shared_memory.SharedMemory(name=input_name)
+    columns = _attach_columns(source, input_layout)
+    tensor = CohortTensor(domains=domains, user_ids=[], **{name: columns[name] for name in TENSOR_COLUMNS})
+    _worker.update(blocks=(source,), columns=columns, tensor=tensor, near=tensor.near_domains())
+
+
+def _score_shared_batch(batch: CandidateBatch, dynamic: DynamicType) -> ScoredBatch:
+    return score_candidate_batch(_worker["tensor"], _worker["near"], batch, dynamic)
+
+
+def score_candidates(
+    batches: Iterable[CandidateBatch],
+    tensor: CohortTensor,
+    dynamic: DynamicType,
+    workers: int = 1,
+    max_pending: int = MATCH_MAX_PENDING,
+) -> Iterator[ScoredBatch]:
+    """Stage 3: score batches, in order, on a pool with bounded in-flight work.
+
+    The tensor's columns are copied into one shared block once; each task
+    carries only row numbers. At most `max_pending` batches are submitted
+    ahead of the consumer, so a slow downstream stage stops upstream stages
+    from reading further.
+    """
+    if workers <= 1:
+        near = tensor.near_domains()
+        for batch in batches:
+            yield score_candidate_batch(tensor, near, batch, dynamic)
+        return
+
+    block, layout = _share_columns({name: getattr(tensor, name) for name in TENSOR_COLUMNS})
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_match_worker,
+                                 initargs=(block.name, layout, tensor.domains)) as pool:
+            pending = []
+            for batch in batches:
+                pending.append(pool.submit(_score_shared_batch, batch, dynamic))
+                if len(pending) >= max_pending:
+                    yield pending.pop(0).result()
+            for future in pending:
+                yield future.result()
+    finally:
+        block.close()
+        block.unlink()
+
+
+def keep_top_k(scored: Iterable[ScoredBatch], k: int, user_ids: List[str]) -> Iterator[MatchResult]:
+    """Stage 4: bounded per-user heaps; a user is emitted after its last batch.
+
+    Ranking matches rank_matches(): share, then confidence, then stream
+    position. Only users with batches in flight hold a heap. Rows are
+    resolved to ids through `user_ids` on the way out.
+    """
+    heaps: Dict[int, List[Tuple[float, float, int, int]]] = {}
+    for batch in scored:
+        heap = heaps.setdefault(batch.query, [])
+        for share, confidence, position, candidate in batch.scores:
+            entry = (share, confidence, -position, candidate)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+        if batch.last:
+            best = sorted(heaps.pop(batch.query), reverse=True)
+            yield MatchResult(user_ids[batch.query],
+                              [(user_ids[candidate], share, conf) for share, conf, _, candidate in best])
+
+
+def stream_matches(
+    source: "ConstellationFile",
+    changed: Iterable[int],
+    dynamic: DynamicType,
+    index: MatchIndex,
+    k: int = 20,
+    shortlist: Optional[int] = None,
+    workers: int = 1,
+    batch_size: int = MATCH_BATCH_SIZE,
+    max_pending: int = MATCH_MAX_PENDING,
+) -> Iterator[MatchResult]:
+    """Compose the stages: changed rows -> candidates -> scores -> top-k results.
+
+    `index` must be built over the file's users in file order, so index
+    positions and tensor rows agree.
+    """
+    if len(index.users) != source.num_users:
+        raise ValueError(f"Index holds {len(index.users)} users, file holds {source.num_users}")
+    tensor = pack_cohort_file(source)
+    batches = generate_candidates(read_changed_users(source, changed), dynamic, index, shortlist, batch_size)
+    scored = score_candidates(batches, tensor, dynamic, workers, max_pending)
+    return keep_top_k(scored, k, tensor.user_ids)
+
+
 # ============================================================================
 # TEST PAIR SCENARIOS
 # ============================================================================
@@ -1028,7 +3074,7 @@ def analyze_results(results: List[Dict]):
     return results
 
 
-def run_edge_case_tests():
+def run_edge_case_tests(kernel: Optional[InteractionKernel] = None):
     """Run specific edge case tests from SKIN document."""
     print(f"\n{'='*70}")
     print("EDGE CASE TESTS (from 04-skin.md)")
@@ -1047,7 +3093,7 @@ def run_edge_case_tests():
         stars=[Star.from_brightness("b_test", "Test", "Test", MIN_BRIGHTNESS_VALUE)]
     )
     try:
-        profile = compute_compatibility_profile(user_a, user_b)
+        profile = compute_compatibility_profile(user_a, user_b, kernel)
         print(f"  PASS: No division error, interactions={len(profile.interactions)}")
     except ZeroDivisionError:
         print(f"  FAIL: Division by zero occurred!")
@@ -1064,7 +3110,7 @@ def run_edge_case_tests():
         name="Max Test B",
         stars=[Star.from_brightness("b_test", "Test", "Test", 1.0)]
     )
-    profile = compute_compatibility_profile(user_a, user_b)
+    profile = compute_compatibility_profile(user_a, user_b, kernel)
     if profile.interactions:
         strength = profile.interactions[0].final_strength
         print(f"  Interaction strength at max brightness: {strength:.3f}")
@@ -1088,7 +3134,7 @@ def run_edge_case_tests():
         name="Visible",
         stars=[Star.from_brightness("b_test", "Test", "Test", 0.8)]
     )
-    profile = compute_compatibility_profile(user_a, user_b)
+    profile = compute_compatibility_profile(user_a, user_b, kernel)
     if len(profile.interactions) == 0:
         print(f"  PASS: No interactions when all stars hidden")
     else:
@@ -1108,7 +3154,7 @@ def run_edge_case_tests():
         stars=[Star.from_brightness("b_test", "Test", "Test", 0.8)],
         privacy=PrivacySettings(blur_brightness=True)
     )
-    profile = compute_compatibility_profile(user_a, user_b)
+    profile = compute_compatibility_profile(user_a, user_b, kernel)
     if profile.interactions:
         certainty = profile.interactions[0].certainty
         print(f"  Certainty with both blurred: {certainty:.3f}")
@@ -1132,7 +3178,7 @@ def run_edge_case_tests():
         name="Middle B",
         stars=[Star.from_brightness("b_test", "Test", "Test", 0.50)]
     )
-    profile = compute_compatibility_profile(user_a, user_b)
+    profile = compute_compatibility_profile(user_a, user_b, kernel)
     print(f"  Interactions in dead zone: {len(profile.interactions)}")
     print(f"  Dynamic type: {profile.dynamic_type.value}")
     if len(profile.interactions) == 0 and profile.dynamic_type == DynamicType.COMPLEX:
@@ -1141,6 +3187,179 @@ def run_edge_case_tests():
         print(f"  INFO: Behavior at dead zone boundary")
 
 
+def print_cohort_summary(users: List[User]):
+    """All-pairs dynamic type distribution for a cohort."""
+    print(f"\n{'='*70}")
+    print(f"COHORT ALL-PAIRS ({len(users)} users)")
+    print('='*70)
+
+    matrix = compatibility_matrix(pack_cohort(users))
+    counts = matrix.distribution()
+    pairs = sum(counts.values())
+    print(f"\n--- Dynamic Type Distribution ({pairs} pairs) ---")
+    for dtype in DYNAMIC_TYPES:
+        print(f"  {dtype.value}: {counts.get(dtype, 0)} ({safe_divide(counts.get(dtype, 0), pairs):.1%})")
+
+
+def print_interaction_table_report(table: InteractionTable, users: List[User], samples: int = 100_000):
+    """How closely the lookup table tracks the exact kernel."""
+    print(f"\n{'='*70}")
+    print(f"INTERACTION LOOKUP TABLE (grid {table.resolution})")
+    print('='*70)
+
+    rng = random.Random(7)
+    type_mismatches = 0
+    max_error = 0.0
+    for _ in range(samples):
+        a, b = rng.random(), rng.random()
+        exact, approx = exact_kernel(a, b), table.kernel(a, b)
+        if (exact is None) != (approx is None) or (exact and exact[0] != approx[0]):
+            type_mismatches += 1
+        elif exact:
+            max_error = max(max_error, abs(exact[1] * exact[2] - approx[1] * approx[2]))
+    print(f"\n--- Random Brightness Pairs ({samples}) ---")
+    print(f"  Type agreement: {1 - type_mismatches / samples:.3%}")
+    print(f"  Max strength error (matching types): {max_error:.4f}")
+
+    tensor = pack_cohort(users)
+    exact_matrix = compatibility_matrix(tensor)
+    table_matrix = compatibility_matrix(tensor, table=table)
+    same = sum(1 for x, y in zip(exact_matrix.dynamic, table_matrix.dynamic) if x == y)
+    pairs = pair_count(len(users))
+    print(f"\n--- Cohort Dynamic Types ({pairs} pairs) ---")
+    print(f"  Agreement with exact kernel: {same / pairs:.2%}")
+
+
+def print_match_recall_report(users: List[User], queries: int = 10, k: int = 20):
+    """Recall of MatchIndex top-k against brute force."""
+    print(f"\n{'='*70}")
+    print(f"MATCH RETRIEVAL ({len(users)} users, top {k})")
+    print('='*70)
+
+    index = MatchIndex.build(users)
+    sample = users[:queries]
+    print(f"\n--- Recall vs Brute Force ({queries} queries) ---")
+    for dynamic in (DynamicType.AMPLIFYING, DynamicType.GROWTH, DynamicType.MIRRORING):
+        recall, answered = match_recall(index, sample, dynamic, k)
+        shortlist = min(MATCH_SHORTLIST * k, len(users))
+        print(f"  {dynamic.value:<12} recall={recall:.1%}  "
+              f"(shortlist {shortlist}/{len(users)}, {answered} queries with matches)")
+
+
+def print_cache_report(users: List[User], views: int = 20_000, capacity: int = 2000,
+                       update_rate: float = 0.01, seed: int = 11):
+    """Hit rates for ProfileCache under random profile views and updates."""
+    print(f"\n{'='*70}")
+    print(f"PROFILE CACHE ({len(users)} users, capacity {capacity})")
+    print('='*70)
+
+    rng = random.Random(seed)
+    cache = ProfileCache(capacity)
+    active = users[:len(users) // 4]  # most views come from a quarter of users
+    for _ in range(views):
+        if rng.random() < update_rate:
+            user = rng.choice(users)
+            star = rng.choice(user.stars)
+            star.brightness = round(clamp(star.brightness + rng.uniform(-0.1, 0.1), 0.0, 1.0), 3)
+            star.state = Star._derive_state(star.brightness)
+            cache.on_user_changed(user)
+            continue
+        viewer = rng.choice(active) if rng.random() < 0.8 else rng.choice(users)
+        other = rng.choice(active) if rng.random() < 0.8 else rng.choice(users)
+        if viewer is not other:
+            cache.profile(viewer, other)
+
+    m = cache.metrics
+    print(f"\n--- Metrics ({views} events) ---")
+    print(f"  Requests: {m.requests}  Hits: {m.hits}  Mirrored: {m.mirrored}  Misses: {m.misses}")
+    print(f"  Evictions: {m.evictions}  Invalidations: {m.invalidations}  Cached: {len(cache)}")
+    print(f"  Hit rate: {m.hit_rate:.1%}")
+
+
+def print_live_profile_demo():
+    """Walk the mentee's stars upward and watch the dynamic shift."""
+    print(f"\n{'='*70}")
+    print("LIVE PROFILE (Mentee brightens one star at a time)")
+    print('='*70)
+
+    mentor, mentee, _ = create_growth_pair()
+    live = LiveProfile(mentor, mentee)
+    print(f"\n  start: {live.dynamic_type.value} (confidence {live.confidence:.3f})")
+    for star in mentee.stars:
+        live.set_brightness(mentee, star.id, 0.80)
+        print(f"  {star.name:<14} -> 0.80: {live.dynamic_type.value} "
+              f"(confidence {live.confidence:.3f}, {len(live.interactions())} interactions)")
+
+
+def print_format_report(users: List[User]):
+    """Encoded sizes and round-trip agreement for the binary formats."""
+    print(f"\n{'='*70}")
+    print(f"BINARY FORMATS ({len(users)} users)")
+    print('='*70)
+
+    encoded = encode_constellations(users)
+    source = ConstellationFile(encoded)
+    print(f"\n--- Constellations ---")
+    print(f"  MCST: {len(encoded)} bytes ({len(encoded) / source.num_stars:.1f} per star)"
+          f"  pickle: {len(pickle.dumps(users))} bytes")
+
+    from_file = compatibility_matrix(pack_cohort_file(source))
+    from_users = compatibility_matrix(pack_cohort(users))
+    same = sum(1 for x, y in zip(from_file.dynamic, from_users.dynamic) if x == y)
+    pairs = pair_count(len(users))
+    print(f"  Cohort dynamic types from file vs objects: {same / pairs:.2%} agree")
+
+    profiles = [(users[i].id, users[i + 1].id, compute_compatibility_profile(users[i], users[i + 1]))
+                for i in range(len(users) - 1)]
+    encoded_profiles = encode_profiles(profiles)
+    interactions = sum(len(profile.interactions) for *_, profile in profiles)
+    print(f"\n--- Profiles ---")
+    print(f"  MPRF: {len(encoded_profiles)} bytes for {len(profiles)} profiles, {interactions} interactions"
+          f"  pickle: {len(pickle.dumps([list(profile.interactions) for *_, profile in profiles]))} bytes (interactions only)")
+
+
+def print_shared_batch_report(users: List[User], workers: int = 2, chunk_size: int = 2000):
+    """Run the shared-memory executor and check it against the in-process engine."""
+    print(f"\n{'='*70}")
+    print(f"SHARED-MEMORY BATCH ({len(users)} users, {workers} workers)")
+    print('='*70)
+
+    tensor = pack_cohort(users)
+    shared = shared_compatibility_matrix(tensor, workers=workers, chunk_size=chunk_size)
+    local = compatibility_matrix(tensor)
+    n = len(users)
+    same = sum(1 for i in range(pair_count(n))
+               if shared.dynamic[i] == local.dynamic[i] and shared.confidence[i] == local.confidence[i])
+    tasks = -(-pair_count(n) // chunk_size)
+    print(f"\n  Pairs: {pair_count(n)} in {tasks} tasks of up to {chunk_size}")
+    print(f"  Identical to in-process matrix: {same}/{pair_count(n)}")
+
+
+def print_streaming_report(users: List[User], changed: int = 12, k: int = 5, workers: int = 2):
+    """Nightly-style run: changed users streamed from a file through the pipeline."""
+    print(f"\n{'='*70}")
+    print(f"STREAMING MATCHMAKING ({changed} changed of {len(users)} users, top {k})")
+    print('='*70)
+
+    index = MatchIndex.build(users)
+    source = ConstellationFile(encode_constellations(users))
+    dynamic = DynamicType.AMPLIFYING
+    results = stream_matches(source, range(changed), dynamic, index,
+                             k=k, shortlist=MATCH_SHORTLIST * k, workers=workers,
+                             batch_size=10, max_pending=4)
+    by_id = {user.id: user for user in users}
+    agree = 0
+    print(f"\n--- Results ({dynamic.value}) ---")
+    for result in results:
+        query = by_id[result.user_id]
+        shortlist = [index.users[u] for u in index.shortlist(query, dynamic, MATCH_SHORTLIST * k)]
+        exact = [match.user.id for match in rank_matches(query, shortlist, dynamic, k)]
+        agree += exact == [cid for cid, *_ in result.matches]
+        best = ", ".join(f"{cid} ({share:.2f})" for cid, share, _ in result.matches[:3]) or "none"
+        print(f"  {result.user_id:<6} {len(result.matches)} matches; best: {best}")
+    print(f"\n  Identical to rank_matches on the same shortlist: {agree}/{changed}")
+
+
 if __name__ == "__main__":
     print("="*70)
     print("COMPATIBILITY SYSTEM - MIRROR SIMULATION")
@@ -1155,6 +3374,31 @@ if __name__ == "__main__":
     # Run edge case tests
     run_edge_case_tests()
 
+    # All-pairs cohort summary
+    cohort = generate_cohort(200, seed=42)
+    print_cohort_summary(cohort)
+
+    # Lookup-table kernel accuracy
+    print_interaction_table_report(interaction_table(), cohort)
+
+    # Top-k retrieval recall
+    print_match_recall_report(generate_cohort(2000, seed=7))
+
+    # Profile cache under a simulated feed
+    print_cache_report(cohort)
+
+    # Live single-star updates
+    print_live_profile_demo()
+
+    # Binary formats
+    print_format_report(generate_cohort(200, seed=42))
+
+    # Shared-memory process pool
+    print_shared_batch_report(generate_cohort(200, seed=42))
+
+    # Streaming top-k matchmaking
+    print_streaming_report(generate_cohort(1000, seed=21))
+
     print("\n" + "="*70)
     print("SIMULATION COMPLETE")
     print("="*70)
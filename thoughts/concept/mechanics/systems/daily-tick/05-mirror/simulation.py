@@ -0,0 +1,976 @@
+"""
+Daily Tick Simulation
+
+Advances every mechanic for a whole population once per day, in dependency
+order:
+
+    brightness (brightness-decay)
+      → star state (constellation-states)
+      → connections (connection-formation)
+      → phase (phase-transitions)
+      → journeys (the-walk)
+      → horizon (the-horizon)
+
+State lives in flat column arrays shared by all stages. Each stage reads the
+columns the stages before it wrote (today's brightness, engagement, star
+states, connection states, journey velocities) instead of building per-system
+Star objects, so one pass per day updates the whole model for everyone.
+
+Run: python simulation.py
+"""
+
+import math
+import random
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Sequence, Tuple
+
+# =============================================================================
+# CONSTANTS — BRIGHTNESS (from brightness-decay/02-blood.md)
+# =============================================================================
+
+MIN_BRIGHTNESS = 0.05
+MAX_BRIGHTNESS = 1.0
+SOFT_FLOOR_ZONE = 0.15
+SOFT_FLOOR_FACTOR = 0.7
+
+BASE_EXPERIMENT_IMPACT = 0.03
+DIFFICULTY_MULTIPLIERS = {"tiny": 0.5, "small": 0.75, "medium": 1.0, "stretch": 1.5}
+NOVELTY_BONUS = 1.2
+MAX_DAILY_GAIN = 0.06
+
+INSIGHT_IMPACT = 0.02
+DEPTH_MULTIPLIERS = {"surface": 0.5, "pattern": 1.0, "root": 1.5}
+SOURCE_MULTIPLIERS = {"user_initiated": 1.2, "tars_prompted": 1.0, "tars_observed": 0.8}
+
+STREAK_GROWTH_RATE = 0.15
+MAX_STREAK_BONUS = 1.3
+STREAK_PRESERVATION_RATE = 0.5
+
+RECOVERY_BASE = 0.05
+RECOVERY_MIN_DAYS = 7
+RECOVERY_SCALE = 0.3
+RECOVERY_MAX_MULTIPLIER = 2.0
+
+BASE_SKIP_PENALTY = 0.008
+MAX_SKIP_MULTIPLIER = 2.0
+CONTRADICTION_PENALTY = 0.04
+
+DOMAIN_HALF_LIVES = {
+    "Health": 7,
+    "Relationships": 14,
+    "Wealth": 21,
+    "Purpose": 30,
+    "Soul": 90,
+}
+MAINTENANCE_ZONE = 0.3
+
+NEGLECT_THRESHOLD_1 = 7
+NEGLECT_THRESHOLD_2 = 21
+NEGLECT_MULTIPLIER_1 = 1.5
+NEGLECT_MULTIPLIER_2 = 2.0
+
+# =============================================================================
+# CONSTANTS — STAR STATE (from constellation-states/02-blood.md)
+# =============================================================================
+
+BRIGHTNESS_THRESHOLD_BRIGHT = 0.7
+BRIGHTNESS_THRESHOLD_DIM = 0.5
+
+VARIANCE_THRESHOLD_HIGH = 0.15
+VARIANCE_THRESHOLD_LOW = 0.05
+VARIANCE_SMOOTHING_FACTOR = 0.3
+
+STAR_STABILIZATION_DAYS = 7
+DARK_CONTRADICTIONS = 3
+
+STAR_DORMANCY_THRESHOLDS = {
+    "nascent": 14,
+    "flickering": 14,
+    "dim": 30,
+    "bright": 60,
+    "dark": 30,
+}
+
+# =============================================================================
+# CONSTANTS — CONNECTIONS (from connection-formation/02-blood.md)
+# =============================================================================
+
+MIN_STRENGTH = 0.0
+MAX_STRENGTH = 1.0
+STRENGTH_FLOOR = 0.05
+
+EVIDENCE_FOR_FORMING = 2
+EVIDENCE_FOR_WEAK = 3
+EVIDENCE_FOR_MODERATE = 5
+EVIDENCE_FOR_STRONG = 8
+
+MAX_DAILY_STRENGTH_GAIN = 0.15
+
+EVIDENCE_IMPACTS = {
+    "co_mention_response": 0.05,
+    "co_mention_session": 0.08,
+    "correlation_detected": 0.10,
+    "user_confirms": 0.20,
+    "user_creates": 0.25,
+    "tars_confirmed": 0.15,
+    "causation_detected": 0.12,
+}
+DIMINISHING_FACTORS = [1.0, 0.6, 0.3, 0.1]
+
+CONNECTION_HALF_LIVES = {
+    "resonance": 30,
+    "tension": 21,
+    "causation": 14,
+    "growth_edge": 45,
+    "shadow_mirror": 60,
+    "blocks": 21,
+}
+
+CONNECTION_DORMANCY_THRESHOLDS = {
+    "nascent": 7,
+    "forming": 14,
+    "weak": 30,
+    "moderate": 45,
+    "strong": 60,
+}
+
+# =============================================================================
+# CONSTANTS — PHASE (from phase-transitions/02-blood.md)
+# =============================================================================
+
+CONNECTION_THRESHOLD_FORWARD = 3
+DENSITY_THRESHOLD_FORWARD = 0.2
+INTEGRATION_THRESHOLD = 0.5
+BRIGHT_RATIO_CONNECTING = 0.3
+DENSITY_THRESHOLD_CONNECTING = 0.4
+LUMINOSITY_THRESHOLD = 0.7
+BRIGHT_RATIO_EMERGING = 0.6
+DARK_INFLUENCE_MAX = 0.2
+PHASE_STABILIZATION_DAYS = 14
+
+HYSTERESIS_FACTOR = 0.7
+REGRESSION_GRACE_CONNECTING = 7
+REGRESSION_GRACE_EMERGING = 7
+REGRESSION_GRACE_LUMINOUS = 14
+
+DARK_INFLUENCE_WEIGHT = 0.2
+
+# =============================================================================
+# CONSTANTS — JOURNEYS (from the-walk/02-blood.md)
+# =============================================================================
+
+MIN_VELOCITY = 0.0
+MAX_VELOCITY = 1.0
+
+MOMENTUM_DECAY = 0.05
+MOMENTUM_BOOST_FACTOR = 0.30
+
+BASE_THRUST = 0.10
+
+TIMEFRAME_MULTIPLIERS = {
+    "1_month": 0.8,
+    "3_month": 1.0,
+    "6_month": 1.2,
+    "1_year": 1.5,
+    "2_year": 2.0,
+    "5_year": 3.0,
+}
+
+EXPERIMENT_THRUST = {
+    "tiny": 0.01,
+    "small": 0.02,
+    "medium": 0.03,
+    "stretch": 0.05,
+}
+
+BASE_DECAY = 0.02
+DECAY_ACCELERATION = 0.01
+
+STALL_THRESHOLD = 0.05
+STALL_DAYS = 14
+
+MAX_ACTIVE_JOURNEYS = 3
+
+# =============================================================================
+# CONSTANTS — HORIZON (from the-horizon/02-blood.md)
+# =============================================================================
+
+SLINGSHOT_POWER = {
+    "3_month": 0.15,
+    "6_month": 0.25,
+    "1_year": 0.40,
+    "3_year": 0.60,
+    "5_year": 0.80,
+    "10_year": 1.00,
+}
+MILESTONE_MOMENTUM = {"3_month": 0.5, "6_month": 0.75, "1_year": 1.0,
+                      "3_year": 1.5, "5_year": 2.0, "10_year": 3.0}
+
+MOMENTUM_AMPLIFIER = 0.20
+MAX_ACCUMULATED_VELOCITY = 2.0
+
+DRIFT_THRESHOLD = 0.10
+DRIFT_DAYS = 30
+DARK_GRAVITY = 0.05
+MAX_DRIFT_PULL = 0.30
+DARK_DISTANCE = 2.0
+
+HORIZON_MOMENTUM_DECAY = 0.02
+MILESTONE_MOMENTUM_BASE = 0.20
+
+
+# =============================================================================
+# CODES
+# =============================================================================
+# Categorical fields are stored as small integer codes. The lookup tables
+# below are built from the dicts above with the same .get() defaults the
+# per-system scripts use, so a code lookup gives the value the script would.
+
+DOMAINS = tuple(DOMAIN_HALF_LIVES)
+DIFFICULTIES = tuple(DIFFICULTY_MULTIPLIERS)
+DEPTHS = tuple(DEPTH_MULTIPLIERS)
+SOURCES = tuple(SOURCE_MULTIPLIERS)
+STAR_STATES = ("nascent", "flickering", "dim", "bright", "dark", "dormant")
+EVIDENCE_TYPES = tuple(EVIDENCE_IMPACTS)
+CONNECTION_TYPES = tuple(CONNECTION_HALF_LIVES)
+CONNECTION_STATES = ("nascent", "forming", "weak", "moderate", "strong", "dormant")
+PHASES = ("SCATTERED", "CONNECTING", "EMERGING", "LUMINOUS")
+TIMEFRAMES = ("1_month", "3_month", "6_month", "1_year", "2_year", "3_year", "5_year", "10_year")
+JOURNEY_STATES = ("walking", "complete")
+HORIZON_STATES = ("active", "drifting")
+
+NASCENT, FLICKERING, DIM, BRIGHT, DARK, DORMANT = range(len(STAR_STATES))
+C_NASCENT, C_FORMING, C_WEAK, C_MODERATE, C_STRONG, C_DORMANT = range(len(CONNECTION_STATES))
+SCATTERED, CONNECTING, EMERGING, LUMINOUS = range(len(PHASES))
+WALKING, COMPLETE = range(len(JOURNEY_STATES))
+ACTIVE, DRIFTING = range(len(HORIZON_STATES))
+NO_MILESTONE = -1
+
+
+def _daily_decay_rate(half_life: int) -> float:
+    """Convert half-life to daily decay rate"""
+    return 1 - (0.5 ** (1 / half_life))
+
+
+def _streak_bonus(streak_days: int) -> float:
+    if streak_days <= 1:
+        return 1.0
+    return min(1 + STREAK_GROWTH_RATE * math.log(streak_days), MAX_STREAK_BONUS)
+
+
+def _skip_penalty(consecutive_skips: int) -> float:
+    if consecutive_skips <= 1:
+        return 0
+    if consecutive_skips == 2:
+        return BASE_SKIP_PENALTY
+    if consecutive_skips == 3:
+        return BASE_SKIP_PENALTY * 1.5
+    return BASE_SKIP_PENALTY * MAX_SKIP_MULTIPLIER
+
+
+DOMAIN_DECAY_RATE = tuple(_daily_decay_rate(DOMAIN_HALF_LIVES[d]) for d in DOMAINS)
+EXPERIMENT_MULTIPLIER = tuple(DIFFICULTY_MULTIPLIERS[d] for d in DIFFICULTIES)
+EXPERIMENT_THRUST_BY_CODE = tuple(EXPERIMENT_THRUST.get(d, 0.02) for d in DIFFICULTIES)
+INSIGHT_GAIN = tuple(tuple(INSIGHT_IMPACT * DEPTH_MULTIPLIERS[d] * SOURCE_MULTIPLIERS[s]
+                           for s in SOURCES) for d in DEPTHS)
+STAR_DORMANCY = tuple(STAR_DORMANCY_THRESHOLDS.get(s, 30) for s in STAR_STATES)
+EVIDENCE_IMPACT_BY_CODE = tuple(EVIDENCE_IMPACTS[e] for e in EVIDENCE_TYPES)
+CONNECTION_DECAY_RATE = tuple(_daily_decay_rate(CONNECTION_HALF_LIVES[t]) for t in CONNECTION_TYPES)
+CONNECTION_DORMANCY = tuple(CONNECTION_DORMANCY_THRESHOLDS.get(s, 30) for s in CONNECTION_STATES)
+TIMEFRAME_MULTIPLIER = tuple(TIMEFRAME_MULTIPLIERS.get(t, 1.0) for t in TIMEFRAMES)
+SLINGSHOT_POWER_BY_CODE = tuple(SLINGSHOT_POWER.get(t, 0.25) for t in TIMEFRAMES)
+MILESTONE_MOMENTUM_BY_CODE = tuple(MILESTONE_MOMENTUM.get(t, 1.0) for t in TIMEFRAMES)
+
+# The streak bonus saturates once log(streak) passes the cap, so the table
+# stops at the first capped day and longer streaks read MAX_STREAK_BONUS.
+STREAK_BONUS = tuple(_streak_bonus(s) for s in range(
+    math.ceil(math.exp((MAX_STREAK_BONUS - 1) / STREAK_GROWTH_RATE)) + 1))
+SKIP_PENALTY = tuple(_skip_penalty(s) for s in range(5))
+DECAY_SPAN = MAX_BRIGHTNESS - MIN_BRIGHTNESS
+STRENGTH_SPAN = MAX_STRENGTH - STRENGTH_FLOOR
+VARIANCE_RETAINED = 1 - VARIANCE_SMOOTHING_FACTOR
+
+
+# =============================================================================
+# POPULATION STATE
+# =============================================================================
+
+@dataclass
+class StarColumns:
+    """Every star in the population. User u owns offsets[u]:offsets[u + 1].
+
+    brightness-decay owns brightness, streak_days, consecutive_skips,
+    days_since_engaged and returning; it also records today's engagement
+    and the brightness the day started with for the stages after it.
+    constellation-states owns variance, state, days_stable, days_inactive
+    and contradiction_count.
+    """
+    offsets: array = field(default_factory=lambda: array('l', [0]))
+    domain: array = field(default_factory=lambda: array('b'))
+    brightness: array = field(default_factory=lambda: array('d'))
+    streak_days: array = field(default_factory=lambda: array('l'))
+    consecutive_skips: array = field(default_factory=lambda: array('l'))
+    days_since_engaged: array = field(default_factory=lambda: array('l'))
+    returning: array = field(default_factory=lambda: array('b'))
+    engaged: array = field(default_factory=lambda: array('b'))
+    previous_brightness: array = field(default_factory=lambda: array('d'))
+    variance: array = field(default_factory=lambda: array('d'))
+    state: array = field(default_factory=lambda: array('b'))
+    days_stable: array = field(default_factory=lambda: array('l'))
+    days_inactive: array = field(default_factory=lambda: array('l'))
+    contradiction_count: array = field(default_factory=lambda: array('l'))
+    dark_candidate: array = field(default_factory=lambda: array('b'))
+
+    def __len__(self) -> int:
+        return len(self.brightness)
+
+
+@dataclass
+class ConnectionColumns:
+    """Every connection. User u owns offsets[u]:offsets[u + 1]; star_a and
+    star_b are global star indices. The evidence log is not kept, only its
+    count, which is all the state rules read."""
+    offsets: array = field(default_factory=lambda: array('l', [0]))
+    star_a: array = field(default_factory=lambda: array('l'))
+    star_b: array = field(default_factory=lambda: array('l'))
+    type: array = field(default_factory=lambda: array('b'))
+    strength: array = field(default_factory=lambda: array('d'))
+    state: array = field(default_factory=lambda: array('b'))
+    evidence_count: array = field(default_factory=lambda: array('l'))
+    days_inactive: array = field(default_factory=lambda: array('l'))
+
+    def __len__(self) -> int:
+        return len(self.strength)
+
+
+@dataclass
+class JourneyColumns:
+    """Every journey. User u owns offsets[u]:offsets[u + 1]; each journey
+    walks toward one of its user's stars and is that user's Horizon walk.
+    milestone holds the timeframe code reached today, or NO_MILESTONE."""
+    offsets: array = field(default_factory=lambda: array('l', [0]))
+    star: array = field(default_factory=lambda: array('l'))
+    velocity: array = field(default_factory=lambda: array('d'))
+    momentum: array = field(default_factory=lambda: array('d'))
+    distance_to_next: array = field(default_factory=lambda: array('d'))
+    days_active: array = field(default_factory=lambda: array('l'))
+    days_inactive: array = field(default_factory=lambda: array('l'))
+    milestones_reached: array = field(default_factory=lambda: array('l'))
+    total_milestones: array = field(default_factory=lambda: array('l'))
+    state: array = field(default_factory=lambda: array('b'))
+    stalled: array = field(default_factory=lambda: array('b'))
+    milestone: array = field(default_factory=lambda: array('b'))
+
+    def __len__(self) -> int:
+        return len(self.velocity)
+
+
+@dataclass
+class UserColumns:
+    """One row per user: constellation phase and Horizon."""
+    phase: array = field(default_factory=lambda: array('b'))
+    days_in_phase: array = field(default_factory=lambda: array('l'))
+    days_below_threshold: array = field(default_factory=lambda: array('l'))
+    horizon_state: array = field(default_factory=lambda: array('b'))
+    slingshot_velocity: array = field(default_factory=lambda: array('d'))
+    horizon_momentum: array = field(default_factory=lambda: array('d'))
+    distance_to_dark: array = field(default_factory=lambda: array('d'))
+    days_drifting: array = field(default_factory=lambda: array('l'))
+    horizon_milestones: array = field(default_factory=lambda: array('l'))
+    years_active: array = field(default_factory=lambda: array('d'))
+
+    def __len__(self) -> int:
+        return len(self.phase)
+
+
+@dataclass
+class Population:
+    """The shared state every stage of the daily tick reads and writes."""
+    stars: StarColumns = field(default_factory=StarColumns)
+    connections: ConnectionColumns = field(default_factory=ConnectionColumns)
+    journeys: JourneyColumns = field(default_factory=JourneyColumns)
+    users: UserColumns = field(default_factory=UserColumns)
+    day: int = 0
+
+    @property
+    def num_users(self) -> int:
+        return len(self.users)
+
+    def add_user(self, stars: Sequence[Tuple[str, float]],
+                 connections: Sequence[Tuple[int, int, str]] = (),
+                 journeys: Sequence[Tuple[int, int]] = ()) -> int:
+        """Append a user and return their index.
+
+        stars are (domain, brightness); connections are (star, star, type)
+        and journeys (star, total_milestones), with stars indexed within
+        this user.
+        """
+        s, c, j, u = self.stars, self.connections, self.journeys, self.users
+        base = len(s)
+        for domain, brightness in stars:
+            s.domain.append(DOMAINS.index(domain))
+            s.brightness.append(brightness)
+            s.previous_brightness.append(brightness)
+            s.variance.append(0.15)
+            s.state.append(FLICKERING)
+        for column in (s.streak_days, s.consecutive_skips, s.days_since_engaged,
+                       s.days_stable, s.days_inactive, s.contradiction_count):
+            column.extend([0] * len(stars))
+        for column in (s.returning, s.engaged, s.dark_candidate):
+            column.extend([0] * len(stars))
+        s.offsets.append(len(s))
+
+        for a, b, kind in connections:
+            c.star_a.append(base + a)
+            c.star_b.append(base + b)
+            c.type.append(CONNECTION_TYPES.index(kind))
+            c.strength.append(0.0)
+            c.state.append(C_NASCENT)
+            c.evidence_count.append(0)
+            c.days_inactive.append(0)
+        c.offsets.append(len(c))
+
+        for star, total in journeys[:MAX_ACTIVE_JOURNEYS]:
+            j.star.append(base + star)
+            j.velocity.append(0.05)
+            j.momentum.append(0.0)
+            j.distance_to_next.append(1.0)
+            j.total_milestones.append(total)
+            j.state.append(WALKING)
+            j.milestone.append(NO_MILESTONE)
+            for column in (j.days_active, j.days_inactive, j.milestones_reached, j.stalled):
+                column.append(0)
+        j.offsets.append(len(j))
+
+        u.phase.append(SCATTERED)
+        u.horizon_state.append(ACTIVE)
+        u.distance_to_dark.append(DARK_DISTANCE)
+        for column in (u.days_in_phase, u.days_below_threshold, u.days_drifting,
+                       u.horizon_milestones):
+            column.append(0)
+        for column in (u.slingshot_velocity, u.horizon_momentum, u.years_active):
+            column.append(0.0)
+        return len(u) - 1
+
+
+@dataclass
+class DayInputs:
+    """What happened today, in the same layout as the population.
+
+    Star i's experiments are exp_*[exp_offsets[i]:exp_offsets[i + 1]] and its
+    insights insight_*[insight_offsets[i]:insight_offsets[i + 1]]; connection
+    k's evidence is evidence[evidence_offsets[k]:evidence_offsets[k + 1]];
+    milestone[j] is the timeframe code journey j reached, or NO_MILESTONE.
+    """
+    engaged: array = field(default_factory=lambda: array('b'))
+    skips: array = field(default_factory=lambda: array('l'))
+    contradictions: array = field(default_factory=lambda: array('l'))
+    exp_offsets: array = field(default_factory=lambda: array('l', [0]))
+    exp_difficulty: array = field(default_factory=lambda: array('b'))
+    exp_alignment: array = field(default_factory=lambda: array('d'))
+    exp_novel: array = field(default_factory=lambda: array('b'))
+    insight_offsets: array = field(default_factory=lambda: array('l', [0]))
+    insight_depth: array = field(default_factory=lambda: array('b'))
+    insight_source: array = field(default_factory=lambda: array('b'))
+    evidence_offsets: array = field(default_factory=lambda: array('l', [0]))
+    evidence: array = field(default_factory=lambda: array('b'))
+    milestone: array = field(default_factory=lambda: array('b'))
+
+
+# =============================================================================
+# STAGES
+# =============================================================================
+
+def tick_brightness(population: Population, inputs: DayInputs):
+    """brightness-decay update_star for every star.
+
+    A star engaging after an absence is marked returning, as the
+    brightness-decay scenarios do on the day a user comes back.
+    """
+    s = population.stars
+    brightness, previous = s.brightness, s.previous_brightness
+    streak, skipped, since = s.streak_days, s.consecutive_skips, s.days_since_engaged
+    returning, engaged_today, domain = s.returning, s.engaged, s.domain
+    engaged_in, skips, contradictions = inputs.engaged, inputs.skips, inputs.contradictions
+    exp_offsets, difficulty = inputs.exp_offsets, inputs.exp_difficulty
+    alignment, novel = inputs.exp_alignment, inputs.exp_novel
+    insight_offsets, depth, source = inputs.insight_offsets, inputs.insight_depth, inputs.insight_source
+    last_streak = len(STREAK_BONUS)
+
+    for i in range(len(brightness)):
+        b = brightness[i]
+        engaged = engaged_in[i]
+        days_absent = since[i]
+        if engaged and days_absent:
+            returning[i] = 1
+
+        # Gains
+        experiment_gain = 0
+        for k in range(exp_offsets[i], exp_offsets[i + 1]):
+            impact = BASE_EXPERIMENT_IMPACT * EXPERIMENT_MULTIPLIER[difficulty[k]] * alignment[k]
+            experiment_gain += impact * (NOVELTY_BONUS if novel[k] else 1.0)
+        insight_gain = 0
+        for k in range(insight_offsets[i], insight_offsets[i + 1]):
+            insight_gain += INSIGHT_GAIN[depth[k]][source[k]]
+        recovery = 0
+        if returning[i] and days_absent >= RECOVERY_MIN_DAYS:
+            recovery = RECOVERY_BASE * min(
+                1 + RECOVERY_SCALE * math.log(days_absent / RECOVERY_MIN_DAYS),
+                RECOVERY_MAX_MULTIPLIER
+            )
+        gains = experiment_gain + insight_gain + recovery
+        days = streak[i]
+        gains *= STREAK_BONUS[days] if days < last_streak else MAX_STREAK_BONUS
+        gains = min(gains, MAX_DAILY_GAIN)
+
+        # Losses
+        pending_skips = skipped[i] + skips[i]
+        skip_penalty = SKIP_PENALTY[pending_skips] if pending_skips < 4 else SKIP_PENALTY[4]
+        decay = 0
+        if not engaged:
+            zone_factor = 0.5 if b < MAINTENANCE_ZONE else 1.0
+            decay = b * DOMAIN_DECAY_RATE[domain[i]] * ((b - MIN_BRIGHTNESS) / DECAY_SPAN) * zone_factor
+        if days_absent < NEGLECT_THRESHOLD_1:
+            neglect = 1.0
+        elif days_absent < NEGLECT_THRESHOLD_2:
+            neglect = NEGLECT_MULTIPLIER_1
+        else:
+            neglect = NEGLECT_MULTIPLIER_2
+        losses = (skip_penalty + contradictions[i] * CONTRADICTION_PENALTY + decay) * neglect
+
+        new = b + gains - losses
+        if new < SOFT_FLOOR_ZONE:
+            new = MIN_BRIGHTNESS + ((new - MIN_BRIGHTNESS) * SOFT_FLOOR_FACTOR)
+        previous[i] = b
+        brightness[i] = max(MIN_BRIGHTNESS, min(MAX_BRIGHTNESS, new))
+
+        if engaged:
+            streak[i] = days + 1
+            since[i] = 0
+            skipped[i] = 0
+            returning[i] = 0
+        else:
+            streak[i] = max(0, int(days * STREAK_PRESERVATION_RATE))
+            since[i] = days_absent + 1
+            skipped[i] = pending_skips
+        engaged_today[i] = engaged
+
+
+def tick_star_state(population: Population, inputs: DayInputs):
+    """constellation-states variance, stability and state for every star,
+    driven by the brightness change tick_brightness recorded."""
+    s = population.stars
+    brightness, previous, variance = s.brightness, s.previous_brightness, s.variance
+    state, stable, inactive = s.state, s.days_stable, s.days_inactive
+    contradiction_count, dark_candidate, engaged = s.contradiction_count, s.dark_candidate, s.engaged
+    contradictions = inputs.contradictions
+
+    for i in range(len(brightness)):
+        b = brightness[i]
+        v = VARIANCE_SMOOTHING_FACTOR * abs(b - previous[i]) + VARIANCE_RETAINED * variance[i]
+        v = max(0, min(1, v))
+        variance[i] = v
+        contradiction_count[i] += contradictions[i]
+        inactive[i] = 0 if engaged[i] else inactive[i] + 1
+        stable[i] = stable[i] + 1 if v < VARIANCE_THRESHOLD_LOW else 0
+
+        if inactive[i] >= STAR_DORMANCY[state[i]]:
+            state[i] = DORMANT
+        elif dark_candidate[i] and contradiction_count[i] >= DARK_CONTRADICTIONS:
+            state[i] = DARK
+        elif v > VARIANCE_THRESHOLD_HIGH:
+            state[i] = FLICKERING
+        elif b >= BRIGHTNESS_THRESHOLD_BRIGHT and stable[i] >= STAR_STABILIZATION_DAYS:
+            state[i] = BRIGHT
+        elif b < BRIGHTNESS_THRESHOLD_DIM and stable[i] >= STAR_STABILIZATION_DAYS:
+            state[i] = DIM
+        else:
+            state[i] = FLICKERING
+
+
+def tick_connections(population: Population, inputs: DayInputs):
+    """connection-formation simulate_day for every connection. A connection
+    counts as engaged when either of its stars was engaged today."""
+    c = population.connections
+    engaged = population.stars.engaged
+    star_a, star_b, kind = c.star_a, c.star_b, c.type
+    strength, state, evidence_count, inactive = c.strength, c.state, c.evidence_count, c.days_inactive
+    offsets, evidence = inputs.evidence_offsets, inputs.evidence
+    last_factor = len(DIMINISHING_FACTORS) - 1
+
+    for k in range(len(strength)):
+        start, end = offsets[k], offsets[k + 1]
+        gained = 0.0
+        total_gain = 0.0
+        for n in range(end - start):
+            impact = EVIDENCE_IMPACT_BY_CODE[evidence[start + n]] * DIMINISHING_FACTORS[min(n, last_factor)]
+            impact = min(impact, MAX_DAILY_STRENGTH_GAIN - gained)
+            if impact > 0:
+                evidence_count[k] += 1
+                total_gain += impact
+                gained += impact
+        s = max(MIN_STRENGTH, min(MAX_STRENGTH, strength[k] + total_gain))
+
+        if start == end and not (engaged[star_a[k]] or engaged[star_b[k]]):
+            effective = (s - STRENGTH_FLOOR) / STRENGTH_SPAN if s > STRENGTH_FLOOR else 0
+            decay = s * CONNECTION_DECAY_RATE[kind[k]] * effective
+            s = max(STRENGTH_FLOOR, min(MAX_STRENGTH, s - decay))
+            inactive[k] += 1
+        else:
+            inactive[k] = 0
+        strength[k] = s
+
+        e = evidence_count[k]
+        if inactive[k] >= CONNECTION_DORMANCY[state[k]]:
+            state[k] = C_DORMANT
+        elif s >= 0.80 and e >= EVIDENCE_FOR_STRONG:
+            state[k] = C_STRONG
+        elif s >= 0.60 and e >= EVIDENCE_FOR_MODERATE:
+            state[k] = C_MODERATE
+        elif s >= 0.40 and e >= EVIDENCE_FOR_WEAK:
+            state[k] = C_WEAK
+        elif s >= 0.20 and e >= EVIDENCE_FOR_FORMING:
+            state[k] = C_FORMING
+        else:
+            state[k] = C_NASCENT
+
+
+def tick_phase(population: Population, inputs: DayInputs):
+    """phase-transitions update_phase for every user, from the star and
+    connection states written earlier in the tick.
+
+    Dormant stars and dormant connections are left out of the constellation.
+    days_below_threshold follows the phase-transitions regression scenario:
+    it counts consecutive days with integration under the hysteresis line.
+    """
+    s, c, u = population.stars, population.connections, population.users
+    star_offsets, brightness, star_state = s.offsets, s.brightness, s.state
+    conn_offsets, conn_state = c.offsets, c.state
+    phase, days_in_phase, days_below = u.phase, u.days_in_phase, u.days_below_threshold
+
+    for user in range(len(phase)):
+        active = [brightness[i] for i in range(star_offsets[user], star_offsets[user + 1])
+                  if star_state[i] != DORMANT]
+        dark = [brightness[i] for i in range(star_offsets[user], star_offsets[user + 1])
+                if star_state[i] == DARK]
+        connections = sum(1 for k in range(conn_offsets[user], conn_offsets[user + 1])
+                          if conn_state[k] != C_DORMANT)
+        n = len(active)
+
+        density = connections / (n * (n - 1) / 2) if n >= 2 else 0
+        if n:
+            bright_ratio = len([b for b in active if b >= BRIGHTNESS_THRESHOLD_BRIGHT]) / n
+            total = 0
+            for b in dark:
+                total += (1 - b) * DARK_INFLUENCE_WEIGHT
+            dark_influence = min(total / n, 1.0)
+            if n > 1:
+                mean_b = sum(active) / n
+                std_b = math.sqrt(sum((b - mean_b) ** 2 for b in active) / n)
+            else:
+                std_b = 0
+            integration = density * 0.4 + (1 - std_b) * 0.3 + (1 - dark_influence) * 0.3
+        else:
+            bright_ratio = dark_influence = integration = 0
+        luminosity = (bright_ratio * 0.4 + 0.7 * density * 0.25 +
+                      0.8 * 0.2 - dark_influence * 0.15)
+
+        if integration < INTEGRATION_THRESHOLD * HYSTERESIS_FACTOR:
+            days_below[user] += 1
+        else:
+            days_below[user] = 0
+
+        current = phase[user]
+        new = current
+        if current == SCATTERED:
+            if connections >= CONNECTION_THRESHOLD_FORWARD or density >= DENSITY_THRESHOLD_FORWARD:
+                new = CONNECTING
+        elif current == CONNECTING:
+            if (integration >= INTEGRATION_THRESHOLD and
+                    bright_ratio >= BRIGHT_RATIO_CONNECTING and
+                    density >= DENSITY_THRESHOLD_CONNECTING):
+                new = EMERGING
+        elif current == EMERGING:
+            if (luminosity >= LUMINOSITY_THRESHOLD and
+                    bright_ratio >= BRIGHT_RATIO_EMERGING and
+                    dark_influence <= DARK_INFLUENCE_MAX and
+                    days_in_phase[user] >= PHASE_STABILIZATION_DAYS):
+                new = LUMINOUS
+
+        if new == current:
+            if current == CONNECTING:
+                if (connections < CONNECTION_THRESHOLD_FORWARD * HYSTERESIS_FACTOR and
+                        density < DENSITY_THRESHOLD_FORWARD * HYSTERESIS_FACTOR and
+                        days_below[user] >= REGRESSION_GRACE_CONNECTING):
+                    new = SCATTERED
+            elif current == EMERGING:
+                if ((integration < INTEGRATION_THRESHOLD * HYSTERESIS_FACTOR or
+                        bright_ratio < BRIGHT_RATIO_CONNECTING * HYSTERESIS_FACTOR) and
+                        days_below[user] >= REGRESSION_GRACE_EMERGING):
+                    new = CONNECTING
+            elif current == LUMINOUS:
+                if ((luminosity < LUMINOSITY_THRESHOLD * HYSTERESIS_FACTOR or
+                        bright_ratio < BRIGHT_RATIO_EMERGING * HYSTERESIS_FACTOR) and
+                        days_below[user] >= REGRESSION_GRACE_LUMINOUS):
+                    new = EMERGING
+
+        if new != current:
+            phase[user] = new
+            days_in_phase[user] = 0
+            days_below[user] = 0
+        else:
+            days_in_phase[user] += 1
+
+
+def tick_journeys(population: Population, inputs: DayInputs):
+    """the-walk update_journey for every journey.
+
+    Thrust comes from the experiments logged on the journey's star, with
+    the experiment's alignment as its relevance, and engagement is the
+    star's. A journey that reaches a milestone starts its next leg at
+    full distance, as in the-walk scenarios.
+    """
+    j = population.journeys
+    engaged = population.stars.engaged
+    star, velocity, momentum, distance = j.star, j.velocity, j.momentum, j.distance_to_next
+    active, inactive, reached, total = j.days_active, j.days_inactive, j.milestones_reached, j.total_milestones
+    state, stalled, milestone = j.state, j.stalled, j.milestone
+    exp_offsets, difficulty, alignment = inputs.exp_offsets, inputs.exp_difficulty, inputs.exp_alignment
+    milestone_in = inputs.milestone
+
+    for k in range(len(velocity)):
+        i = star[k]
+        thrust = 0
+        for e in range(exp_offsets[i], exp_offsets[i + 1]):
+            thrust += EXPERIMENT_THRUST_BY_CODE[difficulty[e]] * alignment[e]
+        acceleration = thrust * (1 + (momentum[k] * MOMENTUM_BOOST_FACTOR))
+
+        timeframe = milestone_in[k]
+        milestone[k] = timeframe
+        if timeframe != NO_MILESTONE:
+            acceleration += BASE_THRUST * TIMEFRAME_MULTIPLIER[timeframe] * (1 + (reached[k] * 0.1))
+            reached[k] += 1
+
+        if engaged[i]:
+            decay = 0
+            inactive[k] = 0
+            active[k] += 1
+        else:
+            days = inactive[k] + 1
+            inactive[k] = days
+            decay = velocity[k] * (BASE_DECAY + (DECAY_ACCELERATION * days))
+
+        delta = acceleration - decay
+        v = max(MIN_VELOCITY, min(MAX_VELOCITY, velocity[k] + delta))
+        velocity[k] = v
+        m = momentum[k] + delta if delta > 0 else momentum[k]
+        momentum[k] = max(0, m * (1 - MOMENTUM_DECAY))
+        distance[k] = 1.0 if timeframe != NO_MILESTONE else max(0, distance[k] - v * 0.1)
+
+        stalled[k] = v < STALL_THRESHOLD and inactive[k] >= STALL_DAYS
+        if reached[k] >= total[k]:
+            state[k] = COMPLETE
+
+
+def tick_horizon(population: Population, inputs: DayInputs):
+    """the-horizon update_horizon_daily for every user, with the user's
+    journeys as its walks, then complete_milestone for each milestone
+    tick_journeys recorded today.
+
+    Journey velocities were already advanced by tick_journeys, so the
+    Horizon's own simplified walk update is not applied again; the
+    slingshot is written back to the journey's velocity.
+    """
+    j, u = population.journeys, population.users
+    offsets, velocity, milestone = j.offsets, j.velocity, j.milestone
+    state, slingshot, momentum = u.horizon_state, u.slingshot_velocity, u.horizon_momentum
+    distance, drifting, milestones, years = u.distance_to_dark, u.days_drifting, u.horizon_milestones, u.years_active
+
+    for user in range(len(state)):
+        start, end = offsets[user], offsets[user + 1]
+        avg_velocity = sum(velocity[start:end]) / (end - start) if end > start else 0
+
+        momentum[user] = momentum[user] * (1 - HORIZON_MOMENTUM_DECAY) + avg_velocity * 0.05
+        slingshot[user] *= (1 - HORIZON_MOMENTUM_DECAY / 2)
+
+        if avg_velocity < DRIFT_THRESHOLD:
+            drifting[user] += 1
+            if drifting[user] >= DRIFT_DAYS:
+                state[user] = DRIFTING
+                d = distance[user]
+                if d > 0.1:
+                    pull = min(DARK_GRAVITY / d**2, MAX_DRIFT_PULL)
+                    distance[user] = max(0.1, d - pull * (1 - avg_velocity))
+        else:
+            drifting[user] = 0
+            if state[user] == DRIFTING:
+                state[user] = ACTIVE
+
+        years[user] += 1/365
+
+        for k in range(start, end):
+            timeframe = milestone[k]
+            if timeframe == NO_MILESTONE:
+                continue
+            multiplier = SLINGSHOT_POWER_BY_CODE[timeframe] * (1 + (slingshot[user] * MOMENTUM_AMPLIFIER))
+            v = velocity[k]
+            velocity[k] = min(1.0, v * (1 + multiplier))
+            slingshot[user] = min(slingshot[user] + v * multiplier, MAX_ACCUMULATED_VELOCITY)
+            momentum[user] += MILESTONE_MOMENTUM_BASE * MILESTONE_MOMENTUM_BY_CODE[timeframe]
+            milestones[user] += 1
+
+
+# Dependency order: each stage reads columns written by the ones before it.
+STAGES: Tuple[Callable[[Population, DayInputs], None], ...] = (
+    tick_brightness,
+    tick_star_state,
+    tick_connections,
+    tick_phase,
+    tick_journeys,
+    tick_horizon,
+)
+
+
+def tick_day(population: Population, inputs: DayInputs):
+    """Advance every mechanic for every user by one day."""
+    for stage in STAGES:
+        stage(population, inputs)
+    population.day += 1
+
+
+# =============================================================================
+# WORKLOAD
+# =============================================================================
+
+def generate_population(size: int, seed: int = 0) -> Population:
+    """Synthetic population with varied constellations and journeys."""
+    rng = random.Random(seed)
+    population = Population()
+    for _ in range(size):
+        count = rng.randint(3, 8)
+        stars = [(rng.choice(DOMAINS), round(min(0.9, max(0.1, rng.gauss(0.35, 0.15))), 3))
+                 for _ in range(count)]
+        pairs = [(a, b) for a in range(count) for b in range(a + 1, count)]
+        connections = [(a, b, rng.choice(CONNECTION_TYPES))
+                       for a, b in rng.sample(pairs, rng.randint(0, min(6, len(pairs))))]
+        journeys = [(rng.randrange(count), rng.randint(3, 6))
+                    for _ in range(rng.randint(0, MAX_ACTIVE_JOURNEYS))]
+        user = population.add_user(stars, connections, journeys)
+        if rng.random() < 0.1:
+            population.stars.dark_candidate[population.stars.offsets[user]] = 1
+    return population
+
+
+def engagement_rates(population: Population, seed: int = 0) -> array:
+    """Per-user daily engagement probability, from drifting to devoted."""
+    rng = random.Random(seed)
+    return array('d', (rng.choice((0.1, 0.3, 0.6, 0.9)) for _ in range(population.num_users)))
+
+
+def generate_day_inputs(population: Population, rates: array, rng: random.Random) -> DayInputs:
+    """One day of synthetic events for the whole population."""
+    s, c, j = population.stars, population.connections, population.journeys
+    inputs = DayInputs()
+    for user in range(population.num_users):
+        rate = rates[user]
+        for _ in range(s.offsets[user], s.offsets[user + 1]):
+            engaged = rng.random() < rate
+            inputs.engaged.append(engaged)
+            inputs.skips.append(0 if engaged or rng.random() < 0.5 else 1)
+            inputs.contradictions.append(1 if rng.random() < 0.02 else 0)
+            if engaged:
+                for _ in range(1 if rng.random() < 0.8 else 2):
+                    inputs.exp_difficulty.append(rng.randrange(len(DIFFICULTIES)))
+                    inputs.exp_alignment.append(rng.choice((0.5, 0.8, 1.0)))
+                    inputs.exp_novel.append(rng.random() < 0.1)
+                if rng.random() < 0.3:
+                    inputs.insight_depth.append(rng.randrange(len(DEPTHS)))
+                    inputs.insight_source.append(rng.randrange(len(SOURCES)))
+            inputs.exp_offsets.append(len(inputs.exp_difficulty))
+            inputs.insight_offsets.append(len(inputs.insight_depth))
+
+    engaged = inputs.engaged
+    for k in range(len(c)):
+        if engaged[c.star_a[k]] and engaged[c.star_b[k]] and rng.random() < 0.4:
+            inputs.evidence.append(rng.randrange(3))
+            if rng.random() < 0.05:
+                inputs.evidence.append(EVIDENCE_TYPES.index("user_confirms"))
+        inputs.evidence_offsets.append(len(inputs.evidence))
+
+    for k in range(len(j)):
+        reached = engaged[j.star[k]] and rng.random() < 1 / 30
+        inputs.milestone.append(rng.randrange(4) if reached else NO_MILESTONE)
+    return inputs
+
+
+def simulate_population(size: int, days: int, seed: int = 0) -> Tuple[Population, float]:
+    """Run the daily tick over a synthetic population.
+
+    Returns the population and the seconds spent inside tick_day.
+    """
+    population = generate_population(size, seed)
+    rates = engagement_rates(population, seed)
+    rng = random.Random(seed)
+    elapsed = 0.0
+    for _ in range(days):
+        inputs = generate_day_inputs(population, rates, rng)
+        start = time.perf_counter()
+        tick_day(population, inputs)
+        elapsed += time.perf_counter() - start
+    return population, elapsed
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def distribution(codes: array, names: Sequence[str]) -> Dict[str, int]:
+    counts = [0] * len(names)
+    for code in codes:
+        counts[code] += 1
+    return dict(zip(names, counts))
+
+
+def print_distribution(title: str, counts: Dict[str, int]):
+    total = sum(counts.values()) or 1
+    print(f"\n{title}:")
+    for name, count in counts.items():
+        print(f"  {name:<12} {count:>7}  ({count / total:6.1%})")
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("DAILY TICK SIMULATION")
+    print("=" * 60)
+
+    size, days = 1000, 90
+    population, elapsed = simulate_population(size, days, seed=42)
+    s, c, j, u = population.stars, population.connections, population.journeys, population.users
+
+    print(f"\nPopulation: {size} users, {len(s)} stars, {len(c)} connections, {len(j)} journeys")
+    print(f"Days simulated: {population.day}")
+
+    print_distribution("Star states", distribution(s.state, STAR_STATES))
+    print_distribution("Connection states", distribution(c.state, CONNECTION_STATES))
+    print_distribution("Phases", distribution(u.phase, PHASES))
+    print_distribution("Journeys", distribution(j.state, JOURNEY_STATES))
+    print(f"  {'stalled':<12} {sum(j.stalled):>7}")
+    print_distribution("Horizons", distribution(u.horizon_state, HORIZON_STATES))
+
+    print(f"\nMean brightness: {sum(s.brightness) / len(s):.3f}")
+    print(f"Mean journey velocity: {sum(j.velocity) / max(1, len(j)):.3f}")
+    print(f"Horizon milestones: {sum(u.horizon_milestones)}")
+
+    user_days = size * days
+    print(f"\nTick time: {elapsed:.2f}s for {user_days} user-days "
+          f"({user_days / elapsed:,.0f} user-days/s)")
+
+    print("\n" + "=" * 60)
+    print("SIMULATION COMPLETE")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
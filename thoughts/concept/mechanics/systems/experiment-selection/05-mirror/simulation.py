@@ -7,9 +7,19 @@ Simulates the experiment selection algorithm from 02-blood.md to verify
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Dict, Optional, Tuple
+from typing import Awaitable, Callable, Iterable, Iterator, List, Dict, Optional, Set, Tuple
 from datetime import datetime, timedelta
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+import argparse
+import asyncio
+import bisect
+import heapq
+import math
 import random
+import threading
+import time
 
 # ============================================================================
 # CONSTANTS FROM 02-blood.md
@@ -38,6 +48,10 @@ BASE_URGENCY = {
     'DORMANT': 0.10,
 }
 
+# Compact integer codes for derived star states, for array-based scoring
+STATE_NAMES = tuple(BASE_URGENCY)
+STATE_CODE = {name: code for code, name in enumerate(STATE_NAMES)}
+
 # Stress to energy mapping
 STRESS_TO_ENERGY = {
     'LOW': 1.0,
@@ -87,6 +101,18 @@ DIFFICULTY_TIME = {
     'STRETCH': 45,
 }
 
+# Default difficulty by star state (before capacity adjustments)
+STATE_TO_DIFFICULTY = {
+    'FLICKERING': 'TINY',
+    'DARK_GROWING': 'TINY',
+    'DARK_STABLE': 'TINY',
+    'DIM_DECLINING': 'SMALL',
+    'DIM_STABLE': 'SMALL',
+    'BRIGHT_DECLINING': 'SMALL',
+    'BRIGHT_STABLE': 'MEDIUM',
+    'DORMANT': 'TINY',
+}
+
 # Connection constants
 GROWTH_EDGE_THRESHOLD = 0.65
 GROWTH_EDGE_BONUS_MIN = 0.15
@@ -112,6 +138,17 @@ MAX_PER_DOMAIN = 3
 DEFAULT_SUCCESS_RATE = 0.5
 DEFAULT_BASE_PROB = 0.5
 
+# Template history
+TEMPLATE_HISTORY_CAP = 64
+TEMPLATE_DECAY_ALPHA = 0.2
+
+# Journey simulation (brightness gain from brightness-decay scripture)
+JOURNEY_EXPERIMENT_IMPACT = 0.03
+JOURNEY_DIFFICULTY_GAIN = {'TINY': 0.5, 'SMALL': 0.75, 'MEDIUM': 1.0, 'STRETCH': 1.5}
+JOURNEY_COMPLETION_CHANCE = 0.7
+JOURNEY_MIN_BRIGHTNESS = 0.05
+JOURNEY_MAX_BRIGHTNESS = 1.0
+
 
 # ============================================================================
 # DATA CLASSES
@@ -151,9 +188,36 @@ class Star:
     brightness_history: List[float] = field(default_factory=list)
     is_dark: bool = False
     has_active_experiment: bool = False
+    _state: str = field(default='DIM_STABLE', init=False, repr=False, compare=False)
+    _simple_state: str = field(default='DIM', init=False, repr=False, compare=False)
+    state_code: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.refresh_state()
+
+    def refresh_state(self):
+        """Recompute the cached state after brightness, history or is_dark change."""
+        self._state = self._derive_state()
+        self._simple_state = self._derive_simple_state()
+        self.state_code = STATE_CODE[self._state]
+
+    def record_brightness(self, brightness: float):
+        """Set brightness, append it to history and refresh the cached state."""
+        self.brightness = brightness
+        self.brightness_history.append(brightness)
+        self.refresh_state()
 
     @property
     def state(self) -> str:
+        """Cached state; see refresh_state()."""
+        return self._state
+
+    @property
+    def simple_state(self) -> str:
+        """Cached simple state for success modifier lookup."""
+        return self._simple_state
+
+    def _derive_state(self) -> str:
         """Derive state from brightness and trajectory."""
         if self.brightness < 0.25:
             if self.is_dark:
@@ -186,8 +250,7 @@ class Star:
                     return 'BRIGHT_DECLINING'
             return 'BRIGHT_STABLE'
 
-    @property
-    def simple_state(self) -> str:
+    def _derive_simple_state(self) -> str:
         """Simple state for success modifier lookup."""
         if self.brightness < 0.25:
             return 'DARK'
@@ -207,6 +270,119 @@ class Connection:
     strength: float = 1.0
 
 
+class TemplateRegistry:
+    """Interns template names ("health-small") to small integer ids.
+
+    Selections may run on executor threads, so new names are added under a lock.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+
+    def intern(self, name: str) -> int:
+        template_id = self._ids.get(name)
+        if template_id is None:
+            with self._lock:
+                template_id = self._ids.get(name)
+                if template_id is None:
+                    template_id = len(self._names)
+                    self._names.append(name)
+                    self._ids[name] = template_id
+        return template_id
+
+    def lookup(self, name: str) -> int:
+        """Id for a name, or -1 if it was never interned."""
+        return self._ids.get(name, -1)
+
+    def name(self, template_id: int) -> str:
+        return self._names[template_id]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+TEMPLATES = TemplateRegistry()
+
+
+@dataclass
+class TemplateHistory:
+    """Bounded per-user template success rates, keyed by interned id.
+
+    Rates are exponentially decayed (each outcome moves the rate by
+    TEMPLATE_DECAY_ALPHA). At most `capacity` templates are kept; inserting
+    past that evicts the least frequently used one, oldest first on ties.
+    Columns are typed arrays, so an entry costs a few machine words plus its
+    slot in the id -> slot dict.
+    """
+    capacity: int = TEMPLATE_HISTORY_CAP
+    slots: Dict[int, int] = field(default_factory=dict)
+    ids: array = field(default_factory=lambda: array('l'))
+    rates: array = field(default_factory=lambda: array('d'))
+    uses: array = field(default_factory=lambda: array('l'))
+    touched: array = field(default_factory=lambda: array('l'))
+    clock: int = 0
+
+    @classmethod
+    def from_rates(cls, rates: Dict[str, float], capacity: int = TEMPLATE_HISTORY_CAP) -> 'TemplateHistory':
+        history = cls(capacity=capacity)
+        for name, rate in rates.items():
+            history.set_rate(TEMPLATES.intern(name), rate)
+        return history
+
+    def rate(self, template_id: int) -> Optional[float]:
+        """Current rate, or None if the template is not tracked."""
+        slot = self.slots.get(template_id)
+        return None if slot is None else self.rates[slot]
+
+    def set_rate(self, template_id: int, rate: float):
+        slot = self._slot_for(template_id)
+        self.rates[slot] = rate
+
+    def record(self, template_id: int, succeeded: bool):
+        """Fold one outcome into the decayed rate and count a use."""
+        if template_id not in self.slots:
+            self.set_rate(template_id, DEFAULT_SUCCESS_RATE)
+        slot = self.slots[template_id]
+        outcome = 1.0 if succeeded else 0.0
+        self.rates[slot] += TEMPLATE_DECAY_ALPHA * (outcome - self.rates[slot])
+        self.uses[slot] += 1
+        self.clock += 1
+        self.touched[slot] = self.clock
+
+    def _slot_for(self, template_id: int) -> int:
+        slot = self.slots.get(template_id)
+        if slot is not None:
+            return slot
+
+        self.clock += 1
+        if len(self.ids) < self.capacity:
+            slot = len(self.ids)
+            self.ids.append(template_id)
+            self.rates.append(0.0)
+            self.uses.append(0)
+            self.touched.append(self.clock)
+        else:
+            slot = min(range(len(self.ids)), key=lambda i: (self.uses[i], self.touched[i]))
+            del self.slots[self.ids[slot]]
+            self.ids[slot] = template_id
+            self.uses[slot] = 0
+            self.touched[slot] = self.clock
+        self.slots[template_id] = slot
+        return slot
+
+    def as_dict(self) -> Dict[str, float]:
+        return {TEMPLATES.name(self.ids[slot]): self.rates[slot] for slot in sorted(self.slots.values())}
+
+
+# User fields CapacityProfile reads; assigning one drops the cached profile
+CAPACITY_INPUTS = frozenset({
+    'stress_state', 'active_experiment_count', 'overall_completion_rate', 'day_of_week_success',
+    'optimal_windows', 'worst_windows', 'available_minutes',
+})
+
+
 @dataclass
 class User:
     stress_state: str = 'LOW'
@@ -216,7 +392,33 @@ class User:
     optimal_windows: List[Tuple[int, int]] = field(default_factory=lambda: [(6, 9), (12, 14), (18, 21)])
     worst_windows: List[Tuple[int, int]] = field(default_factory=lambda: [(22, 6)])
     available_minutes: int = 60
-    template_history: Dict[str, float] = field(default_factory=dict)
+    templates: TemplateHistory = field(default_factory=TemplateHistory, repr=False)
+
+    @classmethod
+    def from_template_rates(cls, rates: Dict[str, float], **fields) -> 'User':
+        """A user whose template history starts from the given success rates."""
+        return cls(templates=TemplateHistory.from_rates(rates), **fields)
+
+    def __setattr__(self, name: str, value):
+        if name in CAPACITY_INPUTS:
+            # Reassigning an equal scalar (e.g. the daily active count reset) keeps the profile
+            unchanged = type(value) in (int, float, str) and self.__dict__.get(name) == value
+            if not unchanged:
+                self.__dict__['_capacity'] = None
+        object.__setattr__(self, name, value)
+
+    @property
+    def capacity(self) -> 'CapacityProfile':
+        """Capacity profile, rebuilt on first use after any capacity input is reassigned."""
+        profile = self.__dict__.get('_capacity')
+        if profile is None:
+            profile = CapacityProfile.build(self)
+            object.__setattr__(self, '_capacity', profile)
+        return profile
+
+    def refresh_capacity(self):
+        """Drop the capacity profile after editing windows or day_of_week_success in place."""
+        object.__setattr__(self, '_capacity', None)
 
     def is_in_optimal_window(self, hour: int) -> bool:
         for start, end in self.optimal_windows:
@@ -231,6 +433,50 @@ class User:
         return False
 
 
+@dataclass
+class CapacityProfile:
+    """User-level capacity terms, computed once so candidates only do lookups.
+
+    Time fit (per difficulty), load headroom and stress penalty are built
+    eagerly. Energy is memoized per (hour, day_of_week) slot on first use,
+    keyed day_of_week * 24 + hour, since a selection only reads one slot.
+    """
+    time_fit: Dict[str, float]
+    time_fit_default: float
+    load: float
+    penalty: float
+    energy: Dict[int, float] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, user: 'User') -> 'CapacityProfile':
+        return cls(
+            time_fit={difficulty: time_availability(user, difficulty) for difficulty in DIFFICULTY_TIME},
+            time_fit_default=time_availability(user, ''),
+            load=LOAD_HEADROOM.get(user.active_experiment_count, 0.0),
+            penalty=STRESS_PENALTY.get(user.stress_state, 0.0),
+        )
+
+    def energy_at(self, user: 'User', hour: int, day_of_week: int) -> float:
+        if not (0 <= hour < 24 and 0 <= day_of_week < 7):
+            return energy_level(user, hour, day_of_week)
+        slot = day_of_week * 24 + hour
+        energy = self.energy.get(slot)
+        if energy is None:
+            energy = self.energy[slot] = energy_level(user, hour, day_of_week)
+        return energy
+
+    def fit(self, energy: float, difficulty: str, historical: float) -> float:
+        """Capacity from its terms, in calculate_capacity's summation order."""
+        time_fit = self.time_fit.get(difficulty, self.time_fit_default)
+        weighted = (energy * W_ENERGY) + (time_fit * W_TIME) + (historical * W_HISTORICAL) + (self.load * W_LOAD)
+        return clamp(weighted - self.penalty, 0.0, 1.0)
+
+    def week(self, user: 'User', difficulty: str, historical: float) -> List[float]:
+        """Capacity for all 168 hourly slots of a week (day_of_week * 24 + hour)."""
+        return [self.fit(self.energy_at(user, hour, day), difficulty, historical)
+                for day in range(7) for hour in range(24)]
+
+
 @dataclass
 class Experiment:
     star: Star
@@ -241,6 +487,57 @@ class Experiment:
     capacity: float = 0.0
     success_prob: float = 0.0
     connection_bonus: float = 0.0
+    # Resolved once per candidate by template_rate()
+    template_key: int = field(default=-1, repr=False)
+    template_rate: Optional[float] = field(default=None, repr=False)
+
+
+@dataclass
+class ConnectionIndex:
+    """Per-star adjacency over a connection list, bucketed by ConnectionType.
+
+    Built once per SelectionContext so every bonus function touches only the
+    edges incident to the star it is scoring. Lists keep the original
+    connection order so products and max() scans match a linear scan exactly.
+    """
+    incident: Dict[str, List[Connection]] = field(default_factory=dict)
+    incident_by_type: Dict[Tuple[str, ConnectionType], List[Connection]] = field(default_factory=dict)
+    outgoing: Dict[Tuple[str, ConnectionType], List[Connection]] = field(default_factory=dict)
+    incoming: Dict[Tuple[str, ConnectionType], List[Connection]] = field(default_factory=dict)
+    # Unordered TENSION pairs, as (min id, max id) and as a partner lookup
+    tension_pairs: Set[Tuple[str, str]] = field(default_factory=set)
+    tension_partners: Dict[str, Set[str]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, connections: List[Connection]) -> 'ConnectionIndex':
+        index = cls()
+        for conn in connections:
+            src, tgt = conn.source.id, conn.target.id
+            if conn.type == ConnectionType.TENSION:
+                index.tension_pairs.add((src, tgt) if src <= tgt else (tgt, src))
+                index.tension_partners.setdefault(src, set()).add(tgt)
+                index.tension_partners.setdefault(tgt, set()).add(src)
+            index.outgoing.setdefault((src, conn.type), []).append(conn)
+            index.incoming.setdefault((tgt, conn.type), []).append(conn)
+            for star_id in ((src,) if src == tgt else (src, tgt)):
+                index.incident.setdefault(star_id, []).append(conn)
+                index.incident_by_type.setdefault((star_id, conn.type), []).append(conn)
+        return index
+
+    def all_for(self, star_id: str) -> List[Connection]:
+        return self.incident.get(star_id, [])
+
+    def touching(self, star_id: str, conn_type: ConnectionType) -> List[Connection]:
+        return self.incident_by_type.get((star_id, conn_type), [])
+
+    def from_star(self, star_id: str, conn_type: ConnectionType) -> List[Connection]:
+        return self.outgoing.get((star_id, conn_type), [])
+
+    def into_star(self, star_id: str, conn_type: ConnectionType) -> List[Connection]:
+        return self.incoming.get((star_id, conn_type), [])
+
+    def in_tension(self, a: str, b: str) -> bool:
+        return ((a, b) if a <= b else (b, a)) in self.tension_pairs
 
 
 @dataclass
@@ -252,6 +549,30 @@ class SelectionContext:
     last_surfaced: Dict[str, datetime] = field(default_factory=dict)
     current_hour: int = 10
     current_day_of_week: int = 1  # Monday
+    index: ConnectionIndex = field(init=False, repr=False)
+    # Per-selection urgency by star id; entry points re-prime it on each call
+    urgency_memo: Dict[str, float] = field(default_factory=dict, init=False, repr=False)
+    active_star_ids: Set[str] = field(default_factory=set, init=False, repr=False)
+
+    def __post_init__(self):
+        self.reindex()
+        self.active_star_ids = {exp.star.id for exp in self.active_experiments}
+
+    def activate(self, experiment: Experiment):
+        """Mark an experiment active, keeping active_star_ids in step."""
+        self.active_experiments.append(experiment)
+        self.active_star_ids.add(experiment.star.id)
+
+    def reindex(self):
+        """Rebuild the adjacency index after `connections` is mutated."""
+        self.index = ConnectionIndex.build(self.connections)
+        self.urgency_memo = {}
+
+    def prime_urgency(self):
+        """Compute every star's urgency exactly once for this selection."""
+        self.urgency_memo = {}
+        for star in self.stars:
+            calculate_urgency(star, self.index, self.urgency_memo)
 
 
 # ============================================================================
@@ -293,14 +614,11 @@ def time_modifier(days_since_last_experiment: int) -> float:
         return 1.5
 
 
-def connection_modifier(star: Star, connections: List[Connection]) -> float:
+def connection_modifier(star: Star, index: ConnectionIndex) -> float:
     """Modify urgency based on connection network."""
     modifier = 1.0
 
-    for conn in connections:
-        if conn.target.id != star.id and conn.source.id != star.id:
-            continue
-
+    for conn in index.all_for(star.id):
         if conn.type == ConnectionType.BLOCKS and conn.source.brightness <= BLOCKER_THRESHOLD:
             modifier *= 1.3
         elif conn.type == ConnectionType.GROWTH_EDGE and conn.source.brightness > 0.6:
@@ -313,15 +631,20 @@ def connection_modifier(star: Star, connections: List[Connection]) -> float:
     return clamp(modifier, 0.7, 1.3)
 
 
-def calculate_urgency(star: Star, connections: List[Connection]) -> float:
-    """Calculate urgency for a star."""
+def calculate_urgency(star: Star, index: ConnectionIndex, memo: Optional[Dict[str, float]] = None) -> float:
+    """Calculate urgency for a star, reading and filling `memo` when given."""
+    if memo is not None and star.id in memo:
+        return memo[star.id]
+
     base = BASE_URGENCY.get(star.state, 0.5)
     trajectory = trajectory_modifier(star.brightness_history)
-    conn = connection_modifier(star, connections)
+    conn = connection_modifier(star, index)
     time = time_modifier(star.days_since_experiment)
 
-    urgency = base * trajectory * conn * time
-    return clamp(urgency, 0.0, 1.0)
+    urgency = clamp(base * trajectory * conn * time, 0.0, 1.0)
+    if memo is not None:
+        memo[star.id] = urgency
+    return urgency
 
 
 def energy_level(user: User, hour: int, day_of_week: int) -> float:
@@ -358,24 +681,28 @@ def time_availability(user: User, difficulty: str) -> float:
         return 0.2
 
 
-def historical_success(user: User, template_id: str) -> float:
+def template_rate(user: User, experiment: Experiment) -> Optional[float]:
+    """The user's rate for the experiment's template, looked up once and cached on it."""
+    if experiment.template_key < 0:
+        experiment.template_key = TEMPLATES.intern(experiment.template_id)
+        experiment.template_rate = user.templates.rate(experiment.template_key)
+    return experiment.template_rate
+
+
+def historical_success(rate: Optional[float]) -> float:
     """Success rate for similar experiments."""
-    if template_id in user.template_history:
-        return user.template_history[template_id]
+    if rate is not None:
+        return rate
     return DEFAULT_SUCCESS_RATE
 
 
 def calculate_capacity(_user: User, experiment: Experiment, context: SelectionContext) -> float:
     """Calculate capacity fit for user and experiment."""
-    E = energy_level(_user, context.current_hour, context.current_day_of_week)
-    T = time_availability(_user, experiment.difficulty)
-    H = historical_success(_user, experiment.template_id)
-    L = LOAD_HEADROOM.get(_user.active_experiment_count, 0.0)
+    profile = _user.capacity
+    E = profile.energy_at(_user, context.current_hour, context.current_day_of_week)
+    H = historical_success(template_rate(_user, experiment))
 
-    weighted = (E * W_ENERGY) + (T * W_TIME) + (H * W_HISTORICAL) + (L * W_LOAD)
-    penalty = STRESS_PENALTY.get(_user.stress_state, 0.0)
-
-    return clamp(weighted - penalty, 0.0, 1.0)
+    return profile.fit(E, experiment.difficulty, H)
 
 
 def recency_modifier(_user: User, days_since_similar: Optional[int]) -> float:  # noqa: ARG001
@@ -394,12 +721,11 @@ def recency_modifier(_user: User, days_since_similar: Optional[int]) -> float:
         return 0.9
 
 
-def template_modifier(user: User, template_id: str) -> float:
+def template_modifier(rate: Optional[float]) -> float:
     """Adjust based on template-specific history."""
-    if template_id not in user.template_history:
+    if rate is None:
         return 1.0
 
-    rate = user.template_history[template_id]
     return clamp(rate * 1.2, 0.5, 1.3)
 
 
@@ -407,7 +733,7 @@ def calculate_success_probability(user: User, experiment: Experiment, days_since
     """Calculate success probability for experiment."""
     base = clamp(user.overall_completion_rate, 0.2, 0.95)
     diff_mod = DIFFICULTY_SUCCESS_MOD.get(experiment.difficulty, 1.0)
-    temp_mod = template_modifier(user, experiment.template_id)
+    temp_mod = template_modifier(template_rate(user, experiment))
     star_mod = STAR_STATE_SUCCESS_MOD.get(experiment.star.simple_state, 1.0)
     rec_mod = recency_modifier(user, days_since_similar)
 
@@ -415,36 +741,26 @@ def calculate_success_probability(user: User, experiment: Experiment, days_since
     return clamp(prob, 0.05, 0.95)
 
 
-def growth_edge_bonus(star: Star, connections: List[Connection]) -> float:
+def growth_edge_bonus(star: Star, index: ConnectionIndex) -> float:
     """Bonus from GROWTH_EDGE connections."""
     bonus = 0.0
 
-    for conn in connections:
-        if conn.type == ConnectionType.GROWTH_EDGE and conn.target.id == star.id:
-            if conn.source.brightness >= GROWTH_EDGE_THRESHOLD:
-                source_bonus = GROWTH_EDGE_BONUS_MIN + \
-                    (GROWTH_EDGE_BONUS_MAX - GROWTH_EDGE_BONUS_MIN) * \
-                    (conn.source.brightness - GROWTH_EDGE_THRESHOLD) / (1.0 - GROWTH_EDGE_THRESHOLD)
-                bonus = max(bonus, source_bonus)
+    for conn in index.into_star(star.id, ConnectionType.GROWTH_EDGE):
+        if conn.source.brightness >= GROWTH_EDGE_THRESHOLD:
+            source_bonus = GROWTH_EDGE_BONUS_MIN + \
+                (GROWTH_EDGE_BONUS_MAX - GROWTH_EDGE_BONUS_MIN) * \
+                (conn.source.brightness - GROWTH_EDGE_THRESHOLD) / (1.0 - GROWTH_EDGE_THRESHOLD)
+            bonus = max(bonus, source_bonus)
 
     return bonus
 
 
-def resonance_bonus(star: Star, connections: List[Connection]) -> float:
+def resonance_bonus(star: Star, index: ConnectionIndex) -> float:
     """Bonus from RESONANCE connections."""
     bonus = 0.0
 
-    for conn in connections:
-        if conn.type != ConnectionType.RESONANCE:
-            continue
-
-        partner = None
-        if conn.source.id == star.id:
-            partner = conn.target
-        elif conn.target.id == star.id:
-            partner = conn.source
-        else:
-            continue
+    for conn in index.touching(star.id, ConnectionType.RESONANCE):
+        partner = conn.target if conn.source.id == star.id else conn.source
 
         if partner.brightness >= 0.7:
             bonus += RESONANCE_BONUS_PER_BRIGHT
@@ -454,41 +770,30 @@ def resonance_bonus(star: Star, connections: List[Connection]) -> float:
     return min(bonus, RESONANCE_BONUS_CAP)
 
 
-def tension_penalty(star: Star, active_experiments: List[Experiment], connections: List[Connection]) -> float:
+def tension_penalty(star: Star, active_star_ids: Set[str], index: ConnectionIndex) -> float:
     """Penalty for tension with active experiments."""
-    for exp in active_experiments:
-        for conn in connections:
-            if conn.type == ConnectionType.TENSION:
-                if (conn.source.id == star.id and conn.target.id == exp.star.id) or \
-                   (conn.target.id == star.id and conn.source.id == exp.star.id):
-                    return TENSION_PENALTY
+    partners = index.tension_partners.get(star.id)
+    if partners and not partners.isdisjoint(active_star_ids):
+        return TENSION_PENALTY
     return 0.0
 
 
-def causation_boost(star: Star, connections: List[Connection]) -> float:
+def causation_boost(star: Star, index: ConnectionIndex, urgency_memo: Optional[Dict[str, float]] = None) -> float:
     """Boost for cause star when effect needs help."""
-    for conn in connections:
-        if conn.type == ConnectionType.CAUSATION and conn.source.id == star.id:
-            # Calculate target urgency
-            target_urgency = calculate_urgency(conn.target, connections)
-            if target_urgency >= 0.6:
-                return CAUSATION_BOOST
+    for conn in index.from_star(star.id, ConnectionType.CAUSATION):
+        # Target urgency, memoized so causal chains stay linear
+        target_urgency = calculate_urgency(conn.target, index, urgency_memo)
+        if target_urgency >= 0.6:
+            return CAUSATION_BOOST
     return 0.0
 
 
-def shadow_mirror_bonus(star: Star, connections: List[Connection], last_surfaced: Dict[str, datetime], current_time: datetime) -> float:
+def shadow_mirror_bonus(star: Star, index: ConnectionIndex, last_surfaced: Dict[str, datetime], current_time: datetime) -> float:
     """Bonus for shadow stars needing surfacing."""
     if not star.is_dark:
         return 0.0
 
-    has_shadow_mirror = False
-    for conn in connections:
-        if conn.type == ConnectionType.SHADOW_MIRROR:
-            if conn.source.id == star.id or conn.target.id == star.id:
-                has_shadow_mirror = True
-                break
-
-    if not has_shadow_mirror:
+    if not index.touching(star.id, ConnectionType.SHADOW_MIRROR):
         return 0.0
 
     last_surface = last_surfaced.get(star.id)
@@ -503,27 +808,26 @@ def shadow_mirror_bonus(star: Star, connections: List[Connection], last_surfaced
     return 0.0
 
 
-def is_blocked(star: Star, connections: List[Connection]) -> bool:
+def is_blocked(star: Star, index: ConnectionIndex) -> bool:
     """Check if star is blocked by active blocker."""
-    for conn in connections:
-        if conn.type == ConnectionType.BLOCKS and conn.target.id == star.id:
-            if conn.source.brightness <= BLOCKER_THRESHOLD:
-                return True
+    for conn in index.into_star(star.id, ConnectionType.BLOCKS):
+        if conn.source.brightness <= BLOCKER_THRESHOLD:
+            return True
     return False
 
 
 def calculate_connection_bonus(star: Star, context: SelectionContext, current_time: datetime) -> Optional[float]:
     """Calculate total connection bonus/penalty."""
-    if is_blocked(star, context.connections):
+    if is_blocked(star, context.index):
         return None  # Blocked - filter out
 
     bonus = 0.0
-    bonus += growth_edge_bonus(star, context.connections)
-    bonus += resonance_bonus(star, context.connections)
-    bonus += causation_boost(star, context.connections)
-    bonus += shadow_mirror_bonus(star, context.connections, context.last_surfaced, current_time)
+    bonus += growth_edge_bonus(star, context.index)
+    bonus += resonance_bonus(star, context.index)
+    bonus += causation_boost(star, context.index, context.urgency_memo)
+    bonus += shadow_mirror_bonus(star, context.index, context.last_surfaced, current_time)
 
-    penalty = tension_penalty(star, context.active_experiments, context.connections)
+    penalty = tension_penalty(star, context.active_star_ids, context.index)
 
     return bonus - penalty
 
@@ -539,18 +843,7 @@ def select_difficulty(star: Star, user: User) -> str:
     if capacity_score < 0.3:
         return 'TINY'
 
-    state_to_difficulty = {
-        'FLICKERING': 'TINY',
-        'DARK_GROWING': 'TINY',
-        'DARK_STABLE': 'TINY',
-        'DIM_DECLINING': 'SMALL',
-        'DIM_STABLE': 'SMALL',
-        'BRIGHT_DECLINING': 'SMALL',
-        'BRIGHT_STABLE': 'MEDIUM',
-        'DORMANT': 'TINY',
-    }
-
-    base_difficulty = state_to_difficulty.get(star.state, 'SMALL')
+    base_difficulty = STATE_TO_DIFFICULTY.get(star.state, 'SMALL')
 
     if capacity_score < 0.5 and base_difficulty in ['MEDIUM', 'STRETCH']:
         return 'SMALL'
@@ -558,8 +851,31 @@ def select_difficulty(star: Star, user: User) -> str:
     return base_difficulty
 
 
-def generate_experiment(star: Star, user: User, context: SelectionContext, current_time: datetime) -> Optional[Experiment]:
-    """Generate a single experiment for a star."""
+def priority_score(urgency: float, capacity: float, success_prob: float, connection_bonus: float,
+                   weights: Optional[Tuple[float, float, float]] = None) -> float:
+    """Combine components into a priority; weights default to W_URGENCY/W_CAPACITY/W_SUCCESS."""
+    w_u, w_c, w_s = weights if weights is not None else (W_URGENCY, W_CAPACITY, W_SUCCESS)
+    score = (urgency * w_u) + (capacity * w_c) + (success_prob * w_s) + connection_bonus
+    return clamp(score, 0.0, 1.0)
+
+
+def score_components(star: Star, user: User, context: SelectionContext, current_time: datetime) -> Optional[Experiment]:
+    """Build a candidate with every weight-independent component filled in."""
+    # Connection bonus first: it doubles as the BLOCKS check, so blocked
+    # stars never pay for the other components
+    connection_bonus_result = calculate_connection_bonus(star, context, current_time)
+
+    if connection_bonus_result is None:
+        return None  # Blocked
+
+    assert connection_bonus_result is not None  # Type narrowing for Pyright
+    urgency = calculate_urgency(star, context.index, context.urgency_memo)
+    return complete_components(star, user, context, urgency, connection_bonus_result)
+
+
+def complete_components(star: Star, user: User, context: SelectionContext,
+                        urgency: float, connection_bonus: float) -> Experiment:
+    """Fill in the template-level components given the star-level ones."""
     difficulty = select_difficulty(star, user)
 
     exp = Experiment(
@@ -567,69 +883,789 @@ def generate_experiment(star: Star, user: User, context: SelectionContext, curre
         difficulty=difficulty,
         template_id=f"{star.domain}-{difficulty.lower()}"
     )
-
-    # Calculate components
-    exp.urgency = calculate_urgency(star, context.connections)
+    exp.urgency = urgency
+    exp.connection_bonus = connection_bonus
     exp.capacity = calculate_capacity(user, exp, context)
     exp.success_prob = calculate_success_probability(user, exp)
-    connection_bonus_result = calculate_connection_bonus(star, context, current_time)
 
-    if connection_bonus_result is None:
-        return None  # Blocked
+    return exp
 
-    assert connection_bonus_result is not None  # Type narrowing for Pyright
-    exp.connection_bonus = connection_bonus_result
-
-    # Calculate priority
-    exp.priority_score = (
-        (exp.urgency * W_URGENCY) +
-        (exp.capacity * W_CAPACITY) +
-        (exp.success_prob * W_SUCCESS) +
-        exp.connection_bonus
-    )
-    exp.priority_score = clamp(exp.priority_score, 0.0, 1.0)
 
+def generate_experiment(star: Star, user: User, context: SelectionContext, current_time: datetime) -> Optional[Experiment]:
+    """Generate a single experiment for a star."""
+    exp = score_components(star, user, context, current_time)
+    if exp is None:
+        return None
+
+    exp.priority_score = priority_score(exp.urgency, exp.capacity, exp.success_prob, exp.connection_bonus)
     return exp
 
 
-def select_experiments(context: SelectionContext, current_time: datetime) -> List[Experiment]:
-    """Main selection function."""
+def diversity_filter(ranked: Iterable[Experiment], limit: Optional[int] = None) -> List[Experiment]:
+    """Walk candidates in rank order, enforcing MAX_PER_STAR and MAX_PER_DOMAIN."""
+    filtered = []
+    star_counts: Dict[str, int] = {}
+    domain_counts: Dict[str, int] = {}
+
+    for candidate in ranked:
+        if limit is not None and len(filtered) >= limit:
+            break
+
+        star_id = candidate.star.id
+        domain = candidate.star.domain
+
+        if star_counts.get(star_id, 0) >= MAX_PER_STAR:
+            continue
+        if domain_counts.get(domain, 0) >= MAX_PER_DOMAIN:
+            continue
+
+        filtered.append(candidate)
+        star_counts[star_id] = star_counts.get(star_id, 0) + 1
+        domain_counts[domain] = domain_counts.get(domain, 0) + 1
+
+    return filtered
+
+
+def select_experiments(context: SelectionContext, current_time: datetime,
+                       tension_aware: bool = False) -> List[Experiment]:
+    """Main selection function.
+
+    With tension_aware, each pick counts as active for the picks after it,
+    so a later candidate in TENSION with an earlier pick takes the penalty.
+    """
     available_slots = MAX_ACTIVE - context.user.active_experiment_count
     if available_slots <= 0:
         return []
 
+    context.prime_urgency()
     candidates = []
 
     for star in context.stars:
-        if is_blocked(star, context.connections):
-            continue
-
+        # generate_experiment returns None for blocked stars
         exp = generate_experiment(star, context.user, context, current_time)
         if exp is not None:
             candidates.append(exp)
 
+    if tension_aware:
+        return select_tension_aware(candidates, context, available_slots)
+
     # Sort by priority
     candidates.sort(key=lambda e: e.priority_score, reverse=True)
 
     # Apply diversity filter
-    filtered = []
+    return diversity_filter(candidates, available_slots)
+
+
+def select_tension_aware(candidates: List[Experiment], context: SelectionContext, slots: int) -> List[Experiment]:
+    """Greedy diversity-filtered picks where earlier picks count as active.
+
+    The active set starts from context.active_star_ids and grows with each
+    pick; only TENSION partners of a pick are rescored. The penalty is
+    binary, so a newly penalized candidate just loses TENSION_PENALTY.
+    """
+    active = set(context.active_star_ids)
+    seq = {id(c): i for i, c in enumerate(candidates)}
+    remaining = sorted(candidates, key=lambda e: (-e.priority_score, seq[id(e)]))
+    picked: List[Experiment] = []
     star_counts: Dict[str, int] = {}
     domain_counts: Dict[str, int] = {}
 
-    for candidate in candidates:
-        star_id = candidate.star.id
-        domain = candidate.star.domain
+    while remaining and len(picked) < slots:
+        choice = None
+        for pos, candidate in enumerate(remaining):
+            if star_counts.get(candidate.star.id, 0) >= MAX_PER_STAR:
+                continue
+            if domain_counts.get(candidate.star.domain, 0) >= MAX_PER_DOMAIN:
+                continue
+            choice = remaining.pop(pos)
+            break
+        if choice is None:
+            break
+
+        picked.append(choice)
+        star_id = choice.star.id
+        star_counts[star_id] = star_counts.get(star_id, 0) + 1
+        domain_counts[choice.star.domain] = domain_counts.get(choice.star.domain, 0) + 1
 
-        if star_counts.get(star_id, 0) >= MAX_PER_STAR:
+        partners = context.index.tension_partners.get(star_id)
+        newly_active = star_id not in active
+        active.add(star_id)
+        if not partners or not newly_active:
             continue
-        if domain_counts.get(domain, 0) >= MAX_PER_DOMAIN:
+
+        rescored = False
+        for candidate in remaining:
+            cid = candidate.star.id
+            if cid in partners and context.index.tension_partners[cid].isdisjoint(active - {star_id}):
+                candidate.connection_bonus -= TENSION_PENALTY
+                candidate.priority_score = priority_score(candidate.urgency, candidate.capacity,
+                                                          candidate.success_prob, candidate.connection_bonus)
+                rescored = True
+        if rescored:
+            remaining.sort(key=lambda e: (-e.priority_score, seq[id(e)]))
+
+    return picked
+
+
+# ============================================================================
+# LAZY TOP-K SELECTION
+# ============================================================================
+
+@dataclass(order=True)
+class LazyCandidate:
+    """A not-yet-scored candidate with an upper bound on its priority.
+
+    Orders best-first: higher bound, then lower `seq`. `seq` is the star's
+    position in context.stars and breaks priority ties the same way the
+    stable sort in select_experiments does. `build` returns the scored
+    Experiment.
+    """
+    neg_bound: float
+    seq: int
+    build: Callable[[], Experiment] = field(compare=False)
+
+    @property
+    def bound(self) -> float:
+        return -self.neg_bound
+
+
+def stream_candidates(context: SelectionContext, current_time: datetime) -> Iterator[LazyCandidate]:
+    """Yield lazy candidates in non-increasing order of their priority bound.
+
+    The star-level terms (BLOCKS check, urgency, connection bonus) are what
+    make the bound useful, so they are computed for every star; capacity and
+    success are bounded by their ranges and only computed when the selector
+    builds the candidate. Candidates come off a heap, so a selector that
+    stops after m of n stars pays O(n + m log n) rather than a full sort.
+    """
+    user = context.user
+    cap_max = 1.0 if W_CAPACITY >= 0 else 0.0
+    success_max = 0.95 if W_SUCCESS >= 0 else 0.05
+
+    context.prime_urgency()
+    pending = []
+    for seq, star in enumerate(context.stars):
+        bonus = calculate_connection_bonus(star, context, current_time)
+        if bonus is None:
+            continue  # Blocked
+        urgency = calculate_urgency(star, context.index, context.urgency_memo)
+        bound = priority_score(urgency, cap_max, success_max, bonus)
+
+        def build(star=star, urgency=urgency, bonus=bonus) -> Experiment:
+            exp = complete_components(star, user, context, urgency, bonus)
+            exp.priority_score = priority_score(exp.urgency, exp.capacity, exp.success_prob, exp.connection_bonus)
+            return exp
+
+        pending.append(LazyCandidate(-bound, seq, build))
+
+    heapq.heapify(pending)
+    while pending:
+        yield heapq.heappop(pending)
+
+
+def select_top_k(stream: Iterable[LazyCandidate], slots: int) -> List[Experiment]:
+    """Diversity-constrained top-k over a bound-ordered candidate stream.
+
+    Returns exactly what sort-then-diversity_filter-then-slice would. Built
+    candidates wait in one heap keyed like the eager sort; the heap top is
+    released once its priority beats the next bound, since nothing still in
+    the stream can outrank it. Released candidates go through the greedy
+    MAX_PER_STAR/MAX_PER_DOMAIN check against running counts, and a built
+    candidate whose star or domain is already full is dropped on arrival.
+    Once `slots` picks are made the rest of the stream is never built.
+    """
+    picked: List[Experiment] = []
+    if slots <= 0:
+        return picked
+
+    star_counts: Dict[str, int] = {}
+    domain_counts: Dict[str, int] = {}
+    ready: List[Tuple[float, int, Experiment]] = []
+    stream = iter(stream)
+    lazy = next(stream, None)
+
+    while len(picked) < slots:
+        if lazy is not None and (not ready or -ready[0][0] <= lazy.bound):
+            # The next stream entry could still tie or beat the heap top
+            exp = lazy.build()
+            if (star_counts.get(exp.star.id, 0) < MAX_PER_STAR
+                    and domain_counts.get(exp.star.domain, 0) < MAX_PER_DOMAIN):
+                heapq.heappush(ready, (-exp.priority_score, lazy.seq, exp))
+            lazy = next(stream, None)
             continue
+        if not ready:
+            break  # Stream exhausted
 
-        filtered.append(candidate)
+        _, _, exp = heapq.heappop(ready)
+        star_id, domain = exp.star.id, exp.star.domain
+        if star_counts.get(star_id, 0) >= MAX_PER_STAR or domain_counts.get(domain, 0) >= MAX_PER_DOMAIN:
+            continue
+        picked.append(exp)
         star_counts[star_id] = star_counts.get(star_id, 0) + 1
         domain_counts[domain] = domain_counts.get(domain, 0) + 1
 
-    return filtered[:available_slots]
+    return picked
+
+
+def select_experiments_lazy(context: SelectionContext, current_time: datetime) -> List[Experiment]:
+    """Same result as select_experiments, via the streaming top-k selector."""
+    available_slots = MAX_ACTIVE - context.user.active_experiment_count
+    if available_slots <= 0:
+        return []
+    return select_top_k(stream_candidates(context, current_time), available_slots)
+
+
+# ============================================================================
+# INCREMENTAL RANKING
+# ============================================================================
+
+class IncrementalRanker:
+    """Scored candidates for one context, kept between selections.
+
+    After a single star changes (brightness, history, days since experiment,
+    is_dark or has_active_experiment), update_star() rescores only the stars
+    whose score can depend on it:
+    - the star itself and every star sharing a connection with it, because
+      connection_modifier, growth edge, resonance and BLOCKS all read the
+      other endpoint
+    - CAUSATION sources pointing at any of those, because their boost reads
+      the target's urgency
+
+    Ranked keys stay sorted, so selection() is a short diversity walk from
+    the top. Anything user-level (stress, load, completion rate, connections,
+    active experiments) needs refresh().
+    """
+
+    def __init__(self, context: SelectionContext, current_time: datetime):
+        self.context = context
+        self.current_time = current_time
+        self.refresh()
+
+    def refresh(self):
+        """Full rescore of every star."""
+        context = self.context
+        self.stars_by_id = {star.id: star for star in context.stars}
+        self.seq = {star.id: i for i, star in enumerate(context.stars)}
+        self.candidates: Dict[str, Experiment] = {}
+        self.keys: Dict[str, Tuple[float, int]] = {}
+        self.ranked: List[Tuple[float, int]] = []
+
+        context.prime_urgency()
+        for star in context.stars:
+            self._score(star)
+
+    def _score(self, star: Star):
+        exp = generate_experiment(star, self.context.user, self.context, self.current_time)
+        if exp is None:
+            return  # Blocked
+        key = (-exp.priority_score, self.seq[star.id])
+        self.candidates[star.id] = exp
+        self.keys[star.id] = key
+        bisect.insort(self.ranked, key)
+
+    def _unscore(self, star_id: str):
+        key = self.keys.pop(star_id, None)
+        if key is None:
+            return
+        del self.candidates[star_id]
+        del self.ranked[bisect.bisect_left(self.ranked, key)]
+
+    def affected_by(self, star_id: str) -> Tuple[Set[str], Set[str]]:
+        """(stars whose urgency may change, stars whose candidate must be rescored)."""
+        index = self.context.index
+        changed = {star_id}
+        for conn in index.all_for(star_id):
+            changed.add(conn.source.id)
+            changed.add(conn.target.id)
+
+        rescore = set(changed)
+        for sid in changed:
+            for conn in index.into_star(sid, ConnectionType.CAUSATION):
+                rescore.add(conn.source.id)
+        return changed, rescore
+
+    def update_star(self, star_id: str):
+        """Rescore after one star was mutated in place."""
+        changed, rescore = self.affected_by(star_id)
+        memo = self.context.urgency_memo
+        for sid in changed:
+            memo.pop(sid, None)
+
+        for sid in rescore:
+            if sid in self.seq:
+                self._unscore(sid)
+        for sid in sorted(rescore, key=lambda sid: self.seq.get(sid, -1)):
+            star = self.stars_by_id.get(sid)
+            if star is not None:
+                self._score(star)  # Refills popped memo entries on demand
+
+    def selection(self) -> List[Experiment]:
+        """Current picks; identical to select_experiments on the same context."""
+        available_slots = MAX_ACTIVE - self.context.user.active_experiment_count
+        if available_slots <= 0:
+            return []
+        by_seq = self.context.stars
+        return diversity_filter((self.candidates[by_seq[seq].id] for _, seq in self.ranked), available_slots)
+
+
+# ============================================================================
+# WEIGHT SWEEPS
+# ============================================================================
+
+Weights = Tuple[float, float, float]
+
+
+@dataclass
+class ComponentMatrix:
+    """Weight-independent scoring components, one row per candidate.
+
+    Rows are (urgency, capacity, success_prob, connection_bonus). Ranking under
+    a weight vector is a dot product per row; nothing here reads the global
+    W_URGENCY/W_CAPACITY/W_SUCCESS, so one matrix can be ranked from many
+    threads at once.
+    """
+    candidates: List[Experiment]
+    rows: List[Tuple[float, float, float, float]]
+    available_slots: int
+
+    @classmethod
+    def build(cls, context: SelectionContext, current_time: datetime) -> 'ComponentMatrix':
+        available_slots = max(0, MAX_ACTIVE - context.user.active_experiment_count)
+        context.prime_urgency()
+        candidates = []
+        for star in context.stars:
+            exp = score_components(star, context.user, context, current_time)
+            if exp is not None:
+                candidates.append(exp)
+        rows = [(e.urgency, e.capacity, e.success_prob, e.connection_bonus) for e in candidates]
+        return cls(candidates=candidates, rows=rows, available_slots=available_slots)
+
+    def scores(self, weights: Weights) -> List[float]:
+        w_u, w_c, w_s = weights
+        return [clamp((u * w_u) + (c * w_c) + (p * w_s) + b, 0.0, 1.0) for u, c, p, b in self.rows]
+
+    def order(self, weights: Weights) -> List[int]:
+        """Candidate indices by descending priority (stable, like select_experiments)."""
+        scores = self.scores(weights)
+        return sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+
+    def select(self, weights: Weights) -> List[int]:
+        """Candidate indices selected under weights, after the diversity filter."""
+        if self.available_slots <= 0:
+            return []
+        ranked = [self.candidates[i] for i in self.order(weights)]
+        index_of = {id(e): i for i, e in enumerate(self.candidates)}
+        return [index_of[id(e)] for e in diversity_filter(ranked, self.available_slots)]
+
+
+@dataclass
+class WeightSweepResult:
+    """Selections and rank stability of one context across a weight space."""
+    weights: List[Weights]
+    selections: List[Tuple[str, ...]]
+    modal_selection: Tuple[str, ...]
+    modal_share: float
+    inclusion_rate: Dict[str, float]
+    mean_rank: Dict[str, float]
+    rank_spread: Dict[str, int]
+
+
+def weight_grid(step: float = 0.05) -> List[Weights]:
+    """All (w_urgency, w_capacity, w_success) on the simplex at the given step."""
+    n = int(round(1.0 / step))
+    return [(i / n, j / n, (n - i - j) / n) for i in range(n + 1) for j in range(n + 1 - i)]
+
+
+def weight_sweep(context: SelectionContext, current_time: datetime, weight_vectors: List[Weights]) -> WeightSweepResult:
+    """Rank one context under many weight vectors from a single component pass."""
+    matrix = ComponentMatrix.build(context, current_time)
+    star_ids = [e.star.id for e in matrix.candidates]
+
+    selections: List[Tuple[str, ...]] = []
+    selection_counts: Dict[Tuple[str, ...], int] = {}
+    included: Dict[str, int] = {sid: 0 for sid in star_ids}
+    rank_sum: Dict[str, int] = {sid: 0 for sid in star_ids}
+    rank_min: Dict[str, int] = {}
+    rank_max: Dict[str, int] = {}
+
+    for weights in weight_vectors:
+        order = matrix.order(weights)
+        for rank, i in enumerate(order):
+            sid = star_ids[i]
+            rank_sum[sid] += rank
+            rank_min[sid] = min(rank_min.get(sid, rank), rank)
+            rank_max[sid] = max(rank_max.get(sid, rank), rank)
+
+        selection = tuple(star_ids[i] for i in matrix.select(weights))
+        selections.append(selection)
+        selection_counts[selection] = selection_counts.get(selection, 0) + 1
+        for sid in selection:
+            included[sid] += 1
+
+    total = len(weight_vectors)
+    if total == 0:
+        return WeightSweepResult([], [], (), 0.0, {}, {}, {})
+
+    modal_selection = max(selection_counts, key=selection_counts.__getitem__)
+    return WeightSweepResult(
+        weights=list(weight_vectors),
+        selections=selections,
+        modal_selection=modal_selection,
+        modal_share=selection_counts[modal_selection] / total,
+        inclusion_rate={sid: included[sid] / total for sid in star_ids},
+        mean_rank={sid: rank_sum[sid] / total for sid in star_ids},
+        rank_spread={sid: rank_max[sid] - rank_min[sid] for sid in star_ids},
+    )
+
+
+# ============================================================================
+# COHORT BATCH SELECTION
+# ============================================================================
+
+# Integer codes used by the columnar cohort arrays
+STRESS_LEVELS = tuple(STRESS_TO_ENERGY)
+DIFFICULTY_NAMES = tuple(DIFFICULTY_TIME)
+CONNECTION_TYPES = tuple(ConnectionType)
+_CONN_CODE = {t: code for code, t in enumerate(CONNECTION_TYPES)}
+_BLOCKS = _CONN_CODE[ConnectionType.BLOCKS]
+_GROWTH_EDGE = _CONN_CODE[ConnectionType.GROWTH_EDGE]
+_SHADOW_MIRROR = _CONN_CODE[ConnectionType.SHADOW_MIRROR]
+_CAUSATION = _CONN_CODE[ConnectionType.CAUSATION]
+_RESONANCE = _CONN_CODE[ConnectionType.RESONANCE]
+_TENSION = _CONN_CODE[ConnectionType.TENSION]
+
+NO_RATE = float('nan')  # template_rate sentinel: template never tried
+NEVER_SURFACED = -(2 ** 31)  # days_since_surfaced sentinel; no real day count reaches it
+
+
+@dataclass
+class CohortBatch:
+    """Columnar selection input for a whole cohort.
+
+    Stars and connections are flat arrays segmented per user: user u owns
+    stars star_offsets[u]:star_offsets[u + 1] and connections
+    conn_offsets[u]:conn_offsets[u + 1]. Connection endpoints are global
+    star indices and must belong to the same user. Per-user hour/day
+    dependent inputs (window, day_success) are resolved for the user's
+    selection time when the batch is packed.
+    """
+    # Per user
+    stress: array                 # index into STRESS_LEVELS
+    active_count: array
+    completion_rate: array
+    available_minutes: array
+    day_success: array            # day_of_week_success at the current day
+    window: array                 # 1 optimal, -1 worst, 0 neither
+    star_offsets: array
+    conn_offsets: array
+    # Per star
+    brightness: array
+    trajectory_delta: array       # history[-1] - history[-3], nan if shorter
+    state_code: array             # index into STATE_NAMES
+    days_since_experiment: array
+    days_since_surfaced: array    # NEVER_SURFACED if never
+    is_dark: array
+    has_active_experiment: array
+    in_active_experiment: array   # in context.active_star_ids
+    domain: array                 # index into domains
+    template_rate: array          # 4 per star, DIFFICULTY_NAMES order
+    # Per connection
+    conn_type: array              # index into CONNECTION_TYPES
+    conn_source: array
+    conn_target: array
+    domains: List[str] = field(default_factory=list)
+    star_ids: List[str] = field(default_factory=list)
+
+    @property
+    def num_users(self) -> int:
+        return len(self.star_offsets) - 1
+
+
+@dataclass
+class CohortSelection:
+    """Per-user selections, segmented by offsets like CohortBatch."""
+    offsets: array
+    star: array                   # global star index
+    difficulty: array             # index into DIFFICULTY_NAMES
+    priority: array
+    urgency: array
+    capacity: array
+    success_prob: array
+    connection_bonus: array
+
+    def for_user(self, u: int) -> range:
+        return range(self.offsets[u], self.offsets[u + 1])
+
+
+def pack_cohort(contexts: List[SelectionContext], current_time: datetime) -> CohortBatch:
+    """Pack SelectionContexts into a CohortBatch (mainly for parity checks)."""
+    batch = CohortBatch(
+        stress=array('b'), active_count=array('l'), completion_rate=array('d'),
+        available_minutes=array('d'), day_success=array('d'), window=array('b'),
+        star_offsets=array('l', [0]), conn_offsets=array('l', [0]),
+        brightness=array('d'), trajectory_delta=array('d'), state_code=array('b'),
+        days_since_experiment=array('l'), days_since_surfaced=array('l'),
+        is_dark=array('b'), has_active_experiment=array('b'), in_active_experiment=array('b'),
+        domain=array('l'), template_rate=array('d'),
+        conn_type=array('b'), conn_source=array('l'), conn_target=array('l'),
+    )
+    domain_code: Dict[str, int] = {}
+    stress_code = {name: code for code, name in enumerate(STRESS_LEVELS)}
+
+    for context in contexts:
+        user = context.user
+        batch.stress.append(stress_code[user.stress_state])
+        batch.active_count.append(user.active_experiment_count)
+        batch.completion_rate.append(user.overall_completion_rate)
+        batch.available_minutes.append(user.available_minutes)
+        batch.day_success.append(user.day_of_week_success.get(context.current_day_of_week, 0.5))
+        if user.is_in_optimal_window(context.current_hour):
+            batch.window.append(1)
+        elif user.is_in_worst_window(context.current_hour):
+            batch.window.append(-1)
+        else:
+            batch.window.append(0)
+
+        base = len(batch.brightness)
+        local = {star.id: base + i for i, star in enumerate(context.stars)}
+        active_ids = context.active_star_ids
+        for star in context.stars:
+            history = star.brightness_history
+            batch.brightness.append(star.brightness)
+            batch.trajectory_delta.append(history[-1] - history[-3] if len(history) >= 3 else float('nan'))
+            batch.state_code.append(star.state_code)
+            batch.days_since_experiment.append(star.days_since_experiment)
+            surfaced = context.last_surfaced.get(star.id)
+            batch.days_since_surfaced.append(NEVER_SURFACED if surfaced is None else (current_time - surfaced).days)
+            batch.is_dark.append(star.is_dark)
+            batch.has_active_experiment.append(star.has_active_experiment)
+            batch.in_active_experiment.append(star.id in active_ids)
+            batch.domain.append(domain_code.setdefault(star.domain, len(domain_code)))
+            for difficulty in DIFFICULTY_NAMES:
+                rate = user.templates.rate(TEMPLATES.lookup(f"{star.domain}-{difficulty.lower()}"))
+                batch.template_rate.append(NO_RATE if rate is None else rate)
+            batch.star_ids.append(star.id)
+        batch.star_offsets.append(len(batch.brightness))
+
+        for conn in context.connections:
+            batch.conn_type.append(_CONN_CODE[conn.type])
+            batch.conn_source.append(local[conn.source.id])
+            batch.conn_target.append(local[conn.target.id])
+        batch.conn_offsets.append(len(batch.conn_type))
+
+    batch.domains = list(domain_code)
+    return batch
+
+
+def select_cohort(batch: CohortBatch) -> CohortSelection:
+    """Morning selection for every user in a batch.
+
+    Matches select_experiments per user. A single pass over the flat
+    connection arrays accumulates every star's connection modifier, growth
+    edge, resonance, tension, shadow and BLOCKS terms. A second pass over
+    CAUSATION edges reads the finished urgency array. The per-user pass then
+    scores each star with user-level terms hoisted out and runs the
+    diversity-constrained top-k on that user's segment. Edges are visited in
+    connection order, so the floating-point products match the object path.
+    """
+    n = len(batch.brightness)
+    brightness = batch.brightness
+    is_dark = batch.is_dark
+    has_active = batch.has_active_experiment
+    in_active = batch.in_active_experiment
+
+    conn_mod = [1.0] * n
+    growth = [0.0] * n
+    resonance = [0.0] * n
+    tension = bytearray(n)
+    shadow = bytearray(n)
+    blocked = bytearray(n)
+
+    # Pass 1: per-edge accumulation
+    for t, s, g in zip(batch.conn_type, batch.conn_source, batch.conn_target):
+        source_brightness = brightness[s]
+        for star, partner in ((s, g),) if s == g else ((s, g), (g, s)):
+            if t == _BLOCKS and source_brightness <= BLOCKER_THRESHOLD:
+                conn_mod[star] *= 1.3
+            elif t == _GROWTH_EDGE and source_brightness > 0.6:
+                conn_mod[star] *= 1.1
+            elif t == _SHADOW_MIRROR and is_dark[star]:
+                conn_mod[star] *= 1.2
+            elif t == _CAUSATION and source_brightness > 0.6:
+                conn_mod[star] *= 1.1
+
+            if t == _RESONANCE:
+                if brightness[partner] >= 0.7:
+                    resonance[star] += RESONANCE_BONUS_PER_BRIGHT
+                if has_active[partner]:
+                    resonance[star] += RESONANCE_BONUS_ACTIVE
+            elif t == _TENSION:
+                if in_active[partner]:
+                    tension[star] = 1
+            elif t == _SHADOW_MIRROR:
+                shadow[star] = 1
+
+        if t == _BLOCKS:
+            if source_brightness <= BLOCKER_THRESHOLD:
+                blocked[g] = 1
+        elif t == _GROWTH_EDGE:
+            if source_brightness >= GROWTH_EDGE_THRESHOLD:
+                source_bonus = GROWTH_EDGE_BONUS_MIN + \
+                    (GROWTH_EDGE_BONUS_MAX - GROWTH_EDGE_BONUS_MIN) * \
+                    (source_brightness - GROWTH_EDGE_THRESHOLD) / (1.0 - GROWTH_EDGE_THRESHOLD)
+                if source_bonus > growth[g]:
+                    growth[g] = source_bonus
+
+    # Urgency for every star
+    base_urgency = [BASE_URGENCY.get(name, 0.5) for name in STATE_NAMES]
+    time_table = [time_modifier(d) for d in range(16)]
+    urgency = [0.0] * n
+    for i in range(n):
+        delta = batch.trajectory_delta[i]
+        if delta != delta:
+            trajectory = 1.0
+        elif delta < -0.05:
+            trajectory = 1.2
+        elif delta < -0.02:
+            trajectory = 1.1
+        elif delta > 0.05:
+            trajectory = 0.8
+        elif delta > 0.02:
+            trajectory = 0.9
+        else:
+            trajectory = 1.0
+        days = batch.days_since_experiment[i]
+        time = time_table[days if days < 16 else 15] if days >= 0 else 1.0
+        value = base_urgency[batch.state_code[i]] * trajectory * clamp(conn_mod[i], 0.7, 1.3) * time
+        urgency[i] = clamp(value, 0.0, 1.0)
+
+    # Pass 2: causation reads target urgency
+    causal = bytearray(n)
+    for t, s, g in zip(batch.conn_type, batch.conn_source, batch.conn_target):
+        if t == _CAUSATION and urgency[g] >= 0.6:
+            causal[s] = 1
+
+    # Per-user scoring and segmented top-k
+    w_u, w_c, w_s = W_URGENCY, W_CAPACITY, W_SUCCESS
+    state_difficulty = [DIFFICULTY_NAMES.index(STATE_TO_DIFFICULTY.get(name, 'SMALL')) for name in STATE_NAMES]
+    diff_time = [DIFFICULTY_TIME[name] for name in DIFFICULTY_NAMES]
+    diff_success = [DIFFICULTY_SUCCESS_MOD.get(name, 1.0) for name in DIFFICULTY_NAMES]
+    rec_mod = recency_modifier(None, None)
+    tiny, small, medium, stretch = range(4)
+
+    out = CohortSelection(
+        offsets=array('l', [0]), star=array('l'), difficulty=array('b'), priority=array('d'),
+        urgency=array('d'), capacity=array('d'), success_prob=array('d'), connection_bonus=array('d'),
+    )
+
+    for u in range(batch.num_users):
+        stress_name = STRESS_LEVELS[batch.stress[u]]
+        active_count = batch.active_count[u]
+        slots = MAX_ACTIVE - active_count
+        lo, hi = batch.star_offsets[u], batch.star_offsets[u + 1]
+        if slots <= 0 or lo == hi:
+            out.offsets.append(len(out.star))
+            continue
+
+        # User-level terms, hoisted out of the star loop
+        completion = batch.completion_rate[u]
+        energy = STRESS_TO_ENERGY[stress_name]
+        if batch.window[u] == 1:
+            energy *= 1.1
+        elif batch.window[u] == -1:
+            energy *= 0.7
+        if completion > 0:
+            day_modifier = clamp(batch.day_success[u] / completion, 0.7, 1.3)
+        else:
+            day_modifier = 1.0
+        energy = clamp(energy * day_modifier, 0.0, 1.0)
+        load = LOAD_HEADROOM.get(active_count, 0.0)
+        penalty = STRESS_PENALTY.get(stress_name, 0.0)
+        available = batch.available_minutes[u]
+        time_fit = []
+        for required in diff_time:
+            if available >= required * 2:
+                time_fit.append(1.0)
+            elif available >= required * 1.5:
+                time_fit.append(0.85)
+            elif available >= required:
+                time_fit.append(0.6)
+            else:
+                time_fit.append(0.2)
+        success_base = clamp(completion, 0.2, 0.95)
+        if stress_name == 'CRISIS':
+            capacity_score = None
+        else:
+            capacity_score = (STRESS_TO_ENERGY[stress_name] * W_ENERGY +
+                              LOAD_HEADROOM.get(active_count, 0) * W_LOAD)
+
+        scored = []
+        for i in range(lo, hi):
+            if blocked[i]:
+                continue
+
+            # select_difficulty
+            if capacity_score is None or capacity_score < 0.3:
+                d = tiny
+            else:
+                d = state_difficulty[batch.state_code[i]]
+                if capacity_score < 0.5 and (d == medium or d == stretch):
+                    d = small
+
+            rate = batch.template_rate[4 * i + d]
+            has_rate = rate == rate
+            historical = rate if has_rate else DEFAULT_SUCCESS_RATE
+            weighted = (energy * W_ENERGY) + (time_fit[d] * W_TIME) + (historical * W_HISTORICAL) + (load * W_LOAD)
+            capacity = clamp(weighted - penalty, 0.0, 1.0)
+
+            b = brightness[i]
+            star_mod = STAR_STATE_SUCCESS_MOD['DARK' if b < 0.25 else 'DIM' if b < 0.7 else 'BRIGHT']
+            temp_mod = clamp(rate * 1.2, 0.5, 1.3) if has_rate else 1.0
+            success = clamp(success_base * diff_success[d] * temp_mod * star_mod * rec_mod, 0.05, 0.95)
+
+            # Same summation order as calculate_connection_bonus
+            bonus = 0.0
+            bonus += growth[i]
+            bonus += min(resonance[i], RESONANCE_BONUS_CAP)
+            if causal[i]:
+                bonus += CAUSATION_BOOST
+            if is_dark[i] and shadow[i]:
+                days = batch.days_since_surfaced[i]
+                if days == NEVER_SURFACED:
+                    days = 14  # Assume long ago if never surfaced
+                if days >= SHADOW_SURFACE_INTERVAL:
+                    bonus += SHADOW_SURFACE_BONUS_BASE + SHADOW_SURFACE_BONUS_RATE * min(days - SHADOW_SURFACE_INTERVAL, 14)
+            if tension[i]:
+                bonus -= TENSION_PENALTY
+
+            urg = urgency[i]
+            priority = clamp((urg * w_u) + (capacity * w_c) + (success * w_s) + bonus, 0.0, 1.0)
+            scored.append((priority, i, d, urg, capacity, success, bonus))
+
+        # Stable descending sort keeps star order on ties, like select_experiments
+        scored.sort(key=lambda row: row[0], reverse=True)
+        star_counts: Dict[int, int] = {}
+        domain_counts: Dict[int, int] = {}
+        taken = 0
+        for priority, i, d, urg, capacity, success, bonus in scored:
+            if taken >= slots:
+                break
+            dom = batch.domain[i]
+            if star_counts.get(i, 0) >= MAX_PER_STAR or domain_counts.get(dom, 0) >= MAX_PER_DOMAIN:
+                continue
+            star_counts[i] = star_counts.get(i, 0) + 1
+            domain_counts[dom] = domain_counts.get(dom, 0) + 1
+            taken += 1
+            out.star.append(i)
+            out.difficulty.append(d)
+            out.priority.append(priority)
+            out.urgency.append(urg)
+            out.capacity.append(capacity)
+            out.success_prob.append(success)
+            out.connection_bonus.append(bonus)
+        out.offsets.append(len(out.star))
+
+    return out
 
 
 # ============================================================================
@@ -718,11 +1754,11 @@ def create_perfect_user_scenario() -> Tuple[SelectionContext, str]:
         Connection(type=ConnectionType.RESONANCE, source=stars[0], target=stars[3]),
     ]
 
-    user = User(
+    user = User.from_template_rates(
+        {"health-tiny": 1.0, "wealth-small": 1.0, "purpose-medium": 1.0},
         stress_state='LOW',
         active_experiment_count=0,
         overall_completion_rate=1.0,  # Perfect!
-        template_history={"health-tiny": 1.0, "wealth-small": 1.0, "purpose-medium": 1.0},
     )
 
     context = SelectionContext(
@@ -751,11 +1787,11 @@ def create_failing_user_scenario() -> Tuple[SelectionContext, str]:
 
     connections = []
 
-    user = User(
+    user = User.from_template_rates(
+        {"health-tiny": 0.1, "wealth-tiny": 0.1},
         stress_state='HIGH',
         active_experiment_count=1,
         overall_completion_rate=0.0,  # Never completes
-        template_history={"health-tiny": 0.1, "wealth-tiny": 0.1},
     )
 
     context = SelectionContext(
@@ -993,13 +2029,8 @@ def run_scenario(context: SelectionContext, name: str) -> Dict:
     }
 
 
-def simulate_user_journey(days: int = 7):
-    """Simulate a new user's first week."""
-    print(f"\n{'='*60}")
-    print("MULTI-DAY SIMULATION: New User First Week")
-    print('='*60)
-
-    # Initialize stars
+def new_journey_context() -> SelectionContext:
+    """Fresh new-user constellation used by the journey simulations."""
     stars = [
         Star(id="health", name="Health", domain="health", brightness=0.3, brightness_history=[0.3]*3),
         Star(id="wealth", name="Wealth", domain="wealth", brightness=0.3, brightness_history=[0.3]*3),
@@ -1014,22 +2045,68 @@ def simulate_user_journey(days: int = 7):
         overall_completion_rate=0.5,
     )
 
-    context = SelectionContext(user=user, stars=stars, connections=[])
+    return SelectionContext(user=user, stars=stars, connections=[])
+
+
+def start_journey_day(context: SelectionContext):
+    """Reset active count for simplicity."""
+    context.user.active_experiment_count = 0
+    for star in context.stars:
+        star.has_active_experiment = False
+
+
+def resolve_journey_day(context: SelectionContext, selected: List[Experiment], rng,
+                        completion_chance: float = JOURNEY_COMPLETION_CHANCE) -> List[bool]:
+    """Roll completions for the day's picks, fold them into the user's template
+    rates and age every star. Returns completed flags."""
+    user = context.user
+    outcomes = []
+
+    for exp in selected:
+        completed = rng.random() < completion_chance
+        user.templates.record(TEMPLATES.intern(exp.template_id), completed)
+        if completed:
+            gain = JOURNEY_EXPERIMENT_IMPACT * JOURNEY_DIFFICULTY_GAIN.get(exp.difficulty, 0.75)
+            exp.star.record_brightness(clamp(exp.star.brightness + gain, JOURNEY_MIN_BRIGHTNESS, JOURNEY_MAX_BRIGHTNESS))
+            exp.star.days_since_experiment = 0
+
+            # Update user success rate
+            if user.overall_completion_rate < 0.95:
+                user.overall_completion_rate = min(0.95, user.overall_completion_rate + 0.05)
+            outcomes.append(True)
+        else:
+            exp.star.days_since_experiment += 1
+            outcomes.append(False)
+
+    # Update days since for non-selected stars
+    selected_ids = {exp.star.id for exp in selected}
+    for star in context.stars:
+        if star.id not in selected_ids:
+            star.days_since_experiment += 1
+
+    return outcomes
+
+
+def simulate_user_journey(days: int = 7, seed: Optional[int] = None):
+    """Simulate a new user's first week.
+
+    Uses the global `random` stream unless a seed is given.
+    """
+    print(f"\n{'='*60}")
+    print("MULTI-DAY SIMULATION: New User First Week")
+    print('='*60)
 
-    # Brightness gain constants from brightness-decay scripture
-    BASE_EXPERIMENT_IMPACT = 0.03
-    DIFFICULTY_GAIN = {'TINY': 0.5, 'SMALL': 0.75, 'MEDIUM': 1.0, 'STRETCH': 1.5}
+    context = new_journey_context()
+    stars = context.stars
+    rng = random.Random(seed) if seed is not None else random
+    start_time = datetime.now()
 
     results = []
 
     for day in range(1, days + 1):
         print(f"\n--- Day {day} ---")
-        current_time = datetime.now() + timedelta(days=day-1)
-
-        # Reset active count for simplicity
-        user.active_experiment_count = 0
-        for star in stars:
-            star.has_active_experiment = False
+        current_time = start_time + timedelta(days=day-1)
+        start_journey_day(context)
 
         # Select experiments
         selected = select_experiments(context, current_time)
@@ -1039,27 +2116,13 @@ def simulate_user_journey(days: int = 7):
             print(f"  - {exp.star.name} ({exp.difficulty}): priority={exp.priority_score:.3f}")
 
         # Simulate 70% completion rate
-        for exp in selected:
-            if random.random() < 0.7:  # 70% chance of completion
-                gain = BASE_EXPERIMENT_IMPACT * DIFFICULTY_GAIN.get(exp.difficulty, 0.75)
-                exp.star.brightness = clamp(exp.star.brightness + gain, 0.05, 1.0)
-                exp.star.brightness_history.append(exp.star.brightness)
-                exp.star.days_since_experiment = 0
+        outcomes = resolve_journey_day(context, selected, rng)
+        for exp, completed in zip(selected, outcomes):
+            if completed:
                 print(f"    COMPLETED: {exp.star.name} -> brightness={exp.star.brightness:.3f}")
-
-                # Update user success rate
-                if user.overall_completion_rate < 0.95:
-                    user.overall_completion_rate = min(0.95, user.overall_completion_rate + 0.05)
             else:
-                exp.star.days_since_experiment += 1
                 print(f"    SKIPPED: {exp.star.name}")
 
-        # Update days since for non-selected stars
-        selected_ids = {exp.star.id for exp in selected}
-        for star in stars:
-            if star.id not in selected_ids:
-                star.days_since_experiment += 1
-
         day_result = {
             'day': day,
             'selections': [(exp.star.name, exp.difficulty, exp.priority_score) for exp in selected],
@@ -1074,6 +2137,215 @@ def simulate_user_journey(days: int = 7):
     return results
 
 
+# ============================================================================
+# POPULATION JOURNEYS
+# ============================================================================
+
+# Fixed clock and chunking: results depend only on the seed, never on
+# wall time or on how chunks are spread across workers
+JOURNEY_EPOCH = datetime(2026, 1, 5, 10, 0)
+JOURNEY_CHUNK_SIZE = 256
+
+
+@dataclass
+class PopulationStats:
+    """Per-day aggregates over a simulated population.
+
+    Index [d] is day d + 1. Selection and difficulty counts are integers;
+    brightness sums are accumulated in user order so they are bit-identical
+    for a given seed.
+    """
+    days: int
+    users: int = 0
+    selections: List[Dict[str, int]] = field(default_factory=list)
+    difficulties: List[Dict[str, int]] = field(default_factory=list)
+    completions: List[int] = field(default_factory=list)
+    brightness_sum: List[Dict[str, float]] = field(default_factory=list)
+    brightness_min: List[Dict[str, float]] = field(default_factory=list)
+    brightness_max: List[Dict[str, float]] = field(default_factory=list)
+
+    def __post_init__(self):
+        if not self.selections:
+            self.selections = [{} for _ in range(self.days)]
+            self.difficulties = [{} for _ in range(self.days)]
+            self.completions = [0] * self.days
+            self.brightness_sum = [{} for _ in range(self.days)]
+            self.brightness_min = [{} for _ in range(self.days)]
+            self.brightness_max = [{} for _ in range(self.days)]
+
+    def merge(self, other: 'PopulationStats'):
+        """Fold in stats for users that come after this object's users."""
+        self.users += other.users
+        for d in range(self.days):
+            for key, count in other.selections[d].items():
+                self.selections[d][key] = self.selections[d].get(key, 0) + count
+            for key, count in other.difficulties[d].items():
+                self.difficulties[d][key] = self.difficulties[d].get(key, 0) + count
+            self.completions[d] += other.completions[d]
+            for key, total in other.brightness_sum[d].items():
+                self.brightness_sum[d][key] = self.brightness_sum[d].get(key, 0.0) + total
+                low, high = other.brightness_min[d][key], other.brightness_max[d][key]
+                self.brightness_min[d][key] = min(self.brightness_min[d].get(key, low), low)
+                self.brightness_max[d][key] = max(self.brightness_max[d].get(key, high), high)
+
+    def mean_brightness(self, day: int) -> Dict[str, float]:
+        """Mean brightness per star at the end of `day` (1-based)."""
+        if self.users == 0:
+            return {}
+        return {key: total / self.users for key, total in self.brightness_sum[day - 1].items()}
+
+
+def journey_rng(seed: int, user_index: int) -> random.Random:
+    """Independent stream per simulated user (string seeds hash the same in every process)."""
+    return random.Random(f"journey:{seed}:{user_index}")
+
+
+def simulate_journey_chunk(seed: int, start: int, stop: int, days: int,
+                           completion_chance: float = JOURNEY_COMPLETION_CHANCE) -> PopulationStats:
+    """Simulate users [start, stop) silently and aggregate them in user order."""
+    stats = PopulationStats(days=days)
+
+    for user_index in range(start, stop):
+        rng = journey_rng(seed, user_index)
+        context = new_journey_context()
+        stats.users += 1
+
+        for day in range(days):
+            current_time = JOURNEY_EPOCH + timedelta(days=day)
+            start_journey_day(context)
+            selected = select_experiments(context, current_time)
+            outcomes = resolve_journey_day(context, selected, rng, completion_chance)
+
+            for exp in selected:
+                stats.selections[day][exp.star.id] = stats.selections[day].get(exp.star.id, 0) + 1
+                stats.difficulties[day][exp.difficulty] = stats.difficulties[day].get(exp.difficulty, 0) + 1
+            stats.completions[day] += sum(outcomes)
+            for star in context.stars:
+                b = star.brightness
+                stats.brightness_sum[day][star.id] = stats.brightness_sum[day].get(star.id, 0.0) + b
+                stats.brightness_min[day][star.id] = min(stats.brightness_min[day].get(star.id, b), b)
+                stats.brightness_max[day][star.id] = max(stats.brightness_max[day].get(star.id, b), b)
+
+    return stats
+
+
+def simulate_population(users: int, days: int = 7, seed: int = 0, workers: int = 1,
+                        completion_chance: float = JOURNEY_COMPLETION_CHANCE,
+                        chunk_size: int = JOURNEY_CHUNK_SIZE) -> PopulationStats:
+    """Seeded journeys for a population, optionally across a process pool.
+
+    Users are cut into fixed-size chunks and chunk results are merged in
+    chunk order, so output is bit-identical for a seed whatever `workers` is.
+    """
+    bounds = [(start, min(start + chunk_size, users)) for start in range(0, users, chunk_size)]
+
+    if workers <= 1 or len(bounds) <= 1:
+        chunks = [simulate_journey_chunk(seed, lo, hi, days, completion_chance) for lo, hi in bounds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(simulate_journey_chunk, seed, lo, hi, days, completion_chance) for lo, hi in bounds]
+            chunks = [future.result() for future in futures]
+
+    stats = PopulationStats(days=days)
+    for chunk in chunks:
+        stats.merge(chunk)
+    return stats
+
+
+def check_population_merge(users: int = 600, days: int = 7, seed: int = 42,
+                           chunk_size: int = JOURNEY_CHUNK_SIZE) -> bool:
+    """Chunked runs must report the same per-star min/max as one chunk, within brightness bounds."""
+    merged = simulate_population(users, days, seed, chunk_size=chunk_size)
+    single = simulate_population(users, days, seed, chunk_size=users)
+
+    failures = []
+    for d in range(days):
+        if merged.brightness_min[d] != single.brightness_min[d]:
+            failures.append(f"day {d + 1}: min differs from single chunk")
+        if merged.brightness_max[d] != single.brightness_max[d]:
+            failures.append(f"day {d + 1}: max differs from single chunk")
+        values = list(merged.brightness_min[d].values()) + list(merged.brightness_max[d].values())
+        if any(not JOURNEY_MIN_BRIGHTNESS <= b <= JOURNEY_MAX_BRIGHTNESS for b in values):
+            failures.append(f"day {d + 1}: min/max outside [{JOURNEY_MIN_BRIGHTNESS}, {JOURNEY_MAX_BRIGHTNESS}]")
+
+    status = "✓ PASS" if not failures else "✗ FAIL"
+    print(f"\n  {status}: {users} users in chunks of {chunk_size} merge to single-chunk min/max")
+    for failure in failures:
+        print(f"    {failure}")
+    return not failures
+
+
+def random_context(rng: random.Random, current_time: datetime) -> SelectionContext:
+    """A random context for parity checks; some stars surfaced later on the same day."""
+    domains = ['health', 'wealth', 'purpose', 'relationships', 'soul']
+    stars = []
+    for i in range(rng.randint(1, 25)):
+        history = [round(rng.random(), 3) for _ in range(rng.randint(0, 5))]
+        stars.append(Star(id=f"s{i}", name=f"S{i}", domain=rng.choice(domains), brightness=rng.random(),
+                          days_since_experiment=rng.randint(0, 20), brightness_history=history,
+                          is_dark=rng.random() < 0.3, has_active_experiment=rng.random() < 0.2))
+    connections = [Connection(type=rng.choice(list(ConnectionType)), source=rng.choice(stars),
+                              target=rng.choice(stars)) for _ in range(rng.randint(0, 60))]
+    rates = {f"{d}-{size}": rng.random() for d in domains for size in ('tiny', 'small') if rng.random() < 0.5}
+    user = User.from_template_rates(rates, stress_state=rng.choice(STRESS_LEVELS),
+                                    active_experiment_count=rng.randint(0, 3),
+                                    overall_completion_rate=rng.choice([0.0, 0.3, 0.7, 1.0]),
+                                    available_minutes=rng.choice([5, 10, 30, 60]))
+    last_surfaced = {}
+    for star in stars:
+        roll = rng.random()
+        if roll < 0.4:
+            last_surfaced[star.id] = current_time - timedelta(days=rng.randint(0, 20))
+        elif roll < 0.6:
+            # Later the same day: (current_time - surfaced).days is -1
+            last_surfaced[star.id] = current_time + timedelta(hours=rng.randint(1, 23))
+    return SelectionContext(user=user, stars=stars, connections=connections,
+                            active_experiments=[Experiment(star=s, difficulty='SMALL')
+                                                for s in stars if s.has_active_experiment],
+                            last_surfaced=last_surfaced, current_hour=rng.randint(0, 23),
+                            current_day_of_week=rng.randint(0, 6))
+
+
+def check_cohort_parity(contexts: int = 3000, seed: int = 7) -> bool:
+    """select_cohort must pick exactly what select_experiments picks, user by user."""
+    rng = random.Random(seed)
+    current_time = JOURNEY_EPOCH
+    batch_contexts = [random_context(rng, current_time) for _ in range(contexts)]
+    expected = [[(e.star.id, e.difficulty, e.priority_score, e.urgency, e.capacity, e.success_prob,
+                  e.connection_bonus) for e in select_experiments(context, current_time)]
+                for context in batch_contexts]
+    batch = pack_cohort(batch_contexts, current_time)
+    selection = select_cohort(batch)
+
+    mismatches = 0
+    for u, picks in enumerate(expected):
+        got = [(batch.star_ids[selection.star[j]], DIFFICULTY_NAMES[selection.difficulty[j]],
+                selection.priority[j], selection.urgency[j], selection.capacity[j],
+                selection.success_prob[j], selection.connection_bonus[j]) for j in selection.for_user(u)]
+        mismatches += got != picks
+
+    status = "✓ PASS" if not mismatches else "✗ FAIL"
+    print(f"\n  {status}: select_cohort matches select_experiments on {contexts - mismatches}/{contexts} random contexts")
+    return not mismatches
+
+
+def print_population_summary(stats: PopulationStats):
+    """Print per-day selection shares and mean brightness."""
+    print(f"\n{'='*60}")
+    print(f"POPULATION JOURNEYS: {stats.users} users, {stats.days} days")
+    print('='*60)
+
+    for day in range(1, stats.days + 1):
+        picks = stats.selections[day - 1]
+        total = sum(picks.values()) or 1
+        shares = ", ".join(f"{key}={count / total:.0%}" for key, count in picks.items())
+        means = ", ".join(f"{key}={value:.3f}" for key, value in stats.mean_brightness(day).items())
+        print(f"\n--- Day {day} ---")
+        print(f"  Picks: {shares}")
+        print(f"  Completions: {stats.completions[day - 1]}")
+        print(f"  Mean brightness: {means}")
+
+
 def run_all_scenarios():
     """Run all test scenarios."""
     scenarios = [
@@ -1117,22 +2389,233 @@ def sensitivity_analysis():
         (0.33, 0.34, 0.33, "Equal weights (0.33/0.34/0.33)"),
     ]
 
-    global W_URGENCY, W_CAPACITY, W_SUCCESS
+    # Components are weight-independent: score once, rank per config
+    matrix = ComponentMatrix.build(context, current_time)
 
     for w_u, w_c, w_s, name in weight_configs:
         print(f"\n--- {name} ---")
-        W_URGENCY, W_CAPACITY, W_SUCCESS = w_u, w_c, w_s
+        scores = matrix.scores((w_u, w_c, w_s))
+
+        for i, idx in enumerate(matrix.select((w_u, w_c, w_s))[:3]):
+            print(f"  #{i+1}: {matrix.candidates[idx].star.name} - priority={scores[idx]:.3f}")
+
+    # Rank stability across the whole weight simplex
+    sweep = weight_sweep(context, current_time, weight_grid(0.01))
+    print(f"\n--- Weight sweep ({len(sweep.weights)} vectors) ---")
+    print(f"  Modal selection: {', '.join(sweep.modal_selection)} ({sweep.modal_share:.0%} of vectors)")
+    for sid, rate in sweep.inclusion_rate.items():
+        print(f"  {sid}: selected {rate:.0%}, mean rank {sweep.mean_rank[sid]:.2f}, spread {sweep.rank_spread[sid]}")
+
+
+# ============================================================================
+# SELECTION SERVICE
+# ============================================================================
+
+ContextLoader = Callable[[str], Awaitable[SelectionContext]]
+InflightKey = Tuple[str, int, datetime]  # (user id, invalidation generation, current_time)
+
+
+@dataclass
+class ServiceMetrics:
+    requests: int = 0
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+class SelectionService:
+    """In-process asyncio front end for select_experiments.
+
+    Keeps a bounded LRU of per-user SelectionContexts (with their connection
+    index and capacity profile) so warm requests skip the load and rebuild.
+    Star and connection update events invalidate a user's entry; a load that
+    was in flight across an invalidation is not cached. Concurrent requests
+    share a single computation task only when they agree on user,
+    current_time and invalidation generation, so nobody gets a selection
+    made for another time or from data older than their request. Each
+    caller awaits the task through asyncio.shield, so a
+    cancelled caller leaves the others running; the task itself is cancelled
+    only when its last caller goes. select_experiments runs on `executor`
+    (the loop's default when None) to keep the event loop free.
+    """
+
+    def __init__(self, loader: ContextLoader, capacity: int = 1024, executor: Optional[Executor] = None):
+        self.loader = loader
+        self.capacity = capacity
+        self.executor = executor
+        self.metrics = ServiceMetrics()
+        self._contexts: 'OrderedDict[str, SelectionContext]' = OrderedDict()
+        self._inflight: Dict[InflightKey, 'asyncio.Task[List[Experiment]]'] = {}
+        self._waiters: Dict['asyncio.Task[List[Experiment]]', int] = {}
+        self._generation: Dict[str, int] = {}
+
+    async def select(self, user_id: str, current_time: datetime) -> List[Experiment]:
+        self.metrics.requests += 1
+        # Joiners must match the time and come after the same invalidations;
+        # a request after an update event starts a fresh computation
+        key = (user_id, self._generation.get(user_id, 0), current_time)
+        task = self._inflight.get(key)
+        if task is None or task.done():
+            task = asyncio.get_running_loop().create_task(self._compute(user_id, current_time))
+            task.add_done_callback(lambda done: self._finished(key, done))
+            self._inflight[key] = task
+        else:
+            self.metrics.coalesced += 1
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # Nobody is left waiting; later callers start afresh
+                    self._finished(key, task)
+                    task.cancel()
+
+    async def _compute(self, user_id: str, current_time: datetime) -> List[Experiment]:
+        context = await self._context_for(user_id)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, select_experiments, context, current_time)
+
+    def _finished(self, key: 'InflightKey', task: 'asyncio.Task[List[Experiment]]'):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _context_for(self, user_id: str) -> SelectionContext:
+        context = self._contexts.get(user_id)
+        if context is not None:
+            self.metrics.hits += 1
+            self._contexts.move_to_end(user_id)
+            return context
+
+        self.metrics.misses += 1
+        generation = self._generation.get(user_id, 0)
+        context = await self.loader(user_id)
+        if self._generation.get(user_id, 0) == generation:
+            self._contexts[user_id] = context
+            if len(self._contexts) > self.capacity:
+                self._contexts.popitem(last=False)
+                self.metrics.evictions += 1
+        return context
+
+    def invalidate(self, user_id: str):
+        """Drop a user's cached context; the next request reloads it.
+
+        Bumping the generation also keeps later requests from joining a
+        computation that started before the update.
+        """
+        self._generation[user_id] = self._generation.get(user_id, 0) + 1
+        if self._contexts.pop(user_id, None) is not None:
+            self.metrics.invalidations += 1
+
+    def on_star_updated(self, user_id: str, star_id: str):  # noqa: ARG002
+        """Star brightness, history or state changed upstream."""
+        self.invalidate(user_id)
+
+    def on_connections_updated(self, user_id: str):
+        """A connection was added, removed or retyped upstream."""
+        self.invalidate(user_id)
 
-        selected = select_experiments(context, current_time)
 
-        for i, exp in enumerate(selected[:3]):
-            print(f"  #{i+1}: {exp.star.name} - priority={exp.priority_score:.3f}")
+@dataclass
+class LoadReport:
+    clients: int
+    requests: int
+    seconds: float
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+    metrics: ServiceMetrics
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.seconds if self.seconds > 0 else 0.0
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def generate_load(service: SelectionService, user_ids: List[str], clients: int = 2000,
+                        requests_per_client: int = 5, seed: int = 0,
+                        update_rate: float = 0.02) -> LoadReport:
+    """Drive a service with many concurrent in-process clients.
+
+    Clients pick users with a skewed (squared-uniform) distribution so hot
+    users exercise coalescing, and occasionally fire a star update event to
+    exercise invalidation. Latency is measured per request.
+    """
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    current_time = JOURNEY_EPOCH
+
+    async def client(client_rng: random.Random):
+        for _ in range(requests_per_client):
+            user_id = user_ids[int(client_rng.random() ** 2 * len(user_ids))]
+            if client_rng.random() < update_rate:
+                service.on_star_updated(user_id, "health")
+            started = time.perf_counter()
+            await service.select(user_id, current_time)
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(random.Random(rng.random())) for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return LoadReport(
+        clients=clients,
+        requests=len(latencies),
+        seconds=elapsed,
+        p50_ms=percentile(latencies, 50) * 1000,
+        p99_ms=percentile(latencies, 99) * 1000,
+        max_ms=(latencies[-1] if latencies else 0.0) * 1000,
+        metrics=service.metrics,
+    )
+
 
-    # Reset to defaults
-    W_URGENCY, W_CAPACITY, W_SUCCESS = 0.40, 0.35, 0.25
+def run_service_load_test(users: int = 5000, clients: int = 2000, requests_per_client: int = 5,
+                          cache_size: int = 1024, load_latency_ms: float = 2.0, seed: int = 0) -> LoadReport:
+    """Measure service latency against a simulated context store."""
+
+    async def loader(user_id: str) -> SelectionContext:  # noqa: ARG001
+        await asyncio.sleep(load_latency_ms / 1000.0)
+        return new_journey_context()
+
+    service = SelectionService(loader, capacity=cache_size)
+    user_ids = [f"user-{i}" for i in range(users)]
+    report = asyncio.run(generate_load(service, user_ids, clients, requests_per_client, seed))
+
+    print(f"\n{'='*60}")
+    print("SELECTION SERVICE LOAD TEST")
+    print('='*60)
+    print(f"  Clients: {report.clients}, requests: {report.requests}, {report.throughput:,.0f} req/s")
+    print(f"  Latency: p50={report.p50_ms:.2f}ms  p99={report.p99_ms:.2f}ms  max={report.max_ms:.2f}ms")
+    m = report.metrics
+    print(f"  Cache: hits={m.hits} misses={m.misses} coalesced={m.coalesced} "
+          f"evictions={m.evictions} invalidations={m.invalidations}")
+    return report
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Experiment Selection Simulation")
+    parser.add_argument("--load-test", action="store_true", help="Run the selection service load test only")
+    parser.add_argument("--clients", type=int, default=2000, help="Concurrent clients for --load-test")
+    args = parser.parse_args()
+
+    if args.load_test:
+        run_service_load_test(clients=args.clients)
+        raise SystemExit(0)
+
     print("="*60)
     print("EXPERIMENT SELECTION SYSTEM - MIRROR SIMULATION")
     print("="*60)
@@ -1143,6 +2626,11 @@ if __name__ == "__main__":
     # Run multi-day simulation
     journey_results = simulate_user_journey(days=7)
 
+    # Run seeded population journeys
+    print_population_summary(simulate_population(users=500, days=7, seed=42))
+    check_population_merge()
+    check_cohort_parity()
+
     # Run sensitivity analysis
     sensitivity_analysis()
 